@@ -121,6 +121,38 @@ CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "Asia/Kolkata"
 
+# Biometric device ingest
+ATTENDANCE_DEVICE_TIMEOUT = config("ATTENDANCE_DEVICE_TIMEOUT", default=120, cast=int)
+ATTENDANCE_DEVICE_MAX_WORKERS = config("ATTENDANCE_DEVICE_MAX_WORKERS", default=4, cast=int)
+ATTENDANCE_DEVICE_CONNECT_TIMEOUT = config("ATTENDANCE_DEVICE_CONNECT_TIMEOUT", default=5, cast=int)
+ATTENDANCE_DEVICE_RETRIES = config("ATTENDANCE_DEVICE_RETRIES", default=2, cast=int)
+ATTENDANCE_DEVICE_RETRY_BACKOFF = config("ATTENDANCE_DEVICE_RETRY_BACKOFF", default=1.0, cast=float)
+# Seconds one device fetch may take across all attempts before the device counts as failed
+ATTENDANCE_DEVICE_FETCH_BUDGET = config("ATTENDANCE_DEVICE_FETCH_BUDGET", default=150, cast=int)
+# Consecutive failed fetches before a device is skipped for the cooldown (seconds)
+ATTENDANCE_DEVICE_FAILURE_THRESHOLD = config("ATTENDANCE_DEVICE_FAILURE_THRESHOLD", default=3, cast=int)
+ATTENDANCE_DEVICE_COOLDOWN = config("ATTENDANCE_DEVICE_COOLDOWN", default=900, cast=int)
+# Seconds an ingest run holds a device; an incremental and the nightly run never read the same device at once
+ATTENDANCE_INGEST_LOCK_TIMEOUT = config("ATTENDANCE_INGEST_LOCK_TIMEOUT", default=1800, cast=int)
+# Seconds without progress after which a pending or running sync job no longer blocks its range
+ATTENDANCE_SYNC_JOB_STALE_AFTER = config("ATTENDANCE_SYNC_JOB_STALE_AFTER", default=1800, cast=int)
+
+# Shared cache; web and Celery processes must point at the same one for report invalidation to reach every process
+CACHE_URL = config("CACHE_URL", default="")
+CACHES = {
+    "default": (
+        {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": CACHE_URL}
+        if CACHE_URL
+        else {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    )
+}
+# Seconds a process keeps its attendance context (colors, settings, shifts) before reloading it
+ATTENDANCE_CONTEXT_TIMEOUT = config("ATTENDANCE_CONTEXT_TIMEOUT", default=60, cast=int)
+# Reports are only cached in the shared cache: a per-process one would keep serving reports another process invalidated
+REPORT_CACHE_ENABLED = bool(CACHE_URL)
+# Seconds a rendered attendance report is kept; saves invalidate it earlier
+REPORT_CACHE_TIMEOUT = config("REPORT_CACHE_TIMEOUT", default=3600, cast=int)
+
 
 LOGO_URL = "hrms_app/img/logo.png"
 LOGO_MINI_URL = "hrms_app/img/logo.png"
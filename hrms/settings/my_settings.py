@@ -112,6 +112,31 @@ SENT_MAIL_STATUS_CHOICES = (
     (FAILED, _("Failed")),
 )
 
+RUNNING = "running"
+
+SYNC_JOB_STATUS_CHOICES = [
+    (PENDING, _("Pending")),
+    (RUNNING, _("Running")),
+    (COMPLETED, _("Completed")),
+    (FAILED, _("Failed")),
+]
+
+SYNC_JOB_INGEST = "ingest"
+SYNC_JOB_RECLASSIFY = "reclassify"
+
+SYNC_JOB_TYPE_CHOICES = [
+    (SYNC_JOB_INGEST, _("Device Ingest")),
+    (SYNC_JOB_RECLASSIFY, _("Reclassification")),
+]
+
+REPORT_ATTENDANCE = "attendance"
+REPORT_DETAILED = "detailed"
+
+REPORT_TYPE_CHOICES = [
+    (REPORT_ATTENDANCE, _("Attendance Report")),
+    (REPORT_DETAILED, _("Attendance Detailed Report")),
+]
+
 
 ROLE_CHOICES = [
     (ON_ROLE, "On-Role"),
@@ -45,6 +45,10 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'hrms_app.tasks.populate_attendance_log',
         'schedule': crontab(minute=59, hour=22),
     },
+    'populate_attendance_log_incremental': {
+        'task': 'hrms_app.tasks.populate_attendance_log_incremental',
+        'schedule': crontab(minute='*/5'),  # Every 5 minutes
+    },
     'send_reminder_email': {
         'task': 'hrms_app.tasks.send_reminder_email',
         'schedule': crontab(minute=0, hour=10),    },
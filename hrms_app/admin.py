@@ -312,14 +312,70 @@ admin.site.register(FormProgress, FormProgressAdmin)
 
 
 class DeviceInformationAdmin(admin.ModelAdmin):
-    list_display = ['device_location','from_date', 'to_date', 'serial_number','username','password']
-    fields = ('device_location','api_link','from_date', 'to_date', 'serial_number','username','password')
+    list_display = ['device_location','from_date', 'to_date', 'serial_number','username','password','last_punch_at','last_success_at','consecutive_failures','circuit_open_until']
+    fields = ('device_location','api_link','from_date', 'to_date', 'serial_number','username','password','last_punch_at','circuit_open_until','ingest_locked_until','request_count','failure_count','consecutive_failures','last_latency_ms','last_error','last_success_at')
+    readonly_fields = ('request_count','failure_count','consecutive_failures','last_latency_ms','last_error','last_success_at')
     search_fields = ['serial_number', 'username']
     
 
 admin.site.register(DeviceInformation, DeviceInformationAdmin)
 
 
+class PunchLogAdmin(admin.ModelAdmin):
+    list_display = ['employee_code', 'punch_time', 'device']
+    list_filter = ['device']
+    search_fields = ['employee_code']
+    date_hierarchy = 'punch_time'
+
+
+admin.site.register(PunchLog, PunchLogAdmin)
+
+
+class BackfillWindowAdmin(admin.ModelAdmin):
+    list_display = ['device', 'window_start', 'window_end', 'status', 'attempts', 'punches', 'inserted', 'updated', 'skipped', 'updated_at']
+    list_filter = ['status', 'device']
+    readonly_fields = ['error']
+
+
+admin.site.register(BackfillWindow, BackfillWindowAdmin)
+
+
+class AttendanceDaySummaryAdmin(admin.ModelAdmin):
+    list_display = ['employee', 'date', 'status', 'in_time', 'out_time', 'duration', 'leave_code', 'tour_code', 'regularized', 'has_activity', 'updated_at']
+    list_filter = ['status']
+    search_fields = ['employee__username', 'employee__first_name', 'employee__last_name']
+    date_hierarchy = 'date'
+
+
+admin.site.register(AttendanceDaySummary, AttendanceDaySummaryAdmin)
+
+
+class SummaryRefreshAdmin(admin.ModelAdmin):
+    list_display = ['month', 'employee', 'created_at']
+    date_hierarchy = 'month'
+
+
+admin.site.register(SummaryRefresh, SummaryRefreshAdmin)
+
+
+class ReportSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['report', 'location', 'from_date', 'to_date', 'active', 'computed_at', 'stale']
+    list_filter = ['report', 'location', 'stale']
+    exclude = ['content']
+
+
+admin.site.register(ReportSnapshot, ReportSnapshotAdmin)
+
+
+class AttendanceSyncJobAdmin(admin.ModelAdmin):
+    list_display = ['dedup_key', 'job_type', 'status', 'processed', 'total', 'inserted', 'updated', 'skipped', 'requested_by', 'created_at', 'finished_at']
+    list_filter = ['job_type', 'status']
+    readonly_fields = ['devices', 'errors', 'started_at', 'finished_at']
+
+
+admin.site.register(AttendanceSyncJob, AttendanceSyncJobAdmin)
+
+
 class OfficeLocationAdmin(admin.ModelAdmin):
     list_display = ['location_name','office_type', 'address', 'latitude','longitude']
     fields = ('location_name','office_type', 'address', 'latitude','longitude')
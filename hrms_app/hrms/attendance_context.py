@@ -0,0 +1,87 @@
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from hrms_app.models import AttendanceSetting, AttendanceStatusColor, EmployeeShift
+
+ATTENDANCE_CONTEXT_VERSION_KEY = "attendance_context_version"
+
+
+class AttendanceContext:
+    """
+    Static data every attendance computation needs: the half day, present and absent
+    colors, the attendance settings and the employee -> shift map. Colors and settings
+    are read once on creation; the shift map is loaded in a single query on first use.
+    """
+
+    def __init__(self):
+        colors = {
+            color.status: color
+            for color in AttendanceStatusColor.objects.filter(
+                status__in=[settings.HALF_DAY, settings.PRESENT, settings.ABSENT]
+            )
+        }
+        try:
+            self.half_day_color = colors[settings.HALF_DAY]
+            self.present_color = colors[settings.PRESENT]
+            self.absent_color = colors[settings.ABSENT]
+        except KeyError as missing:
+            raise AttendanceStatusColor.DoesNotExist(
+                f"AttendanceStatusColor matching status {missing} does not exist."
+            )
+        self.asettings = AttendanceSetting.objects.first()
+        self._user_shifts = None
+
+    @property
+    def status_colors(self):
+        return self.half_day_color, self.present_color, self.absent_color
+
+    @property
+    def user_shifts(self):
+        if self._user_shifts is None:
+            user_shifts = {}
+            # Same pick as EmployeeShift.objects.filter(employee=user).first()
+            for emp_shift in EmployeeShift.objects.select_related("shift_timing").order_by("pk"):
+                user_shifts.setdefault(emp_shift.employee_id, emp_shift.shift_timing)
+            self._user_shifts = user_shifts
+        return self._user_shifts
+
+    def get_user_shift(self, user):
+        return self.user_shifts.get(user.pk)
+
+
+_context = None
+_context_version = None
+_context_loaded_at = None
+_context_lock = threading.Lock()
+
+
+def get_attendance_context():
+    """
+    Return the process-wide AttendanceContext, rebuilding it when another process
+    (or a signal in this one) has bumped the shared version key. Without a shared
+    cache the version never reaches other processes, so the context is also rebuilt
+    once it is `ATTENDANCE_CONTEXT_TIMEOUT` seconds old.
+    """
+    global _context, _context_version, _context_loaded_at
+    version = cache.get(ATTENDANCE_CONTEXT_VERSION_KEY)
+    with _context_lock:
+        if (
+            _context is None
+            or version != _context_version
+            or time.monotonic() - _context_loaded_at >= settings.ATTENDANCE_CONTEXT_TIMEOUT
+        ):
+            _context = AttendanceContext()
+            _context_version = version
+            _context_loaded_at = time.monotonic()
+        return _context
+
+
+def invalidate_attendance_context():
+    global _context
+    with _context_lock:
+        _context = None
+    cache.set(ATTENDANCE_CONTEXT_VERSION_KEY, uuid.uuid4().hex, None)
@@ -0,0 +1,185 @@
+import calendar
+from datetime import date, datetime, time
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils.timezone import is_aware, localtime, make_aware
+
+from hrms_app.models import AttendanceDaySummary, SummaryRefresh
+
+User = get_user_model()
+
+SUMMARY_BATCH_SIZE = 1000
+
+
+def iter_months(from_date, to_date):
+    """Yield `(first_day, last_day)` for every calendar month touching the range."""
+    year, month = from_date.year, from_date.month
+    while (year, month) <= (to_date.year, to_date.month):
+        yield date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def parse_report_time(value):
+    """Times come out of the detailed report formatted as `%I:%M %p`."""
+    if not value:
+        return None
+    return datetime.strptime(value, "%I:%M %p").time()
+
+
+def build_day_summaries(employees, month_start, month_end):
+    """
+    Compute the summary rows of `employees` for one month with the same merge rules
+    as the attendance and detailed attendance reports.
+    """
+    from hrms_app.hrms.report_engine import ColumnarPresenceEngine
+    from hrms_app.views.report_view import MonthAttendanceReportView, get_status_entry_cell
+
+    activity_days = set()
+    attendance_data = MonthAttendanceReportView().build_attendance_data(
+        employees,
+        make_aware(datetime.combine(month_start, time.min)),
+        make_aware(datetime.combine(month_end, time.min)),
+        activity_days=activity_days,
+    )
+    presence_data = ColumnarPresenceEngine(
+        employees.filter(personal_detail__isnull=False),
+        month_start.strftime("%Y-%m-%d"),
+        month_end.strftime("%Y-%m-%d"),
+    ).build()
+    employee_codes = dict(
+        employees.filter(personal_detail__isnull=False).values_list(
+            "personal_detail__employee_code", "pk"
+        )
+    )
+
+    summaries = {}
+
+    def get_summary(employee_id, day):
+        key = (employee_id, day)
+        if key not in summaries:
+            summaries[key] = AttendanceDaySummary(employee_id=employee_id, date=day)
+        return summaries[key]
+
+    for emp_code, days in presence_data.items():
+        employee_id = employee_codes.get(emp_code)
+        if employee_id is None:
+            continue
+        for day_str, status_entry in days.items():
+            day = date.fromisoformat(day_str)
+            if not status_entry or not month_start <= day <= month_end:
+                continue
+            cell = get_status_entry_cell(status_entry)
+            summary = get_summary(employee_id, day)
+            summary.status = cell["status"] or ""
+            summary.in_time = parse_report_time(cell["in_time"])
+            summary.out_time = parse_report_time(cell["out_time"])
+            summary.duration = cell["total_duration"] or None
+            summary.leave_code = cell["leave"] or ""
+            summary.tour_code = cell["tour"] or ""
+            summary.regularized = cell["reg"] == "R"
+
+    for employee_id, days in attendance_data.items():
+        for day, entries in days.items():
+            if not entries or not month_start <= day <= month_end:
+                continue
+            summary = get_summary(employee_id, day)
+            summary.entries = entries
+            summary.color = entries[-1].get("color") or ""
+    for (employee_id, day), summary in summaries.items():
+        summary.has_activity = (employee_id, day) in activity_days
+    return list(summaries.values())
+
+
+def refresh_day_summaries(employee_ids, from_date, to_date):
+    """
+    Rebuild the summary rows of `employee_ids` (every employee when None) for each
+    month touching `from_date`..`to_date` and drop the cached reports reading them.
+    Returns the number of rows written.
+    """
+    from hrms_app.hrms.report_cache import invalidate_report_cache
+
+    employees = User.objects.all()
+    location_ids = None
+    if employee_ids is not None:
+        employees = employees.filter(pk__in=list(employee_ids))
+        location_ids = set(employees.values_list("device_location_id", flat=True))
+    written = 0
+    for month_start, month_end in iter_months(from_date, to_date):
+        summaries = build_day_summaries(employees, month_start, month_end)
+        with transaction.atomic():
+            AttendanceDaySummary.objects.filter(
+                employee__in=employees, date__range=[month_start, month_end]
+            ).delete()
+            AttendanceDaySummary.objects.bulk_create(summaries, batch_size=SUMMARY_BATCH_SIZE)
+        # After commit, so no other process caches the old rows under the new version
+        transaction.on_commit(
+            lambda start=month_start, end=month_end: invalidate_report_cache(location_ids, start, end)
+        )
+        written += len(summaries)
+    return written
+
+
+def refresh_queued_summaries():
+    """
+    Claim the queued SummaryRefresh rows a month at a time and rebuild each month
+    once for every employee queued against it. A row is only removed together with
+    its rebuild, so a failed month stays queued for the next run. Returns the number
+    of summary rows written.
+    """
+    written = 0
+    months = SummaryRefresh.objects.order_by("month").values_list("month", flat=True).distinct()
+    for month in list(months):
+        with transaction.atomic():
+            claimed = list(
+                SummaryRefresh.objects.select_for_update()
+                .filter(month=month)
+                .values_list("pk", "employee_id")
+            )
+            if not claimed:
+                # Another worker got here first
+                continue
+            SummaryRefresh.objects.filter(pk__in=[pk for pk, _ in claimed]).delete()
+            employee_ids = {employee_id for _, employee_id in claimed}
+            written += refresh_day_summaries(
+                None if None in employee_ids else employee_ids, month, month
+            )
+    return written
+
+
+def queue_summary_refresh(employee_ids, from_date, to_date):
+    """
+    Queue the summaries of `employee_ids` (every employee when None) for each month
+    touching `from_date`..`to_date`, inside the current transaction. Months already
+    queued are left as they are. Nothing is rebuilt until `dispatch_summary_refresh`.
+    """
+    if from_date is None or to_date is None:
+        return
+    if isinstance(from_date, datetime):
+        from_date = (localtime(from_date) if is_aware(from_date) else from_date).date()
+    if isinstance(to_date, datetime):
+        to_date = (localtime(to_date) if is_aware(to_date) else to_date).date()
+    if from_date > to_date:
+        from_date, to_date = to_date, from_date
+    employee_ids = [None] if employee_ids is None else {pk for pk in employee_ids if pk}
+    SummaryRefresh.objects.bulk_create(
+        [
+            SummaryRefresh(employee_id=employee_id, month=month_start)
+            for month_start, _ in iter_months(from_date, to_date)
+            for employee_id in employee_ids
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def dispatch_summary_refresh():
+    """Start the task rebuilding the queued summaries once the current transaction commits."""
+    from hrms_app.tasks import refresh_attendance_summaries
+
+    transaction.on_commit(refresh_attendance_summaries.delay)
+
+
+def schedule_summary_refresh(employee_ids, from_date, to_date):
+    """Queue the summaries for a refresh and rebuild them in the background after commit."""
+    queue_summary_refresh(employee_ids, from_date, to_date)
+    dispatch_summary_refresh()
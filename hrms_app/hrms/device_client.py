@@ -0,0 +1,227 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+from hrms_app.hrms.utils import (
+    TRANSACTION_LOG_CHUNK_SIZE,
+    group_transaction_lines,
+    iter_transaction_lines,
+)
+from hrms_app.models import DeviceInformation
+
+_device_sessions = {}
+_device_sessions_lock = threading.Lock()
+
+
+def get_device_session(api_link):
+    """
+    Return a keep-alive HTTP session for the given device link.
+    Sessions are cached per process so repeated runs reuse pooled connections.
+    """
+    with _device_sessions_lock:
+        session = _device_sessions.get(api_link)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _device_sessions[api_link] = session
+        return session
+
+
+def iter_before_deadline(chunks, deadline):
+    """Pass the chunks through, raising a timeout once `deadline` (monotonic) has passed."""
+    for chunk in chunks:
+        if time.monotonic() > deadline:
+            raise requests.exceptions.Timeout("Device fetch time budget exhausted")
+        yield chunk
+
+
+def request_transaction_log(device_instance, from_date, to_date, timeout=None, deadline=None):
+    """
+    Single `GetTransactionsLog` round-trip. Returns the punches grouped by employee
+    code and date, and raises on transport, HTTP or payload errors. The read timeout
+    applies to each read; `deadline` also bounds a device that keeps trickling data.
+    """
+    url = device_instance.api_link
+    headers = {"Content-Type": "text/xml"}
+    params = {"op": "GetTransactionsLog"}
+    attendance_start_date = device_instance.from_date if from_date is None else from_date
+    attendance_to_date = device_instance.to_date if to_date is None else to_date
+    body = f"""<?xml version="1.0" encoding="utf-8"?>
+    <soap:Envelope xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xmlns:xsd="http://www.w3.org/2001/XMLSchema" xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+        <soap:Body>
+            <GetTransactionsLog xmlns="http://tempuri.org/">
+                <FromDateTime>{attendance_start_date}</FromDateTime>
+                <ToDateTime>{attendance_to_date}</ToDateTime>
+                <SerialNumber>{device_instance.serial_number}</SerialNumber>
+                <UserName>{device_instance.username}</UserName>
+                <UserPassword>{device_instance.password}</UserPassword>
+                <strDataList>string</strDataList>
+            </GetTransactionsLog>
+        </soap:Body>
+    </soap:Envelope>
+    """
+
+    response = get_device_session(url).post(
+        url,
+        params=params,
+        data=body,
+        headers=headers,
+        timeout=timeout
+        or (settings.ATTENDANCE_DEVICE_CONNECT_TIMEOUT, settings.ATTENDANCE_DEVICE_TIMEOUT),
+        stream=True,
+    )
+    with response:
+        response.raise_for_status()
+        chunks = response.iter_content(chunk_size=TRANSACTION_LOG_CHUNK_SIZE)
+        if deadline is not None:
+            chunks = iter_before_deadline(chunks, deadline)
+        # Parse the payload as it arrives instead of holding the whole document
+        lines = iter_transaction_lines(chunks)
+        return group_transaction_lines(lines, device_instance.include_seconds)
+
+
+class DeviceClient:
+    """
+    Fetches one device's transaction log with bounded timeouts, exponential-backoff
+    retries and a circuit breaker.
+
+    All attempts of a fetch, backoff included, share `ATTENDANCE_DEVICE_FETCH_BUDGET`
+    seconds, so a hung device holds a worker for that long at most.
+
+    After `ATTENDANCE_DEVICE_FAILURE_THRESHOLD` consecutive failed fetches the device
+    is skipped until `ATTENDANCE_DEVICE_COOLDOWN` seconds have passed. `fetch` never
+    touches the database, so it is safe to call from worker threads; the outcome is
+    written to the device row by `save_health`.
+    """
+
+    def __init__(self, device, retries=None, backoff=None):
+        self.device = device
+        self.retries = settings.ATTENDANCE_DEVICE_RETRIES if retries is None else retries
+        self.backoff = settings.ATTENDANCE_DEVICE_RETRY_BACKOFF if backoff is None else backoff
+        self.attempts = 0
+        self.failures = 0
+        self.latency_ms = None
+        self.error = None
+        self.succeeded = False
+        self.skipped = False
+
+    def is_circuit_open(self):
+        open_until = self.device.circuit_open_until
+        return open_until is not None and open_until > timezone.now()
+
+    def fetch(self, from_date, to_date):
+        if self.is_circuit_open():
+            self.skipped = True
+            self.error = f"Circuit open until {timezone.localtime(self.device.circuit_open_until)}"
+            logging.warning(f"Skipping device {self.device.serial_number}: {self.error}")
+            return None
+
+        deadline = time.monotonic() + settings.ATTENDANCE_DEVICE_FETCH_BUDGET
+        for attempt in range(self.retries + 1):
+            if attempt:
+                delay = self.backoff * 2 ** (attempt - 1)
+                if time.monotonic() + delay >= deadline:
+                    logging.error(f"Device {self.device.serial_number}: time budget spent, not retrying")
+                    break
+                time.sleep(delay)
+            remaining = deadline - time.monotonic()
+            timeout = (
+                min(settings.ATTENDANCE_DEVICE_CONNECT_TIMEOUT, remaining),
+                min(settings.ATTENDANCE_DEVICE_TIMEOUT, remaining),
+            )
+            self.attempts += 1
+            started = time.perf_counter()
+            try:
+                result = request_transaction_log(
+                    self.device, from_date, to_date, timeout=timeout, deadline=deadline
+                )
+            except Exception as e:
+                self.failures += 1
+                self.error = str(e)
+                logging.error(
+                    f"Device {self.device.serial_number} attempt {self.attempts} failed: {e}"
+                )
+            else:
+                self.succeeded = True
+                self.error = None
+                return result
+            finally:
+                self.latency_ms = int((time.perf_counter() - started) * 1000)
+        return None
+
+    def save_health(self):
+        """Record request metrics on the device and open or close its circuit."""
+        if self.skipped:
+            return
+        device = self.device
+        now = timezone.now()
+        fields = {
+            "request_count": F("request_count") + self.attempts,
+            "failure_count": F("failure_count") + self.failures,
+            "last_latency_ms": self.latency_ms,
+        }
+        if self.succeeded:
+            device.consecutive_failures = 0
+            device.circuit_open_until = None
+            device.last_success_at = now
+            fields["last_success_at"] = now
+        else:
+            device.consecutive_failures += 1
+            if device.consecutive_failures >= settings.ATTENDANCE_DEVICE_FAILURE_THRESHOLD:
+                device.circuit_open_until = now + timedelta(
+                    seconds=settings.ATTENDANCE_DEVICE_COOLDOWN
+                )
+            device.last_error = self.error[:255]
+            fields["last_error"] = device.last_error
+        fields["consecutive_failures"] = device.consecutive_failures
+        fields["circuit_open_until"] = device.circuit_open_until
+        device.last_latency_ms = self.latency_ms
+        DeviceInformation.objects.filter(pk=device.pk).update(**fields)
+
+
+def fetch_device_logs(devices, from_date, to_date, max_workers=None, date_ranges=None):
+    """
+    Fetch the transaction logs of several devices in parallel.
+
+    :param devices: Iterable of DeviceInformation instances.
+    :param max_workers: Upper bound on concurrent device requests.
+    :param date_ranges: Optional dict of device pk to a (from_date, to_date) pair
+        overriding the shared range for that device.
+    :return: Dict mapping device pk to its grouped data (None if the fetch failed).
+    """
+    devices = list(devices)
+    if not devices:
+        return {}
+    max_workers = max_workers or settings.ATTENDANCE_DEVICE_MAX_WORKERS
+    date_ranges = date_ranges or {}
+    clients = [DeviceClient(device) for device in devices]
+    results = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(devices))) as executor:
+        futures = {
+            executor.submit(
+                client.fetch, *date_ranges.get(client.device.pk, (from_date, to_date))
+            ): client
+            for client in clients
+        }
+        for future in as_completed(futures):
+            device = futures[future].device
+            try:
+                results[device.pk] = future.result()
+            except Exception as e:
+                logging.error(f"Fetching logs from device {device.serial_number} failed: {e}")
+                results[device.pk] = None
+    # Health is written from this thread, once every fetch has finished
+    for client in clients:
+        if client.device.pk is not None:
+            client.save_health()
+    return results
@@ -0,0 +1,180 @@
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+
+SOAP_RESPONSE_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xmlns:xsd="http://www.w3.org/2001/XMLSchema" xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+    <soap:Body>
+        <GetTransactionsLogResponse xmlns="http://tempuri.org/">
+            <GetTransactionsLogResult>true</GetTransactionsLogResult>
+            <strDataList>{data}</strDataList>
+        </GetTransactionsLogResponse>
+    </soap:Body>
+</soap:Envelope>
+"""
+
+SOAP_FAULT_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+    <soap:Body>
+        <soap:Fault>
+            <faultcode>soap:Server</faultcode>
+            <faultstring>{message}</faultstring>
+        </soap:Fault>
+    </soap:Body>
+</soap:Envelope>
+"""
+
+
+def _read_tag(body, tag):
+    match = re.search(rf"<{tag}>(.*?)</{tag}>", body, re.S)
+    return match.group(1).strip() if match else None
+
+
+def _parse_request_date(value):
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def generate_punch_lines(emp_codes, from_date, to_date, punches_per_day=2):
+    """
+    Yield one `emp_code<TAB>timestamp` line per punch, the same layout the real
+    device returns in `strDataList`: `punches_per_day` punches per employee per day,
+    spread evenly from the in punch to the out punch 8h30 later, limited to
+    punches that fall inside the requested window.
+    """
+    workday = timedelta(hours=8, minutes=30)
+    offsets = [workday * step / max(punches_per_day - 1, 1) for step in range(punches_per_day)]
+    current_date = from_date.date()
+    while current_date <= to_date.date():
+        for index, emp_code in enumerate(emp_codes):
+            login_time = datetime.combine(current_date, datetime.min.time()) + timedelta(
+                hours=9, minutes=index % 45
+            )
+            for offset in offsets:
+                punch_time = login_time + offset
+                if from_date <= punch_time <= to_date:
+                    yield f"{emp_code}\t{punch_time:%Y-%m-%d %H:%M:%S}"
+        current_date += timedelta(days=1)
+
+
+class StubDeviceServer:
+    """
+    Local stand-in for a biometric device speaking the `GetTransactionsLog` SOAP
+    contract. Every request is counted so callers can measure SOAP round-trips, and
+    the most requests ever handled at once is kept in `peak_in_flight`.
+    `latency` delays each response and `failure_rate` answers that share of requests
+    with an HTTP 500 SOAP fault; `seed` makes the injected failures reproducible.
+    With a `barrier` every request waits for the others sharing it before answering.
+
+    Usage:
+        with StubDeviceServer(emp_codes=["101", "102"]) as device:
+            device_instance.api_link = device.url
+    """
+
+    def __init__(
+        self,
+        emp_codes,
+        latency=0,
+        failure_rate=0,
+        punches_per_day=2,
+        seed=None,
+        barrier=None,
+        host="127.0.0.1",
+        port=0,
+    ):
+        self.emp_codes = list(emp_codes)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.punches_per_day = punches_per_day
+        self.barrier = barrier
+        self.request_count = 0
+        self.failure_count = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._build_handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/iclock/WebAPIService.asmx"
+
+    def build_response(self, body):
+        from_date = _parse_request_date(_read_tag(body, "FromDateTime"))
+        to_date = _parse_request_date(_read_tag(body, "ToDateTime"))
+        if from_date is None or to_date is None:
+            data = ""
+        else:
+            data = "\n".join(
+                generate_punch_lines(self.emp_codes, from_date, to_date, self.punches_per_day)
+            )
+        return SOAP_RESPONSE_TEMPLATE.format(data=escape(data))
+
+    def _build_handler(self):
+        device = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                with device._lock:
+                    device.request_count += 1
+                    failed = device._random.random() < device.failure_rate
+                    if failed:
+                        device.failure_count += 1
+                    device.in_flight += 1
+                    device.peak_in_flight = max(device.peak_in_flight, device.in_flight)
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                    body = self.rfile.read(length).decode("utf-8")
+                    if device.barrier is not None:
+                        device.barrier.wait()
+                    if device.latency:
+                        time.sleep(device.latency)
+                finally:
+                    with device._lock:
+                        device.in_flight -= 1
+                if failed:
+                    payload = SOAP_FAULT_TEMPLATE.format(message="Device unavailable").encode("utf-8")
+                    status = 500
+                else:
+                    payload = device.build_response(body).encode("utf-8")
+                    status = 200
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "text/xml; charset=utf-8")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up waiting, as it does when testing timeouts
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
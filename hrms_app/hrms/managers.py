@@ -2,6 +2,7 @@ from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from datetime import datetime, timedelta
 from django.utils.timezone import is_naive, make_aware
+import numpy as np
 import pytz
 
 class AttendanceStatusHandler:
@@ -191,3 +192,145 @@ class AttendanceStatusHandler:
             login_date_time.time() <= self.user_shift.grace_start_time
             and logout_date_time.time() < user_expected_logout_time
         )
+
+
+MICROSECONDS_PER_DAY = 86_400_000_000
+
+# Outcome categories, in the order AttendanceStatusHandler tests them
+ABSENT_DAY, FULL_DAY, LATE_COMING_DAY, EARLY_GOING_DAY, HALF_DAY_DAY, UNCLASSIFIED_DAY = range(6)
+
+
+def time_to_microseconds(value):
+    """Microseconds since midnight for a `datetime.time`."""
+    return ((value.hour * 60 + value.minute) * 60 + value.second) * 1_000_000 + value.microsecond
+
+
+class BatchAttendanceStatusClassifier:
+    """
+    Vectorized counterpart of `AttendanceStatusHandler` for bulk ingest.
+
+    `classify` takes parallel arrays of naive local login/logout datetimes and the shift
+    times of each row, and computes every user-day in a single NumPy pass.
+    `iter_status_data` turns the result back into the exact tuples the scalar handler
+    returns, so both paths can feed `AttendanceLogCreator`.
+    """
+
+    def __init__(self, full_day_hours, half_day_color, present_color, absent_color):
+        self.full_day_hours = full_day_hours
+        self.full_day_us = timedelta(hours=full_day_hours) // timedelta(microseconds=1)
+        # att_status, color_hex, reg_status, is_regularization, status, short_code
+        self.outcomes = {
+            ABSENT_DAY: (settings.ABSENT, absent_color.color_hex, settings.MIS_PUNCHING, True, settings.PENDING, "A"),
+            FULL_DAY: (settings.PRESENT, present_color.color_hex, None, False, None, "P"),
+            LATE_COMING_DAY: (settings.HALF_DAY, half_day_color.color_hex, settings.LATE_COMING, True, settings.PENDING, "H"),
+            EARLY_GOING_DAY: (settings.HALF_DAY, half_day_color.color_hex, settings.EARLY_GOING, True, settings.PENDING, "H"),
+            HALF_DAY_DAY: (settings.HALF_DAY, half_day_color.color_hex, None, False, None, "H"),
+            # The scalar fallthrough puts the short code in the status slot; kept for parity
+            UNCLASSIFIED_DAY: (settings.ABSENT, absent_color.color_hex, None, False, "A", None),
+        }
+
+    def classify(self, login_times, logout_times, grace_start_times, grace_end_times, end_times):
+        """
+        Shift times may be `datetime.time` sequences (one per row) or a single `time`.
+        Returns a dict of arrays: category, duration, reg_from, reg_to and reg_duration.
+        """
+        login = np.asarray(login_times, dtype="datetime64[us]")
+        logout = np.asarray(logout_times, dtype="datetime64[us]")
+        grace_start, grace_end, end = (
+            np.asarray([time_to_microseconds(value) for value in np.atleast_1d(times)], dtype=np.int64)
+            for times in (grace_start_times, grace_end_times, end_times)
+        )
+        one_us = np.timedelta64(1, "us")
+
+        login_day = login.astype("datetime64[D]").astype("datetime64[us]")
+        logout_day = logout.astype("datetime64[D]").astype("datetime64[us]")
+        login_tod = (login - login_day) // one_us
+        logout_tod = (logout - logout_day) // one_us
+        total_us = (logout - login) // one_us
+        total_hours = total_us / 1_000_000 / 3600
+        expected_logout = login + np.timedelta64(self.full_day_us, "us")
+        expected_tod = (login_tod + self.full_day_us) % MICROSECONDS_PER_DAY
+
+        category = np.select(
+            [
+                total_us == 0,
+                (login_tod <= grace_start)
+                & (total_hours >= self.full_day_hours)
+                & (logout_tod >= expected_tod),
+                (login_tod >= grace_start) & ((logout_tod < grace_end) | (logout_tod > end)),
+                (login_tod <= grace_start) & (logout_tod < expected_tod),
+                (login_tod >= grace_start) & (logout_tod < end),
+            ],
+            [ABSENT_DAY, FULL_DAY, LATE_COMING_DAY, EARLY_GOING_DAY, HALF_DAY_DAY],
+            default=UNCLASSIFIED_DAY,
+        )
+
+        not_a_time = np.datetime64("NaT", "us")
+        late_from = login_day + grace_start * one_us
+        early_to = np.where(expected_tod < end, logout_day + end * one_us, expected_logout)
+        reg_from = np.select(
+            [category == ABSENT_DAY, category == LATE_COMING_DAY, category == EARLY_GOING_DAY],
+            [login, late_from, logout],
+            default=not_a_time,
+        )
+        reg_to = np.select(
+            [
+                category == ABSENT_DAY,
+                category == LATE_COMING_DAY,
+                category == EARLY_GOING_DAY,
+                category == HALF_DAY_DAY,
+            ],
+            [expected_logout, login, early_to, expected_logout],
+            default=not_a_time,
+        )
+        has_reg_duration = (category == LATE_COMING_DAY) | (category == EARLY_GOING_DAY)
+        reg_duration = np.where(has_reg_duration, reg_to - reg_from, np.timedelta64(-1, "us")) // one_us
+
+        return {
+            "category": category,
+            "duration": total_us % MICROSECONDS_PER_DAY,
+            "reg_from": reg_from,
+            "reg_to": reg_to,
+            "reg_duration": reg_duration,
+        }
+
+    def iter_status_data(self, result):
+        """Yield `determine_attendance_status`-shaped tuples for a `classify` result."""
+        kolkata_timezone = pytz.timezone("Asia/Kolkata")
+        # localize() dominates the conversion; Asia/Kolkata has no intraday transitions,
+        # so one lookup per calendar day yields the same tzinfo make_aware would attach
+        day_tzinfos = {}
+
+        def make_local(value):
+            tzinfo = day_tzinfos.get(value.date())
+            if tzinfo is None:
+                tzinfo = make_aware(value, timezone=kolkata_timezone).tzinfo
+                day_tzinfos[value.date()] = tzinfo
+            return value.replace(tzinfo=tzinfo)
+
+        reg_from_values = result["reg_from"].astype(object)
+        reg_to_values = result["reg_to"].astype(object)
+        for category, reg_from, reg_to, reg_duration in zip(
+            result["category"].tolist(),
+            reg_from_values,
+            reg_to_values,
+            result["reg_duration"].tolist(),
+        ):
+            att_status, color_hex, reg_status, is_regularization, status, short_code = self.outcomes[category]
+            if category in (LATE_COMING_DAY, EARLY_GOING_DAY):
+                reg_from = make_local(reg_from)
+                reg_to = make_local(reg_to)
+                reg_duration = (datetime.min + timedelta(microseconds=reg_duration)).time()
+            else:
+                reg_duration = None
+            yield (
+                att_status,
+                color_hex,
+                reg_status,
+                is_regularization,
+                reg_from,
+                reg_to,
+                reg_duration,
+                status,
+                short_code,
+            )
@@ -0,0 +1,83 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from hrms_app.hrms.attendance_summary import iter_months
+from hrms_app.models import ReportSnapshot
+
+REPORT_CACHE_PREFIX = "attendance_report"
+# Version bucket bumped when a change touches every location, e.g. a holiday
+EVERY_LOCATION = "*"
+# Version bucket of reports run without a location filter
+ALL_LOCATIONS = "all"
+
+
+def get_version_key(location, month_start):
+    return f"{REPORT_CACHE_PREFIX}:version:{location}:{month_start:%Y-%m}"
+
+
+def get_report_cache_key(report, location, from_date, to_date, active):
+    """
+    Cache key of one report. It embeds the version of every month the range touches,
+    for both the report's location and all locations, so bumping a version orphans
+    exactly the cached reports that read that month.
+    """
+    location = str(location) if location else ALL_LOCATIONS
+    version_keys = []
+    for month_start, _ in iter_months(from_date, to_date):
+        version_keys += [
+            get_version_key(EVERY_LOCATION, month_start),
+            get_version_key(location, month_start),
+        ]
+    versions = cache.get_many(version_keys)
+    missing = [key for key in version_keys if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, uuid.uuid4().hex, None)
+        versions = cache.get_many(version_keys)
+    digest = hashlib.md5(
+        ":".join(versions.get(key, "") for key in version_keys).encode()
+    ).hexdigest()
+    return f"{REPORT_CACHE_PREFIX}:{report}:{location}:{from_date}:{to_date}:{int(active)}:{digest}"
+
+
+def get_cached_report(report, location, from_date, to_date, active, build, refresh=False):
+    """
+    Return the cached result of `report` for these filters, calling `build` on a miss
+    or when `refresh` is set. The key is taken before building, so a result computed
+    while a save invalidated its months is stored under the old versions and never served.
+    Without a shared cache (`REPORT_CACHE_ENABLED` off) every call builds the report.
+    """
+    if not settings.REPORT_CACHE_ENABLED:
+        return build()
+    key = get_report_cache_key(report, location, from_date, to_date, active)
+    result = None if refresh else cache.get(key)
+    if result is None:
+        result = build()
+        cache.set(key, result, settings.REPORT_CACHE_TIMEOUT)
+    return result
+
+
+def invalidate_report_cache(location_ids, from_date, to_date):
+    """
+    Drop the cached reports of `location_ids` (every location when None) for each
+    month touching `from_date`..`to_date`, and mark their snapshots stale.
+    """
+    months = list(iter_months(from_date, to_date))
+    snapshots = ReportSnapshot.objects.filter(from_date__lte=months[-1][1], to_date__gte=months[0][0])
+    if location_ids is None:
+        locations = [EVERY_LOCATION]
+    else:
+        locations = [ALL_LOCATIONS] + [str(location_id) for location_id in location_ids if location_id]
+        snapshots = snapshots.filter(location_id__in=[location_id for location_id in location_ids if location_id])
+    snapshots.filter(stale=False).update(stale=True)
+    cache.set_many(
+        {
+            get_version_key(location, month_start): uuid.uuid4().hex
+            for month_start, _ in months
+            for location in locations
+        },
+        None,
+    )
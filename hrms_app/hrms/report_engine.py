@@ -0,0 +1,249 @@
+from collections import defaultdict
+
+import pandas as pd
+from django.conf import settings
+from django.utils import timezone
+
+from hrms_app.models import AttendanceLog, Holiday, LeaveDay, UserTour
+from hrms_app.views.report_view import SANDWICHED_STATUSES, get_tour_day_durations
+
+DAY_FORMAT = "%Y-%m-%d"
+TIME_FORMAT = "%I:%M %p"
+# Sources of a day from lowest to highest precedence, as the attendance report appends them
+STATUS_SOURCES = (("sunday", "status"), ("present", "status"), ("holiday", "status"), ("tour", "tour"), ("leave", "leave"))
+
+
+def get_presence_day_status(status_entry):
+    """
+    The status a day of the detailed data counts as for the sandwich rule: the last
+    one the attendance report would list for it, or "A" when the day is empty.
+    """
+    for source, key in reversed(STATUS_SOURCES):
+        if source in status_entry:
+            return status_entry[source][key]
+    return "A"
+
+
+class ColumnarPresenceEngine:
+    """
+    Columnar counterpart of `build_monthly_presence_data`.
+
+    Every source is read with `values_list` into a frame of employee code x day rows,
+    and the precedence between sources (a leave removes the Sunday OFF and an FL
+    holiday, a later log, leave or tour replaces an earlier one on the same day) is
+    applied with de-duplication and masks over those frames. `build` returns the
+    same `{employee_code: {"YYYY-MM-DD": {source: entry}}}` structure as the row
+    engine, quirks included: log days are keyed by their UTC date and leave or tour
+    days past the range are kept. `build_sandwiched_days` applies the sandwich rule
+    over the same frames.
+    """
+
+    def __init__(self, employees, converted_from_datetime, converted_to_datetime):
+        self.employees = employees
+        self.from_date = converted_from_datetime
+        self.to_date = converted_to_datetime
+
+    def get_employee_codes(self):
+        return pd.Series(
+            self.employees.filter(personal_detail__isnull=False).values_list(
+                "personal_detail__employee_code", flat=True
+            ),
+            dtype=object,
+        ).drop_duplicates()
+
+    def get_sunday_frame(self, emp_codes):
+        days = pd.date_range(self.from_date, self.to_date)
+        sundays = days[days.weekday == 6].strftime(DAY_FORMAT)
+        return pd.MultiIndex.from_product(
+            [emp_codes, sundays], names=["emp_code", "day"]
+        ).to_frame(index=False)
+
+    def get_holiday_frame(self, emp_codes, sunday_days):
+        holidays = pd.DataFrame(
+            Holiday.objects.filter(start_date__range=[self.from_date, self.to_date]).values_list(
+                "start_date", "short_code"
+            ),
+            columns=["day", "status"],
+        )
+        holidays["day"] = [day.strftime(DAY_FORMAT) for day in holidays["day"]]
+        # A Sunday keeps its OFF; the first holiday of a date wins
+        holidays = holidays[~holidays["day"].isin(sunday_days)].drop_duplicates("day")
+        return pd.DataFrame({"emp_code": emp_codes}).merge(holidays, how="cross")
+
+    def get_log_frame(self):
+        logs = pd.DataFrame(
+            AttendanceLog.objects.filter(
+                applied_by__in=self.employees,
+                start_date__range=[self.from_date, self.to_date],
+            ).values_list(
+                "applied_by__personal_detail__employee_code",
+                "start_date",
+                "end_date",
+                "att_status_short_code",
+                "duration",
+                "regularized",
+            ),
+            columns=["emp_code", "start_date", "end_date", "status", "duration", "regularized"],
+        )
+        start_date = pd.to_datetime(logs["start_date"], utc=True)
+        end_date = pd.to_datetime(logs["end_date"], utc=True)
+        current_timezone = timezone.get_current_timezone_name()
+        logs["day"] = start_date.dt.strftime(DAY_FORMAT)
+        logs["in_time"] = start_date.dt.tz_convert(current_timezone).dt.strftime(TIME_FORMAT)
+        logs["out_time"] = end_date.dt.tz_convert(current_timezone).dt.strftime(TIME_FORMAT)
+        logs["reg"] = logs["regularized"].map({True: "R", False: ""})
+        return logs.drop_duplicates(["emp_code", "day"], keep="last")
+
+    def get_leave_frame(self):
+        leaves = pd.DataFrame(
+            LeaveDay.objects.filter(
+                leave_application__appliedBy__in=self.employees.values_list("id", flat=True),
+                leave_application__status=settings.APPROVED,
+                leave_application__startDate__range=[self.from_date, self.to_date],
+            ).values_list(
+                "leave_application__appliedBy__personal_detail__employee_code",
+                "date",
+                "is_full_day",
+                "leave_application__leave_type__leave_type_short_code",
+                "leave_application__leave_type__half_day_short_code",
+            ),
+            columns=["emp_code", "day", "is_full_day", "full_day_code", "half_day_code"],
+        )
+        leaves["day"] = [day.strftime(DAY_FORMAT) for day in leaves["day"]]
+        leaves["code"] = leaves["full_day_code"].where(
+            leaves["is_full_day"].astype(bool), leaves["half_day_code"]
+        )
+        return leaves.drop_duplicates(["emp_code", "day"], keep="last")
+
+    def get_tour_frame(self):
+        tours = list(
+            UserTour.objects.filter(
+                applied_by__in=self.employees,
+                status=settings.APPROVED,
+                start_date__range=[self.from_date, self.to_date],
+            ).values_list(
+                "pk",
+                "applied_by_id",
+                "applied_by__personal_detail__employee_code",
+                "start_date",
+                "start_time",
+                "end_date",
+                "end_time",
+                named=True,
+            )
+        )
+        tour_days = get_tour_day_durations(tours)
+        tours = pd.DataFrame(
+            [
+                (tour.applied_by__personal_detail__employee_code, day.strftime(DAY_FORMAT), code, str(duration))
+                for tour in tours
+                for day, code, duration in tour_days[tour.pk]
+            ],
+            columns=["emp_code", "day", "code", "duration"],
+        )
+        return tours.drop_duplicates(["emp_code", "day"], keep="last")
+
+    def get_frames(self, emp_codes):
+        """The Sunday, holiday, log, leave and tour frames, with leave precedence applied."""
+        sundays = self.get_sunday_frame(emp_codes)
+        holidays = self.get_holiday_frame(emp_codes, sundays["day"].unique())
+        logs = self.get_log_frame()
+        leaves = self.get_leave_frame()
+        tours = self.get_tour_frame()
+
+        # A leave clears the Sunday OFF and an FL holiday of its day
+        leave_keys = pd.MultiIndex.from_frame(leaves[["emp_code", "day"]])
+        sundays = sundays[~pd.MultiIndex.from_frame(sundays[["emp_code", "day"]]).isin(leave_keys)]
+        holidays = holidays[
+            ~(
+                pd.MultiIndex.from_frame(holidays[["emp_code", "day"]]).isin(leave_keys)
+                & (holidays["status"] == "FL")
+            )
+        ]
+        return sundays, holidays, logs, leaves, tours
+
+    def build(self):
+        sundays, holidays, logs, leaves, tours = self.get_frames(self.get_employee_codes())
+        monthly_presence_data = defaultdict(lambda: defaultdict(dict))
+        for emp_code, day in zip(sundays["emp_code"], sundays["day"]):
+            monthly_presence_data[emp_code][day]["sunday"] = {
+                "status": "OFF",
+                "in_time": None,
+                "out_time": None,
+                "total_duration": None,
+            }
+        for emp_code, day, status in zip(holidays["emp_code"], holidays["day"], holidays["status"]):
+            monthly_presence_data[emp_code][day]["holiday"] = {
+                "status": status,
+                "in_time": None,
+                "out_time": None,
+                "total_duration": None,
+            }
+        for emp_code, day, status, in_time, out_time, duration, reg in zip(
+            logs["emp_code"],
+            logs["day"],
+            logs["status"],
+            logs["in_time"],
+            logs["out_time"],
+            logs["duration"],
+            logs["reg"],
+        ):
+            monthly_presence_data[emp_code][day]["present"] = {
+                "status": status,
+                "in_time": in_time,
+                "out_time": out_time,
+                "total_duration": duration,
+                "reg": reg,
+            }
+        for emp_code, day, code in zip(leaves["emp_code"], leaves["day"], leaves["code"]):
+            monthly_presence_data[emp_code][day]["leave"] = {
+                "leave": code,
+                "in_time": None,
+                "out_time": None,
+                "total_duration": None,
+            }
+        for emp_code, day, code, duration in zip(
+            tours["emp_code"], tours["day"], tours["code"], tours["duration"]
+        ):
+            monthly_presence_data[emp_code][day]["tour"] = {
+                "tour": code,
+                "in_time": None,
+                "out_time": None,
+                "total_duration": duration,
+            }
+        return monthly_presence_data
+
+    def build_sandwiched_days(self):
+        """
+        `(employee_code, "YYYY-MM-DD")` of the OFF and FL days `apply_sandwich_rule`
+        turns into absences. The status of every day (see `get_presence_day_status`)
+        is pivoted into an employee x day matrix, and the matrix shifted a day either
+        way gives each day's neighbours; days outside the range count as absences.
+        """
+        emp_codes = self.get_employee_codes()
+        sundays, holidays, logs, leaves, tours = self.get_frames(emp_codes)
+        days = pd.date_range(self.from_date, self.to_date).strftime(DAY_FORMAT)
+        sources = pd.concat(
+            [
+                sundays.assign(status="OFF", rank=0),
+                logs[["emp_code", "day", "status"]].assign(rank=1),
+                holidays[["emp_code", "day", "status"]].assign(rank=2),
+                tours[["emp_code", "day", "code"]].rename(columns={"code": "status"}).assign(rank=3),
+                leaves[["emp_code", "day", "code"]].rename(columns={"code": "status"}).assign(rank=4),
+            ],
+            ignore_index=True,
+        )
+        statuses = (
+            sources.sort_values("rank", kind="stable")
+            .drop_duplicates(["emp_code", "day"], keep="last")
+            .pivot(index="emp_code", columns="day", values="status")
+            .reindex(index=emp_codes.tolist(), columns=days)
+            .fillna("A")
+        )
+        if statuses.empty:
+            return set()
+        previous_day = statuses.shift(1, axis=1, fill_value="A")
+        next_day = statuses.shift(-1, axis=1, fill_value="A")
+        sandwiched = statuses.isin(SANDWICHED_STATUSES) & previous_day.eq("A") & next_day.eq("A")
+        sandwiched = sandwiched.stack()
+        return set(sandwiched[sandwiched].index)
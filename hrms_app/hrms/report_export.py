@@ -0,0 +1,68 @@
+import csv
+from tempfile import NamedTemporaryFile
+
+import xlsxwriter
+from django.http import FileResponse, StreamingHttpResponse
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+class Echo:
+    """File-like object that hands every written line straight back to csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def get_export_value(value):
+    if value is None:
+        return ""
+    return value if isinstance(value, (str, int, float)) else str(value)
+
+
+def csv_response(rows, filename):
+    """Stream `rows` as CSV; each row is encoded only when the client reads it."""
+    writer = csv.writer(Echo())
+    response = StreamingHttpResponse(
+        (writer.writerow([get_export_value(value) for value in row]) for row in rows),
+        content_type="text/csv",
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def write_xlsx(rows, output, sheet_name="Sheet1"):
+    """
+    Write `rows` into an XLSX workbook in `output`, the first row bold as the header.
+    Each row is flushed to disk as soon as it is written, so memory stays flat however
+    long the report is.
+    """
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": True})
+    worksheet = workbook.add_worksheet(sheet_name)
+    header_format = workbook.add_format({"bold": True})
+    for row_index, row in enumerate(rows):
+        worksheet.write_row(
+            row_index,
+            0,
+            [get_export_value(value) for value in row],
+            header_format if row_index == 0 else None,
+        )
+    workbook.close()
+    return output
+
+
+def xlsx_response(rows, filename, sheet_name="Sheet1"):
+    """
+    Build the workbook in a temporary file and send it in chunks. The file is deleted
+    when the response is closed.
+    """
+    output = NamedTemporaryFile(suffix=".xlsx")
+    try:
+        write_xlsx(rows, output, sheet_name)
+    except BaseException:
+        output.close()
+        raise
+    output.seek(0)
+    return FileResponse(
+        output, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE
+    )
@@ -75,3 +75,4 @@ site.register_view('employee-profile/<int:pk>/', views.EmployeeProfileView, name
 ###############################################################################################
 site.register_view('attendance-report/', report_view.MonthAttendanceReportView, name='attendance_report')
 site.register_view('detailed-attendance-report/', report_view.DetailedMonthlyPresenceView, name='detailed_attendance_report')
+site.register_view('detailed-attendance-report/data/', report_view.DetailedMonthlyPresenceDataView, name='detailed_attendance_report_data')
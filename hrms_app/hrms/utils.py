@@ -1,4 +1,4 @@
-import xml.etree.ElementTree as ET
+from xml.parsers import expat
 from collections import defaultdict
 from datetime import datetime, timedelta
 from django.core.mail import send_mail
@@ -46,76 +46,97 @@ def send_email(subject, template_name, context, from_email, recipient_list):
 
 
 
-def call_soap_api(device_instance, from_date, to_date):
-    url = device_instance.api_link
-    headers = {"Content-Type": "text/xml"}
-    params = {"op": "GetTransactionsLog"}
-    attendance_start_date = device_instance.from_date if from_date is None else from_date
-    attendance_to_date = device_instance.to_date if to_date is None else to_date
-    body = f"""<?xml version="1.0" encoding="utf-8"?>
-    <soap:Envelope xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xmlns:xsd="http://www.w3.org/2001/XMLSchema" xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
-        <soap:Body>
-            <GetTransactionsLog xmlns="http://tempuri.org/">
-                <FromDateTime>{attendance_start_date}</FromDateTime>
-                <ToDateTime>{attendance_to_date}</ToDateTime>
-                <SerialNumber>{device_instance.serial_number}</SerialNumber>
-                <UserName>{device_instance.username}</UserName>
-                <UserPassword>{device_instance.password}</UserPassword>
-                <strDataList>string</strDataList>
-            </GetTransactionsLog>
-        </soap:Body>
-    </soap:Envelope>
+TRANSACTION_LOG_CHUNK_SIZE = 64 * 1024
+TRANSACTION_LOG_DATA_TAG = "http://tempuri.org/ strDataList"
+
+
+def iter_transaction_lines(chunks):
+    """
+    Incrementally parse a `GetTransactionsLog` SOAP response and yield the
+    `strDataList` payload one line at a time.
+
+    :param chunks: Iterable of bytes, e.g. `response.iter_content()`.
+    """
+    parser = expat.ParserCreate(namespace_separator=" ")
+    state = {"in_data": False, "found": False, "partial": ""}
+    lines = []
+
+    def start_element(name, attrs):
+        if name == TRANSACTION_LOG_DATA_TAG:
+            state["in_data"] = state["found"] = True
+
+    def end_element(name):
+        if name == TRANSACTION_LOG_DATA_TAG:
+            state["in_data"] = False
+            if state["partial"]:
+                lines.append(state["partial"])
+                state["partial"] = ""
+
+    def character_data(data):
+        if state["in_data"]:
+            parts = (state["partial"] + data).split("\n")
+            state["partial"] = parts.pop()
+            lines.extend(parts)
+
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    parser.CharacterDataHandler = character_data
+
+    for chunk in chunks:
+        parser.Parse(chunk, False)
+        yield from lines
+        lines.clear()
+    parser.Parse(b"", True)
+    yield from lines
+
+    if not state["found"]:
+        raise ValueError("strDataList element missing from GetTransactionsLog response")
+
+
+def parse_punch_time(value, include_seconds=True):
     """
+    Parse a device timestamp in the fixed `YYYY-MM-DD HH:MM:SS` layout.
+    Seconds are dropped when the device is not configured to report them.
+    """
+    if (
+        len(value) != 19
+        or value[4] != "-"
+        or value[7] != "-"
+        or value[10] != " "
+        or value[13] != ":"
+        or value[16] != ":"
+    ):
+        raise ValueError(f"time data {value!r} does not match format 'YYYY-MM-DD HH:MM:SS'")
+    return datetime(
+        int(value[0:4]),
+        int(value[5:7]),
+        int(value[8:10]),
+        int(value[11:13]),
+        int(value[14:16]),
+        int(value[17:19]) if include_seconds else 0,
+    )
+
 
-    try:
-        response = requests.post(url, params=params, data=body, headers=headers)
-        response.raise_for_status()  # This will raise an exception if the response status code is not 200
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Request failed: {e}")
-        return None
-
-    if response.status_code == 200:
-        try:
-            root = ET.fromstring(response.content)
-
-            # Extracting data from the response
-            log_result = root.find(".//{http://tempuri.org/}GetTransactionsLogResult").text
-            str_data_list = root.find(".//{http://tempuri.org/}strDataList").text
-
-            # Dictionary to store grouped data
-            grouped_data = defaultdict(lambda: defaultdict(list))
-
-            # Splitting and processing each line of str_data_list
-            for line in str_data_list.strip().split("\n"):
-                parts = line.split()
-                if len(parts) >= 2:
-                    emp_code = parts[0]
-                    log_time_str = " ".join(parts[1:])  # Join the remaining parts as log_time_str
-
-                    try:
-                        if not device_instance.include_seconds:
-                            # Remove the seconds part if present
-                            log_time_str = log_time_str.rsplit(":", 1)[0]
-                            time_format = "%Y-%m-%d %H:%M"
-                        else:
-                            time_format = "%Y-%m-%d %H:%M:%S"
-
-                        log_time = datetime.strptime(log_time_str, time_format)
-
-                        date_key = log_time.date()
-                        grouped_data[emp_code][date_key].append(log_time)
-                    except ValueError as e:
-                        logging.warning(f"Issue parsing line: {line}. Error: {e}")
-                else:
-                    logging.warning(f"Issue parsing line: {line}. Insufficient data.")
-
-            return grouped_data
-        except Exception as e:
-            logging.error(f"Error processing XML response: {e}")
-            return None
-    else:
-        logging.error(f"Error: Response returned with status code {response.status_code}")
-        return None
+def group_transaction_lines(lines, include_seconds):
+    """
+    Group device punch lines as `emp_code -> date -> [datetimes]`.
+    """
+    grouped_data = defaultdict(lambda: defaultdict(list))
+    for line in lines:
+        parts = line.split()
+        if not parts:
+            continue
+        if len(parts) >= 2:
+            emp_code = parts[0]
+            log_time_str = " ".join(parts[1:])  # Join the remaining parts as log_time_str
+            try:
+                log_time = parse_punch_time(log_time_str, include_seconds)
+                grouped_data[emp_code][log_time.date()].append(log_time)
+            except ValueError as e:
+                logging.warning(f"Issue parsing line: {line}. Error: {e}")
+        else:
+            logging.warning(f"Issue parsing line: {line}. Insufficient data.")
+    return grouped_data
 
 
 def is_weekend(date):
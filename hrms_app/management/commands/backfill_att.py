@@ -0,0 +1,203 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.db import transaction
+from django.utils.timezone import localtime, make_aware
+
+from hrms_app.hrms.device_client import DeviceClient
+from hrms_app.management.commands.pop_att import (
+    DEVICE_DATETIME_FORMAT,
+    Command as PopulateAttendanceCommand,
+)
+from hrms_app.models import BackfillWindow
+
+WINDOW_DAYS = {"day": 1, "week": 7}
+
+
+class DeviceBusyError(Exception):
+    """Raised when another ingest holds the device of a fetched window."""
+
+
+class Command(PopulateAttendanceCommand):
+    help = (
+        "Backfill AttendanceLog data for a long date range. The range is split into day or "
+        "week windows per device; each window is committed and checkpointed on its own, so "
+        "an interrupted backfill picks up where it stopped when run again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from-date", type=date.fromisoformat, required=True, help="First day to backfill (YYYY-MM-DD)"
+        )
+        parser.add_argument(
+            "--to-date", type=date.fromisoformat, required=True, help="Last day to backfill (YYYY-MM-DD)"
+        )
+        parser.add_argument(
+            "--window", choices=sorted(WINDOW_DAYS), default="week", help="Size of each backfill window"
+        )
+        parser.add_argument(
+            "--location", type=str, help="Only backfill users at this office location id"
+        )
+        parser.add_argument(
+            "--max-workers",
+            type=int,
+            help="Windows fetched at the same time, one per device (defaults to ATTENDANCE_DEVICE_MAX_WORKERS)",
+        )
+
+    def get_backfill_windows(self, devices, from_date, to_date, window_days):
+        """Create the checkpoint rows for every device and window; return those not yet completed."""
+        windows = self.get_windows(
+            f"{from_date} 00:00:00", f"{to_date} 23:59:59", window_days
+        )
+        bounds = [
+            (
+                make_aware(datetime.strptime(window_start, DEVICE_DATETIME_FORMAT)),
+                make_aware(datetime.strptime(window_end, DEVICE_DATETIME_FORMAT)),
+            )
+            for window_start, window_end in windows
+        ]
+        BackfillWindow.objects.bulk_create(
+            [
+                BackfillWindow(device=device, window_start=window_start, window_end=window_end)
+                for device in devices
+                for window_start, window_end in bounds
+            ],
+            ignore_conflicts=True,
+        )
+        device_map = {device.pk: device for device in devices}
+        bounds = set(bounds)
+        pending = []
+        for window in (
+            BackfillWindow.objects.filter(
+                device__in=devices, window_start__in=[window_start for window_start, _ in bounds]
+            )
+            .exclude(status=settings.COMPLETED)
+            .order_by("window_start", "device_id")
+        ):
+            # Windows of an earlier run with another --window size are not this run's
+            if (window.window_start, window.window_end) in bounds:
+                # Share one instance per device so circuit breaker state carries across windows
+                window.device = device_map[window.device_id]
+                pending.append(window)
+        return pending
+
+    def fetch_window(self, window):
+        client = DeviceClient(window.device)
+        result = client.fetch(
+            localtime(window.window_start).strftime(DEVICE_DATETIME_FORMAT),
+            localtime(window.window_end).strftime(DEVICE_DATETIME_FORMAT),
+        )
+        return client, result
+
+    def save_window(self, window, users, result):
+        """
+        Store the punches and attendance logs of one fetched window and mark it completed.
+        The device is only held while the window is written, so the incremental ingest
+        keeps running between windows; a device another run holds fails the window.
+        """
+        if not self.lock_devices([window.device]):
+            raise DeviceBusyError(f"Device {window.device.serial_number} is being ingested by another run")
+        try:
+            user_punches = []
+            for user in users:
+                emp_code = user.personal_detail.employee_code
+                if emp_code in result:
+                    user_punches.append((user, result[emp_code]))
+            existing_logs = self.get_existing_logs(user_punches)
+            attendance_logs = self.build_attendance_logs(user_punches, existing_logs)
+            with transaction.atomic():
+                self.store_punches({window.device.pk: result})
+                inserted, updated, skipped = self.save_attendance_logs(attendance_logs, existing_logs)
+                self.update_high_water_marks([window.device], self.get_last_punches({window.device.pk: result}))
+                window.status = settings.COMPLETED
+                window.punches = sum(len(log_times) for days in result.values() for log_times in days.values())
+                window.inserted, window.updated, window.skipped = inserted, updated, skipped
+                window.error = ""
+                window.save()
+        finally:
+            self.unlock_devices([window.device])
+
+    def fail_window(self, window, error):
+        window.status = settings.FAILED
+        window.error = error[:255]
+        window.save(update_fields=["status", "error", "attempts", "updated_at"])
+
+    def handle(self, *args, **options):
+        from_date, to_date = options["from_date"], options["to_date"]
+        if from_date > to_date:
+            raise CommandError("--from-date must not be after --to-date")
+        max_workers = options["max_workers"] or settings.ATTENDANCE_DEVICE_MAX_WORKERS
+        if max_workers < 1:
+            raise CommandError("--max-workers must be at least 1")
+
+        users = self.get_users(None)
+        if options["location"]:
+            users = users.filter(device_location_id=options["location"])
+        location_devices = self.get_location_devices()
+        location_users = self.group_users_by_location(users)
+        devices = [
+            location_devices[location_id]
+            for location_id in location_users
+            if location_id in location_devices
+        ]
+        if not devices:
+            self.stdout.write("No devices found for the selected users.")
+            return
+        device_users = {
+            location_devices[location_id].pk: users_at_location
+            for location_id, users_at_location in location_users.items()
+            if location_id in location_devices
+        }
+
+        queue = deque(
+            self.get_backfill_windows(devices, from_date, to_date, WINDOW_DAYS[options["window"]])
+        )
+        self.stdout.write(
+            f"Backfilling {len(queue)} windows for {len(devices)} devices from {from_date} to {to_date}..."
+        )
+        completed = failed = 0
+        # Fetches run on the pool; every database write happens on this thread
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            in_flight = {}
+            while queue or in_flight:
+                # One fetch per device at a time: the workers spread over the devices, and
+                # a device's circuit breaker state isn't read while it is being saved
+                busy_devices = {window.device_id for window in in_flight.values()}
+                for window in list(queue):
+                    if len(in_flight) >= max_workers:
+                        break
+                    if window.device_id in busy_devices:
+                        continue
+                    queue.remove(window)
+                    busy_devices.add(window.device_id)
+                    window.attempts += 1
+                    in_flight[executor.submit(self.fetch_window, window)] = window
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    window = in_flight.pop(future)
+                    label = f"{window.device.serial_number} {localtime(window.window_start):%Y-%m-%d}"
+                    try:
+                        client, result = future.result()
+                        client.save_health()
+                        if result is None:
+                            raise ValueError(client.error or "No data received")
+                        self.save_window(window, device_users[window.device.pk], result)
+                    except Exception as e:
+                        failed += 1
+                        self.fail_window(window, str(e))
+                        self.stdout.write(f"Window {label} failed: {e}")
+                    else:
+                        completed += 1
+                        self.stdout.write(
+                            f"Window {label} done: {window.inserted} inserted, "
+                            f"{window.updated} updated, {window.skipped} skipped."
+                        )
+
+        self.totals = (completed, failed)
+        self.stdout.write(
+            f"Backfill finished: {completed} windows completed, {failed} failed."
+            + (" Run the same command again to retry the failed windows." if failed else "")
+        )
@@ -0,0 +1,69 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from hrms_app.hrms.managers import AttendanceStatusHandler, BatchAttendanceStatusClassifier
+from hrms_app.models import AttendanceStatusColor, ShiftTiming
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the scalar and vectorized attendance status classifiers on synthetic user-days; "
+        "fails when the vectorized one is not faster"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000, help="Number of user-days to classify")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for the synthetic punches")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        shift = ShiftTiming(
+            start_time=datetime(2025, 1, 1, 9, 0).time(),
+            end_time=datetime(2025, 1, 1, 17, 30).time(),
+            grace_start_time=datetime(2025, 1, 1, 9, 15).time(),
+            grace_end_time=datetime(2025, 1, 1, 17, 15).time(),
+        )
+        colors = [
+            AttendanceStatusColor(status=status, color_hex=color_hex)
+            for status, color_hex in (
+                (settings.HALF_DAY, "#FFFF00"),
+                (settings.PRESENT, "#00FF00"),
+                (settings.ABSENT, "#FF0000"),
+            )
+        ]
+        full_day_hours = 8
+        logins, logouts = [], []
+        for index in range(options["rows"]):
+            login = datetime(2025, 1, 1) + timedelta(days=index % 365, seconds=rng.randrange(8 * 3600, 11 * 3600))
+            logins.append(login)
+            logouts.append(login + timedelta(seconds=rng.randrange(10 * 3600)))
+
+        started = time.perf_counter()
+        handler = AttendanceStatusHandler(shift, full_day_hours, *colors)
+        for login, logout in zip(logins, logouts):
+            expected_logout = login + timedelta(hours=full_day_hours)
+            handler.determine_attendance_status(
+                login, logout, logout - login, expected_logout.time(), expected_logout
+            )
+        scalar_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        classifier = BatchAttendanceStatusClassifier(full_day_hours, *colors)
+        result = classifier.classify(
+            logins, logouts, shift.grace_start_time, shift.grace_end_time, shift.end_time
+        )
+        batch_elapsed = time.perf_counter() - started
+        list(classifier.iter_status_data(result))
+        tuples_elapsed = time.perf_counter() - started
+
+        self.stdout.write(f"    scalar: {options['rows']} user-days in {scalar_elapsed:.3f}s")
+        self.stdout.write(
+            f"vectorized: {batch_elapsed:.3f}s ({scalar_elapsed / batch_elapsed:.1f}x), "
+            f"{tuples_elapsed:.3f}s including tuple conversion ({scalar_elapsed / tuples_elapsed:.1f}x)"
+        )
+        if tuples_elapsed >= scalar_elapsed:
+            raise CommandError("The vectorized classifier was not faster than the scalar handler.")
@@ -0,0 +1,193 @@
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import make_aware
+
+from hrms_app.hrms.device_simulator import StubDeviceServer
+from hrms_app.management.commands.pop_att import DEVICE_DATETIME_FORMAT
+from hrms_app.models import (
+    AttendanceLog,
+    AttendanceSetting,
+    AttendanceStatusColor,
+    CustomUser,
+    Department,
+    Designation,
+    DeviceInformation,
+    EmployeeShift,
+    OfficeLocation,
+    PersonalDetails,
+    PunchLog,
+    ShiftTiming,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark pop_att against a local stub device. Every device is pointed at the "
+        "stub inside a transaction that is rolled back, so no data is changed. "
+        "With --employees, synthetic users, shifts and devices are seeded first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--username", type=str, help="Benchmark ingest for a specific username"
+        )
+        parser.add_argument(
+            "--from-date", type=str, help="Start date for the attendance log"
+        )
+        parser.add_argument(
+            "--to-date", type=str, help="End date for the attendance log"
+        )
+        parser.add_argument(
+            "--employees", type=int, default=0, help="Number of synthetic employees to seed"
+        )
+        parser.add_argument(
+            "--locations", type=int, default=1, help="Number of synthetic office locations, one device each"
+        )
+        parser.add_argument(
+            "--days", type=int, default=1, help="Number of days ending today to ingest"
+        )
+        parser.add_argument(
+            "--punches-per-day", type=int, default=2, help="Punches per employee per day on the stub"
+        )
+        parser.add_argument(
+            "--latency", type=float, default=0, help="Seconds the stub waits before answering"
+        )
+        parser.add_argument(
+            "--failure-rate", type=float, default=0, help="Share of stub requests answered with a fault"
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Random seed for the injected failures"
+        )
+
+    def seed_static_data(self):
+        for status, color, color_hex in (
+            (settings.HALF_DAY, "yellow", "#FFFF00"),
+            (settings.PRESENT, "green", "#00FF00"),
+            (settings.ABSENT, "red", "#FF0000"),
+        ):
+            AttendanceStatusColor.objects.get_or_create(
+                status=status, defaults={"color": color, "color_hex": color_hex}
+            )
+        if not AttendanceSetting.objects.exists():
+            AttendanceSetting.objects.create(full_day_hours=8, half_day_hours=4)
+
+    def seed_employees(self, employees, locations, from_date, to_date):
+        """Bulk create employees spread over `locations` office locations, each with a device."""
+        shift = ShiftTiming.objects.create(
+            start_time=datetime(2000, 1, 1, 9, 0).time(),
+            end_time=datetime(2000, 1, 1, 17, 30).time(),
+            grace_start_time=datetime(2000, 1, 1, 9, 15).time(),
+            grace_end_time=datetime(2000, 1, 1, 17, 15).time(),
+        )
+        department, _ = Department.objects.get_or_create(department="Benchmark")
+        designation = Designation.objects.create(department=department, designation="Benchmark")
+        office_locations = [
+            OfficeLocation.objects.create(
+                location_name=f"Benchmark {index}", office_type=settings.HEAD_OFFICE, address="Benchmark"
+            )
+            for index in range(locations)
+        ]
+        for index, location in enumerate(office_locations):
+            DeviceInformation.objects.create(
+                device_location=location,
+                from_date=from_date,
+                to_date=to_date,
+                serial_number=f"BENCH-{index:03}",
+                username="benchmark",
+                password="benchmark",
+            )
+
+        users = CustomUser.objects.bulk_create(
+            [
+                CustomUser(
+                    username=f"benchmark{index}",
+                    first_name="Benchmark",
+                    last_name=str(index),
+                    device_location=office_locations[index % locations],
+                )
+                for index in range(employees)
+            ]
+        )
+        PersonalDetails.objects.bulk_create(
+            [
+                PersonalDetails(
+                    user=user,
+                    employee_code=f"B{index:06}",
+                    mobile_number=f"7{index:09}",
+                    official_mobile_number=f"6{index:09}",
+                    designation=designation,
+                    doj=date(2024, 1, 1),
+                )
+                for index, user in enumerate(users)
+            ]
+        )
+        EmployeeShift.objects.bulk_create(
+            [EmployeeShift(employee=user, shift_timing=shift) for user in users]
+        )
+
+    def handle(self, *args, **options):
+        today = datetime.now()
+        first_day = today - timedelta(days=options["days"] - 1)
+        from_date = options["from_date"] or first_day.strftime("%Y-%m-%d 00:01:00")
+        to_date = options["to_date"] or today.strftime("%Y-%m-%d 23:59:00")
+
+        with transaction.atomic():
+            if options["employees"]:
+                self.seed_static_data()
+                self.seed_employees(
+                    options["employees"],
+                    max(options["locations"], 1),
+                    make_aware(datetime.strptime(from_date, DEVICE_DATETIME_FORMAT)),
+                    make_aware(datetime.strptime(to_date, DEVICE_DATETIME_FORMAT)),
+                )
+            emp_codes = list(
+                PersonalDetails.objects.exclude(employee_code__isnull=True).values_list(
+                    "employee_code", flat=True
+                )
+            )
+            device = StubDeviceServer(
+                emp_codes=emp_codes,
+                latency=options["latency"],
+                failure_rate=options["failure_rate"],
+                punches_per_day=options["punches_per_day"],
+                seed=options["seed"],
+            )
+            with device:
+                device_count = DeviceInformation.objects.update(api_link=device.url)
+                logs_before = AttendanceLog.objects.count()
+                punches_before = PunchLog.objects.count()
+
+                tracemalloc.start()
+                started = time.perf_counter()
+                with CaptureQueriesContext(connection) as queries:
+                    call_command(
+                        "pop_att",
+                        username=options["username"],
+                        from_date=from_date,
+                        to_date=to_date,
+                        stdout=StringIO(),
+                    )
+                elapsed = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                logs_written = AttendanceLog.objects.count() - logs_before
+                punches_written = PunchLog.objects.count() - punches_before
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"Employees: {len(emp_codes)}")
+        self.stdout.write(f"Devices: {device_count}")
+        self.stdout.write(f"SOAP round-trips: {device.request_count} ({device.failure_count} failed)")
+        self.stdout.write(f"DB queries: {len(queries)}")
+        self.stdout.write(f"Rows written: {logs_written} attendance logs, {punches_written} punches")
+        self.stdout.write(f"Peak memory: {peak / 1024 / 1024:.1f} MB")
+        self.stdout.write(f"Wall time: {elapsed:.3f}s")
+        self.stdout.write(self.style.SUCCESS("Benchmark completed, changes rolled back."))
@@ -0,0 +1,181 @@
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.timezone import make_aware
+
+from hrms_app.hrms.report_engine import ColumnarPresenceEngine
+from hrms_app.models import (
+    AttendanceLog,
+    CustomUser,
+    Department,
+    Designation,
+    Holiday,
+    LeaveApplication,
+    LeaveDay,
+    LeaveType,
+    PersonalDetails,
+    UserTour,
+)
+from hrms_app.views.report_view import build_monthly_presence_data
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the row-by-row detailed attendance merge with the columnar engine and "
+        "check that both build the same data. Synthetic employees, logs, leaves, tours and "
+        "holidays are seeded inside a transaction that is rolled back, so no data is changed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--employees", type=int, default=1000, help="Number of synthetic employees to seed"
+        )
+        parser.add_argument(
+            "--days", type=int, default=90, help="Number of report days, starting on --from-date"
+        )
+        parser.add_argument(
+            "--from-date", type=date.fromisoformat, default=date(2025, 1, 1), help="First report day"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=3, help="Runs per engine; the best time is reported"
+        )
+
+    def seed(self, employees, from_date, days):
+        department, _ = Department.objects.get_or_create(department="Benchmark")
+        designation = Designation.objects.create(department=department, designation="Benchmark")
+        users = CustomUser.objects.bulk_create(
+            [
+                CustomUser(username=f"benchmark{index}", first_name="Benchmark", last_name=str(index))
+                for index in range(employees)
+            ]
+        )
+        PersonalDetails.objects.bulk_create(
+            [
+                PersonalDetails(
+                    user=user,
+                    employee_code=f"B{index:06}",
+                    mobile_number=f"7{index:09}",
+                    official_mobile_number=f"6{index:09}",
+                    designation=designation,
+                    doj=from_date - timedelta(days=365),
+                )
+                for index, user in enumerate(users)
+            ]
+        )
+        leave_type, _ = LeaveType.objects.get_or_create(
+            leave_type=settings.UP,
+            defaults={"leave_type_short_code": "BLWP", "half_day_short_code": "BLWP/2"},
+        )
+        report_days = [from_date + timedelta(days=day) for day in range(days)]
+        Holiday.objects.bulk_create(
+            [
+                Holiday(title=f"Benchmark {day}", short_code="FL", start_date=day, color_hex="#FFA500")
+                for day in report_days[10::30]
+            ]
+        )
+        # Bulk created, so none of the attendance, leave or tour signals fire
+        AttendanceLog.objects.bulk_create(
+            [
+                AttendanceLog(
+                    applied_by=user,
+                    title=f"Benchmark {index} {day}",
+                    slug=f"benchmark-{index}-{day}",
+                    start_date=make_aware(datetime.combine(day, dt_time(9, (index + day.day) % 30))),
+                    end_date=make_aware(datetime.combine(day, dt_time(17, 40))),
+                    duration=dt_time(8, 10),
+                    att_status=settings.PRESENT,
+                    att_status_short_code="P",
+                    color_hex="#00FF00",
+                )
+                for index, user in enumerate(users)
+                for day in report_days
+                if day.weekday() != 6 and (index + day.day) % 10
+            ],
+            batch_size=1000,
+        )
+        applications = LeaveApplication.objects.bulk_create(
+            [
+                LeaveApplication(
+                    leave_type=leave_type,
+                    applicationNo=f"benchmark-{index}-{day}",
+                    appliedBy=user,
+                    startDate=make_aware(datetime.combine(day, dt_time.min)),
+                    endDate=make_aware(datetime.combine(day + timedelta(days=2), dt_time.min)),
+                    usedLeave=3,
+                    balanceLeave=0,
+                    status=settings.APPROVED,
+                    slug=f"benchmark-{index}-{day}",
+                )
+                for index, user in enumerate(users)
+                for day in report_days[index % 20 :: 30]
+            ],
+            batch_size=1000,
+        )
+        LeaveDay.objects.bulk_create(
+            [
+                LeaveDay(
+                    leave_application=application,
+                    date=application.startDate.date() + timedelta(days=offset),
+                    is_full_day=offset != 2,
+                )
+                for application in applications
+                for offset in range(3)
+            ],
+            batch_size=1000,
+        )
+        UserTour.objects.bulk_create(
+            [
+                UserTour(
+                    applied_by=user,
+                    from_destination="HQ",
+                    to_destination="Plant",
+                    start_date=day,
+                    start_time=dt_time(10, 0),
+                    end_date=day + timedelta(days=1),
+                    end_time=dt_time(16, 0),
+                    status=settings.APPROVED,
+                    slug=f"benchmark-tour-{index}-{day}",
+                )
+                for index, user in enumerate(users)
+                for day in report_days[(index + 5) % 25 :: 45]
+            ],
+            batch_size=1000,
+        )
+        return CustomUser.objects.filter(pk__in=[user.pk for user in users])
+
+    def measure(self, label, build, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = build()
+            timings.append(time.perf_counter() - started)
+        self.stdout.write(f"{label:>8}: {min(timings):.3f}s")
+        return result, min(timings)
+
+    def handle(self, *args, **options):
+        from_date = options["from_date"]
+        to_date = from_date + timedelta(days=options["days"] - 1)
+        from_str, to_str = from_date.strftime("%Y-%m-%d"), to_date.strftime("%Y-%m-%d")
+
+        with transaction.atomic():
+            employees = self.seed(options["employees"], from_date, options["days"])
+            self.stdout.write(f"Employees: {options['employees']}, days: {options['days']}")
+            rows, row_time = self.measure(
+                "rows",
+                lambda: build_monthly_presence_data(employees, from_str, to_str),
+                options["repeat"],
+            )
+            columns, column_time = self.measure(
+                "columnar",
+                lambda: ColumnarPresenceEngine(employees, from_str, to_str).build(),
+                options["repeat"],
+            )
+            transaction.set_rollback(True)
+
+        if columns != rows:
+            raise CommandError("The columnar engine built different data than the row engine.")
+        self.stdout.write(f"Speed-up: {row_time / column_time:.1f}x, identical output")
+        self.stdout.write(self.style.SUCCESS("Benchmark completed, changes rolled back."))
@@ -0,0 +1,158 @@
+import json
+import time
+import tracemalloc
+from datetime import date, time as dt_time, timedelta
+from io import BytesIO
+
+import pandas as pd
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from hrms_app.models import (
+    AttendanceDaySummary,
+    CustomUser,
+    Department,
+    Designation,
+    OfficeLocation,
+    PersonalDetails,
+)
+from hrms_app.views.report_view import (
+    get_monthly_presence_export,
+    get_monthly_presence_html_table,
+    get_monthly_presence_page,
+    iter_monthly_presence_html,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the HTML round-trip export of the detailed attendance report with the "
+        "direct XLSX and CSV exports, and time the streamed HTML table and the first lazily loaded page. Synthetic employees and day summaries are seeded "
+        "inside a transaction that is rolled back, so no data is changed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--employees", type=int, default=1000, help="Number of synthetic employees to seed"
+        )
+        parser.add_argument(
+            "--days", type=int, default=31, help="Number of report days, starting on --from-date"
+        )
+        parser.add_argument(
+            "--from-date", type=date.fromisoformat, default=date(2025, 1, 1), help="First report day"
+        )
+
+    def seed_employees(self, employees, from_date, days):
+        location = OfficeLocation.objects.create(
+            location_name="Benchmark", office_type=settings.HEAD_OFFICE, address="Benchmark"
+        )
+        department, _ = Department.objects.get_or_create(department="Benchmark")
+        designation = Designation.objects.create(department=department, designation="Benchmark")
+        users = CustomUser.objects.bulk_create(
+            [
+                CustomUser(
+                    username=f"benchmark{index}",
+                    first_name="Benchmark",
+                    last_name=str(index),
+                    device_location=location,
+                )
+                for index in range(employees)
+            ]
+        )
+        PersonalDetails.objects.bulk_create(
+            [
+                PersonalDetails(
+                    user=user,
+                    employee_code=f"B{index:06}",
+                    mobile_number=f"7{index:09}",
+                    official_mobile_number=f"6{index:09}",
+                    designation=designation,
+                    doj=from_date - timedelta(days=365),
+                )
+                for index, user in enumerate(users)
+            ]
+        )
+        AttendanceDaySummary.objects.bulk_create(
+            [
+                AttendanceDaySummary(
+                    employee=user,
+                    date=from_date + timedelta(days=day),
+                    status="P",
+                    color="#00FF00",
+                    in_time=dt_time(9, (index + day) % 30),
+                    out_time=dt_time(17, 40),
+                    duration=dt_time(8, 10),
+                )
+                for index, user in enumerate(users)
+                for day in range(days)
+            ],
+            batch_size=1000,
+        )
+        return location
+
+    def measure(self, label, export):
+        tracemalloc.start()
+        started = time.perf_counter()
+        size = export()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.stdout.write(
+            f"{label:>12}: {elapsed:.3f}s, peak memory {peak / 1024 / 1024:.1f} MB, {size / 1024:.0f} KB"
+        )
+
+    def handle(self, *args, **options):
+        from_date = options["from_date"]
+        to_date = from_date + timedelta(days=options["days"] - 1)
+        from_str, to_str = from_date.strftime("%Y-%m-%d"), to_date.strftime("%Y-%m-%d")
+
+        def html_round_trip():
+            table_data = get_monthly_presence_html_table(from_str, to_str, True, location)
+            df = pd.read_html(table_data)[0]
+            output = BytesIO()
+            with pd.ExcelWriter(output, engine="xlsxwriter") as excel_writer:
+                df.to_excel(excel_writer, index=False, sheet_name="Sheet1")
+            return output.getbuffer().nbytes
+
+        def direct_xlsx():
+            response = get_monthly_presence_export(from_str, to_str, True, location, "xlsx")
+            size = sum(len(chunk) for chunk in response.streaming_content)
+            response.close()
+            return size
+
+        def streamed_csv():
+            response = get_monthly_presence_export(from_str, to_str, True, location, "csv")
+            return sum(len(chunk) for chunk in response.streaming_content)
+
+        def streamed_html():
+            started = time.perf_counter()
+            size = 0
+            for index, chunk in enumerate(
+                iter_monthly_presence_html(from_str, to_str, True, location)
+            ):
+                size += len(chunk)
+                # The first chunk is the table header, the second the first employee
+                if index == 1:
+                    first_rows.append(time.perf_counter() - started)
+            return size
+
+        def first_page():
+            page = get_monthly_presence_page(from_str, to_str, True, location, 1)
+            return len(json.dumps(page, cls=DjangoJSONEncoder))
+
+        first_rows = []
+        with transaction.atomic():
+            location = str(self.seed_employees(options["employees"], from_date, options["days"]).pk)
+            self.stdout.write(f"Employees: {options['employees']}, days: {options['days']}")
+            self.measure("HTML + pandas", html_round_trip)
+            self.measure("direct XLSX", direct_xlsx)
+            self.measure("CSV stream", streamed_csv)
+            self.measure("HTML stream", streamed_html)
+            if first_rows:
+                self.stdout.write(f"{'':>12}  first employee rendered after {first_rows[0] * 1000:.1f}ms")
+            self.measure("JSON page 1", first_page)
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS("Benchmark completed, changes rolled back."))
@@ -0,0 +1,83 @@
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+
+from hrms_app.hrms.device_simulator import SOAP_RESPONSE_TEMPLATE, generate_punch_lines
+from hrms_app.hrms.utils import (
+    TRANSACTION_LOG_CHUNK_SIZE,
+    group_transaction_lines,
+    iter_transaction_lines,
+)
+
+
+def parse_in_memory(payload, include_seconds):
+    """The previous parser: whole document tree, one big string split, strptime per line."""
+    root = ET.fromstring(payload)
+    str_data_list = root.find(".//{http://tempuri.org/}strDataList").text
+    time_format = "%Y-%m-%d %H:%M:%S" if include_seconds else "%Y-%m-%d %H:%M"
+    grouped_data = defaultdict(lambda: defaultdict(list))
+    for line in str_data_list.strip().split("\n"):
+        parts = line.split()
+        log_time_str = " ".join(parts[1:])
+        if not include_seconds:
+            log_time_str = log_time_str.rsplit(":", 1)[0]
+        log_time = datetime.strptime(log_time_str, time_format)
+        grouped_data[parts[0]][log_time.date()].append(log_time)
+    return grouped_data
+
+
+def parse_streaming(payload, include_seconds):
+    chunks = (
+        payload[offset : offset + TRANSACTION_LOG_CHUNK_SIZE]
+        for offset in range(0, len(payload), TRANSACTION_LOG_CHUNK_SIZE)
+    )
+    return group_transaction_lines(iter_transaction_lines(chunks), include_seconds)
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark the GetTransactionsLog parsers on a synthetic payload"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--punches", type=int, default=1_000_000, help="Number of punches in the payload"
+        )
+        parser.add_argument(
+            "--employees", type=int, default=1000, help="Number of distinct employee codes"
+        )
+
+    def build_payload(self, punches, employees):
+        # Two punches per employee per day
+        days = max(1, punches // (employees * 2))
+        emp_codes = [str(1000 + index) for index in range(employees)]
+        from_date = datetime(2025, 1, 1)
+        to_date = from_date + timedelta(days=days) - timedelta(seconds=1)
+        data = "\n".join(generate_punch_lines(emp_codes, from_date, to_date))
+        return SOAP_RESPONSE_TEMPLATE.format(data=data).encode("utf-8")
+
+    def measure(self, parser, payload):
+        started = time.perf_counter()
+        result = parser(payload, include_seconds=False)
+        elapsed = time.perf_counter() - started
+        punches = sum(len(times) for days in result.values() for times in days.values())
+        del result
+
+        tracemalloc.start()
+        parser(payload, include_seconds=False)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return elapsed, peak, punches
+
+    def handle(self, *args, **options):
+        payload = self.build_payload(options["punches"], options["employees"])
+        self.stdout.write(f"Payload: {len(payload) / 1024 / 1024:.1f} MB")
+
+        for name, parser in (("in-memory", parse_in_memory), ("streaming", parse_streaming)):
+            elapsed, peak, punches = self.measure(parser, payload)
+            self.stdout.write(
+                f"{name:>10}: {punches} punches in {elapsed:.2f}s, "
+                f"peak memory {peak / 1024 / 1024:.1f} MB"
+            )
@@ -1,21 +1,77 @@
 from django.utils.text import slugify
-from hrms_app.models import AttendanceLog,AttendanceStatusColor,AttendanceSetting,EmployeeShift
-from hrms_app.hrms.managers import AttendanceStatusHandler
-from hrms_app.hrms.utils import call_soap_api
+from hrms_app.models import AttendanceLog
+from hrms_app.hrms.attendance_context import AttendanceContext
+from hrms_app.hrms.attendance_summary import dispatch_summary_refresh, queue_summary_refresh
+from hrms_app.hrms.managers import BatchAttendanceStatusClassifier
+from hrms_app.hrms.device_client import fetch_device_logs
 from hrms_app.models import (
+    AttendanceSyncJob,
     DeviceInformation,
+    IngestCheckpoint,
+    LockStatus,
+    PunchLog,
 )
+from collections import defaultdict
 from datetime import datetime, timedelta
-from django.utils.timezone import make_aware
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import localtime, make_aware, make_naive
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
 import pytz
 from django.contrib.auth import get_user_model
 from django.conf import settings
 
 User = get_user_model()
 
+DEVICE_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Computed columns refreshed when a stored day is re-ingested
+ATTENDANCE_LOG_UPDATE_FIELDS = [
+    "start_date",
+    "end_date",
+    "duration",
+    "is_regularisation",
+    "reg_status",
+    "att_status",
+    "att_status_short_code",
+    "from_date",
+    "to_date",
+    "reg_duration",
+    "status",
+    "color_hex",
+]
+
+# Rows a reviewer has already acted on are never overwritten by a re-sync
+PROTECTED_LOG_STATUSES = (
+    settings.APPROVED,
+    settings.RECOMMEND,
+    settings.NOT_RECOMMEND,
+    settings.REJECTED,
+)
+
+ATTENDANCE_LOG_BATCH_SIZE = 500
+
+# Days fetched, computed and committed together; bounds memory on long ranges
+DEFAULT_CHUNK_DAYS = 7
+
 class Command(BaseCommand):
     help = "Populate AttendanceLog data from API and Holidays"
+    job = None
+    # Filled by handle() so callers holding the command instance can read the outcome
+    totals = (0, 0, 0)
+    failed_devices = ()
+    # Set once a window queued summaries; they are rebuilt once the whole run is over
+    summaries_queued = False
+
+    def execute(self, *args, **options):
+        try:
+            return super().execute(*args, **options)
+        finally:
+            if self.summaries_queued:
+                self.summaries_queued = False
+                dispatch_summary_refresh()
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -27,100 +83,441 @@ class Command(BaseCommand):
         parser.add_argument(
             "--to-date", type=str, help="End date for the attendance log"
         )
-    def fetch_static_data(self):
-        half_day_color = AttendanceStatusColor.objects.get(status=settings.HALF_DAY)
-        present_color = AttendanceStatusColor.objects.get(status=settings.PRESENT)
-        absent_color = AttendanceStatusColor.objects.get(status=settings.ABSENT)
-        asettings = AttendanceSetting.objects.first()
-        return half_day_color, present_color, absent_color, asettings
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Only fetch punches newer than each device's last ingested punch",
+        )
+        parser.add_argument(
+            "--chunk-days",
+            type=int,
+            default=DEFAULT_CHUNK_DAYS,
+            help="Split the range into windows of this many days, each committed on its own",
+        )
+        parser.add_argument(
+            "--no-resume",
+            action="store_true",
+            help="Ignore the checkpoint left by an interrupted run of the same range",
+        )
+        parser.add_argument(
+            "--job-id", type=str, help="AttendanceSyncJob that receives progress updates"
+        )
+        parser.add_argument(
+            "--location", type=str, help="Only populate attendance for users at this office location id"
+        )
 
     def get_users(self, username):
         if username is not None and username != 'None':  # Check for None and 'None' string explicitly
             return User.objects.filter(username=username).select_related("personal_detail")
         return User.objects.all().select_related("personal_detail")
     
-    def get_user_shift(self, user):
-        emp_shift = (
-            EmployeeShift.objects.filter(employee=user)
-            .select_related("shift_timing")
-            .first()
+    def get_location_devices(self):
+        """Map each office location to the first device registered for it."""
+        location_devices = {}
+        for device in DeviceInformation.objects.order_by("pk"):
+            location_devices.setdefault(device.device_location_id, device)
+        return location_devices
+
+    def group_users_by_location(self, users):
+        """Group users by device location so each device log is downloaded once."""
+        location_users = defaultdict(list)
+        for user in users:
+            location_users[user.device_location_id].append(user)
+        return location_users
+
+    def get_incremental_ranges(self, devices):
+        """Fetch window per device: from its last ingested punch up to now."""
+        current_time = localtime()
+        start_of_day = current_time.replace(hour=0, minute=0, second=0, microsecond=0)
+        date_ranges = {}
+        for device in devices:
+            since = localtime(device.last_punch_at) if device.last_punch_at else start_of_day
+            date_ranges[device.pk] = (
+                since.strftime(DEVICE_DATETIME_FORMAT),
+                current_time.strftime(DEVICE_DATETIME_FORMAT),
+            )
+        return date_ranges
+
+    def lock_devices(self, devices):
+        """
+        Claim each device for this run and return the ones claimed. A device another
+        run still holds is left out; an expired claim is taken over.
+        """
+        current_time = timezone.now()
+        locked_until = current_time + timedelta(seconds=settings.ATTENDANCE_INGEST_LOCK_TIMEOUT)
+        return [
+            device
+            for device in devices
+            if DeviceInformation.objects.filter(pk=device.pk)
+            .filter(Q(ingest_locked_until__isnull=True) | Q(ingest_locked_until__lte=current_time))
+            .update(ingest_locked_until=locked_until)
+        ]
+
+    def unlock_devices(self, devices):
+        DeviceInformation.objects.filter(pk__in=[device.pk for device in devices]).update(
+            ingest_locked_until=None
         )
-        return emp_shift.shift_timing if emp_shift else None
 
-    def handle(self, *args, **options):
-        self.stdout.write("Starting to populate AttendanceLog data...")
+    def get_last_punches(self, device_results):
+        """Latest punch seen per device in this run."""
+        last_punches = {}
+        for device_pk, result in device_results.items():
+            punches = [max(log_times) for logs in (result or {}).values() for log_times in logs.values()]
+            if punches:
+                last_punches[device_pk] = make_aware(max(punches))
+        return last_punches
 
-        # Fetch static data
-        # AttendanceLog.objects.all().delete()
-        half_day_color, present_color, absent_color, asettings = self.fetch_static_data()
-        users = self.get_users(options["username"])
-        from_date, to_date = options["from_date"], options["to_date"]
-        attendance_logs_to_create = []
+    def store_punches(self, device_results):
+        """Append every fetched punch to the raw punch table; punches already stored are ignored."""
+        punches = [
+            PunchLog(employee_code=emp_code, device_id=device_pk, punch_time=make_aware(punch_time))
+            for device_pk, result in device_results.items()
+            if result
+            for emp_code, days in result.items()
+            for log_times in days.values()
+            for punch_time in log_times
+        ]
+        PunchLog.objects.bulk_create(
+            punches, batch_size=ATTENDANCE_LOG_BATCH_SIZE, ignore_conflicts=True
+        )
+
+    def update_high_water_marks(self, devices, last_punches):
+        for device in devices:
+            last_punch_at = last_punches.get(device.pk)
+            if last_punch_at and (device.last_punch_at is None or last_punch_at > device.last_punch_at):
+                DeviceInformation.objects.filter(pk=device.pk).update(last_punch_at=last_punch_at)
+                device.last_punch_at = last_punch_at
+
+    def get_existing_logs(self, user_punches):
+        """Load the stored attendance logs for every user-day present in the fetched punches."""
+        user_ids = {user.pk for user, _ in user_punches}
+        dates = {day for _, logs in user_punches for day in logs}
+        if not user_ids:
+            return {}
+        existing_logs = AttendanceLog.objects.filter(
+            applied_by_id__in=user_ids, start_date__date__in=dates
+        )
+        return {
+            (log.applied_by_id, localtime(log.start_date).date()): log
+            for log in existing_logs
+        }
+
+    def merge_existing_punches(self, user, logs, existing_logs):
+        """
+        Fold the first and last punch of days that are already stored into the freshly
+        fetched punches, so a partial fetch still yields the full day's in and out time.
+        """
+        merged_logs = {}
+        for date, log_times in logs.items():
+            existing_log = existing_logs.get((user.pk, date))
+            if existing_log is not None:
+                log_times = sorted(
+                    log_times
+                    + [make_naive(existing_log.start_date), make_naive(existing_log.end_date)]
+                )
+            merged_logs[date] = log_times
+        return merged_logs
+
+    def is_protected_log(self, log):
+        return log.regularized or log.is_submitted or log.status in PROTECTED_LOG_STATUSES
+
+    def get_locked_periods(self):
+        """
+        Date ranges closed for payroll. Saving into them is refused by the pre_save
+        signal, which bulk writes bypass, so the upsert checks them itself.
+        """
+        return list(
+            LockStatus.objects.filter(
+                is_locked="locked", from_date__isnull=False, to_date__isnull=False
+            ).values_list("from_date", "to_date")
+        )
+
+    def assign_unique_slugs(self, logs_to_create):
+        """
+        Slugs are built from the employee's name and the date, so two employees sharing
+        a name would collide on the unique column. Those get the user id appended.
+        """
+        taken_slugs = set(
+            AttendanceLog.objects.filter(
+                slug__in=[log.slug for log in logs_to_create]
+            ).values_list("slug", flat=True)
+        )
+        for log in logs_to_create:
+            if log.slug in taken_slugs:
+                log.slug = f"{log.slug}-{log.applied_by_id}"
+            taken_slugs.add(log.slug)
+
+    def save_attendance_logs(self, attendance_logs, existing_logs):
+        """
+        Upsert the computed logs keyed on (employee, attendance date): new days are
+        inserted, changed days are updated in place and everything else is skipped,
+        including days that were regularized, submitted, already reviewed or fall in a
+        locked period. Returns the inserted, updated and skipped counts.
+        """
+        locked_periods = self.get_locked_periods()
+        logs_to_create, logs_to_update, skipped = [], [], 0
+        for log in attendance_logs:
+            day = localtime(log.start_date).date()
+            if any(from_date <= day <= to_date for from_date, to_date in locked_periods):
+                skipped += 1
+                continue
+            existing_log = existing_logs.get((log.applied_by_id, day))
+            if existing_log is None:
+                logs_to_create.append(log)
+                continue
+            changed_fields = [
+                field
+                for field in ATTENDANCE_LOG_UPDATE_FIELDS
+                if getattr(existing_log, field) != getattr(log, field)
+            ]
+            if not changed_fields or self.is_protected_log(existing_log):
+                skipped += 1
+                continue
+            for field in changed_fields:
+                setattr(existing_log, field, getattr(log, field))
+            existing_log.updated_at = timezone.now()
+            logs_to_update.append(existing_log)
+
+        with transaction.atomic():
+            self.assign_unique_slugs(logs_to_create)
+            AttendanceLog.objects.bulk_create(logs_to_create, batch_size=ATTENDANCE_LOG_BATCH_SIZE)
+            AttendanceLog.objects.bulk_update(
+                logs_to_update,
+                ATTENDANCE_LOG_UPDATE_FIELDS + ["updated_at"],
+                batch_size=ATTENDANCE_LOG_BATCH_SIZE,
+            )
+            # Bulk writes skip the model signals, so the report summaries are queued here
+            written = logs_to_create + logs_to_update
+            if written:
+                days = [localtime(log.start_date).date() for log in written]
+                queue_summary_refresh({log.applied_by_id for log in written}, min(days), max(days))
+                self.summaries_queued = True
+        return len(logs_to_create), len(logs_to_update), skipped
+
+    def build_attendance_logs(self, user_punches, existing_logs, merge_existing=True):
+        """Compute an AttendanceLog per user-day from `(user, {date: [punch times]})` pairs."""
+        # Colors, settings and every employee's shift, loaded once for the whole run
+        context = AttendanceContext()
         kolkata_tz = pytz.timezone("Asia/Kolkata")
-        # Iterate over users and match them with API result efficiently
-        if users:
-            for user in users:
-                office_location = user.device_location
-                device_instance = DeviceInformation.objects.filter(device_location=office_location).first()
-                if device_instance is None:
-                    continue
-                result = call_soap_api(device_instance=device_instance,from_date=from_date,to_date=to_date)
-                # Prepare to bulk insert attendance logs
+        log_creator = AttendanceLogCreator(kolkata_tz)
+        classifier = BatchAttendanceStatusClassifier(
+            context.asettings.full_day_hours, *context.status_colors
+        )
+        user_days = []
+        for user, logs in user_punches:
+            user_shift = context.get_user_shift(user)
+            if not user_shift:
+                self.stdout.write(f"No shift found for user: {user.get_full_name()}")
+                continue
+            if merge_existing:
+                logs = self.merge_existing_punches(user, logs, existing_logs)
+            for date, log_times in logs.items():
+                user_days.append((user, date, log_times[0], log_times[-1], user_shift))
+        if not user_days:
+            return []
 
-                emp_code = user.personal_detail.employee_code
-                if emp_code not in result:
-                    continue
-                user_shift = self.get_user_shift(user)
-                if not user_shift:
-                    self.stdout.write(f"No shift found for user: {user.get_full_name()}")
-                    continue
-
-                # Initialize the handler and creator objects
-                status_handler = AttendanceStatusHandler(
-                    user_shift,
-                    asettings.full_day_hours,
-                    half_day_color,
-                    present_color,
-                    absent_color,
+        # Classify every user-day in one vectorized pass
+        _, _, login_times, logout_times, shifts = zip(*user_days)
+        result = classifier.classify(
+            login_times,
+            logout_times,
+            [shift.grace_start_time for shift in shifts],
+            [shift.grace_end_time for shift in shifts],
+            [shift.end_time for shift in shifts],
+        )
+        durations = [
+            (datetime.min + timedelta(microseconds=duration)).time()
+            for duration in result["duration"].tolist()
+        ]
+        return [
+            log_creator.create_logs(user, date, login_date_time, logout_date_time, duration, status_data)
+            for (user, date, login_date_time, logout_date_time, _), duration, status_data in zip(
+                user_days, durations, classifier.iter_status_data(result)
+            )
+        ]
+
+    def parse_range_value(self, value):
+        """Parse a --from-date/--to-date value; None when it is missing or not a date."""
+        if not value or value == "None":
+            return None
+        try:
+            parsed = parse_datetime(value.replace("T", " "))
+            if parsed is None and parse_date(value) is not None:
+                parsed = datetime.combine(parse_date(value), datetime.min.time())
+        except ValueError:
+            return None
+        if parsed is not None and timezone.is_aware(parsed):
+            parsed = make_naive(parsed)
+        return parsed
+
+    def get_windows(self, from_date, to_date, chunk_days):
+        """
+        Split [from_date, to_date] into windows of `chunk_days` whole days. Ranges that
+        can't be parsed are passed through as a single window, as before.
+        """
+        range_start, range_end = self.parse_range_value(from_date), self.parse_range_value(to_date)
+        if range_start is None or range_end is None or chunk_days < 1:
+            return [(from_date, to_date)]
+        windows = []
+        window_start = range_start
+        while window_start <= range_end:
+            window_end = min(
+                datetime.combine(window_start.date() + timedelta(days=chunk_days - 1), datetime.max.time()).replace(
+                    microsecond=0
+                ),
+                range_end,
+            )
+            windows.append(
+                (window_start.strftime(DEVICE_DATETIME_FORMAT), window_end.strftime(DEVICE_DATETIME_FORMAT))
+            )
+            window_start = datetime.combine(window_end.date() + timedelta(days=1), datetime.min.time())
+        return windows
+
+    def get_checkpoint_key(self, username, location, from_date, to_date):
+        return f"pop_att:{username or 'all'}:{location or 'all'}:{from_date}:{to_date}"
+
+    def report_device_progress(self, devices, device_results):
+        if not self.job:
+            return
+        for device in devices:
+            result = device_results.get(device.pk)
+            if result is None:
+                self.job.record_device(
+                    device.serial_number, settings.FAILED, error=device.last_error or "No data received"
                 )
-                log_creator = AttendanceLogCreator(kolkata_tz)
+            else:
+                punches = sum(len(log_times) for days in result.values() for log_times in days.values())
+                self.job.record_device(device.serial_number, settings.COMPLETED, punches)
 
-                # Process the logs for the user
-                attendance_logs_to_create.extend(
-                    self.process_user_attendance(
-                        user, asettings, result[emp_code], log_creator, status_handler
+    def ingest_window(self, users, from_date, to_date, incremental=False, update_marks=True):
+        """
+        Fetch, compute and upsert one window. Returns the inserted, updated and skipped
+        counts; everything for the window is released before the next one starts.
+        """
+        location_devices = self.get_location_devices()
+        location_users = self.group_users_by_location(users)
+        devices = [
+            location_devices[location_id]
+            for location_id in location_users
+            if location_id in location_devices
+        ]
+        # An incremental and the nightly run must not ingest the same device at once
+        locked_devices = self.lock_devices(devices)
+        try:
+            return self.ingest_devices(
+                location_devices, location_users, locked_devices, from_date, to_date, incremental, update_marks
+            )
+        finally:
+            self.unlock_devices(locked_devices)
+
+    def ingest_devices(self, location_devices, location_users, devices, from_date, to_date, incremental, update_marks):
+        """Ingest the window from `devices`, the ones this run holds; the others are skipped."""
+        date_ranges = self.get_incremental_ranges(devices) if incremental else None
+        # Devices are fetched concurrently, so a slow device doesn't hold up the rest
+        device_results = fetch_device_logs(devices, from_date, to_date, date_ranges=date_ranges)
+        last_punches = self.get_last_punches(device_results)
+        self.report_device_progress(devices, device_results)
+
+        user_punches = []
+        for location_id, users_at_location in location_users.items():
+            device_instance = location_devices.get(location_id)
+            if device_instance is None:
+                continue
+            if device_instance not in devices:
+                self.stdout.write(f"Device {device_instance.serial_number} is being ingested by another run, skipped.")
+                self.failed_devices.append(device_instance.serial_number)
+                if self.job:
+                    self.job.record_device(
+                        device_instance.serial_number, settings.FAILED, error="Ingested by another run"
                     )
-                )
+                continue
+            result = device_results.get(device_instance.pk)
+            if result is None:
+                self.stdout.write(f"No data received from device: {device_instance.serial_number}")
+                self.failed_devices.append(device_instance.serial_number)
+                continue
 
-            # Bulk create the attendance logs
-            AttendanceLog.objects.bulk_create(attendance_logs_to_create)
-            self.stdout.write("Completed populating AttendanceLog data.")
-        else:
+            for user in users_at_location:
+                emp_code = user.personal_detail.employee_code
+                if emp_code in result:
+                    user_punches.append((user, result[emp_code]))
+
+        existing_logs = self.get_existing_logs(user_punches)
+        attendance_logs = self.build_attendance_logs(user_punches, existing_logs)
+        with transaction.atomic():
+            self.store_punches(device_results)
+            counts = self.save_attendance_logs(attendance_logs, existing_logs)
+            if update_marks:
+                self.update_high_water_marks(devices, last_punches)
+        if self.job:
+            self.job.add_counts(*counts)
+        return counts
+
+    def handle(self, *args, **options):
+        self.stdout.write("Starting to populate AttendanceLog data...")
+
+        # AttendanceLog.objects.all().delete()
+        self.job = AttendanceSyncJob.objects.get(pk=options["job_id"]) if options["job_id"] else None
+        self.failed_devices = []
+        users = self.get_users(options["username"])
+        if options["location"]:
+            users = users.filter(device_location_id=options["location"])
+        if not users:
             self.stdout.write("No Users found.")
-    def process_user_attendance(self, user, asettings, logs, log_creator, status_handler):
-        attendance_logs = []
-        full_day_hours = asettings.full_day_hours
-        for date, log_times in logs.items():
-            login_date_time, logout_date_time = log_times[0], log_times[-1]
-            total_duration = logout_date_time - login_date_time
-            duration = (datetime.min + total_duration).time()
-            user_expected_logout_date_time = login_date_time + timedelta(hours=full_day_hours)
-            user_expected_logout_time = user_expected_logout_date_time.time()
-
-            status_data = status_handler.determine_attendance_status(
-                login_date_time,
-                logout_date_time,
-                total_duration,
-                user_expected_logout_time,
-                user_expected_logout_date_time,
-            )
+            return
 
-            attendance_logs.append(
-                log_creator.create_logs(
-                    user, date, login_date_time, logout_date_time, duration, status_data
-                )
+        username = options["username"] if options["username"] != "None" else None
+        # A single user's run only processed part of each device log, so the marks stay put
+        update_marks = not username
+        if options["incremental"]:
+            windows = [(None, None)]
+        else:
+            windows = self.get_windows(options["from_date"], options["to_date"], options["chunk_days"])
+
+        checkpoint_key = self.get_checkpoint_key(
+            username, options["location"], options["from_date"], options["to_date"]
+        )
+        checkpoint = None
+        if len(windows) > 1:
+            checkpoint = IngestCheckpoint.objects.filter(key=checkpoint_key).first()
+            if checkpoint and not options["no_resume"]:
+                completed_through = make_naive(checkpoint.completed_through).strftime(DEVICE_DATETIME_FORMAT)
+                windows = [window for window in windows if window[1] > completed_through]
+                self.stdout.write(f"Resuming after checkpoint {completed_through}.")
+
+        totals = [0, 0, 0]
+        for window_from, window_to in windows:
+            if len(windows) > 1:
+                self.stdout.write(f"Processing {window_from} to {window_to}...")
+            counts = self.ingest_window(
+                users,
+                window_from,
+                window_to,
+                incremental=options["incremental"],
+                update_marks=update_marks,
             )
-        return attendance_logs
+            totals = [total + count for total, count in zip(totals, counts)]
+            # Written after the window commits; a crash in between only repeats an idempotent window.
+            # Once a device has failed the checkpoint stays put, so a rerun fetches its windows again.
+            if self.failed_devices:
+                continue
+            if checkpoint is not None or len(windows) > 1:
+                checkpoint, _ = IngestCheckpoint.objects.update_or_create(
+                    key=checkpoint_key,
+                    defaults={
+                        "completed_through": make_aware(
+                            datetime.strptime(window_to, DEVICE_DATETIME_FORMAT)
+                        )
+                    },
+                )
+        if checkpoint is not None and not self.failed_devices:
+            IngestCheckpoint.objects.filter(key=checkpoint_key).delete()
+
+        inserted, updated, skipped = self.totals = tuple(totals)
+        self.stdout.write(
+            "Completed populating AttendanceLog data: "
+            f"{inserted} inserted, {updated} updated, {skipped} skipped."
+        )
 
 class AttendanceLogCreator:
     def __init__(self, kolkata_tz):
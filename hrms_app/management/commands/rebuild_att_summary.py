@@ -0,0 +1,38 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hrms_app.hrms.attendance_summary import refresh_day_summaries
+from hrms_app.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild AttendanceDaySummary rows for every month touching the given range. "
+        "Run once after deploying the summary table; saves keep it up to date afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from-date", type=date.fromisoformat, required=True, help="First day to rebuild (YYYY-MM-DD)"
+        )
+        parser.add_argument(
+            "--to-date", type=date.fromisoformat, required=True, help="Last day to rebuild (YYYY-MM-DD)"
+        )
+        parser.add_argument(
+            "--username", type=str, help="Only rebuild the summaries of this username"
+        )
+
+    def handle(self, *args, **options):
+        from_date, to_date = options["from_date"], options["to_date"]
+        if from_date > to_date:
+            raise CommandError("--from-date must not be after --to-date")
+        employee_ids = None
+        if options["username"]:
+            employee_ids = list(
+                CustomUser.objects.filter(username=options["username"]).values_list("pk", flat=True)
+            )
+            if not employee_ids:
+                raise CommandError(f"No user named {options['username']}")
+        written = refresh_day_summaries(employee_ids, from_date, to_date)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} attendance day summaries."))
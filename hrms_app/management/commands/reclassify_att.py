@@ -0,0 +1,127 @@
+from collections import defaultdict
+from datetime import date
+
+from django.core.management.base import CommandError
+from django.db.models import Q
+from django.utils.timezone import localtime, make_naive
+
+from hrms_app.management.commands.pop_att import (
+    ATTENDANCE_LOG_BATCH_SIZE,
+    PROTECTED_LOG_STATUSES,
+    Command as PopulateAttendanceCommand,
+)
+from hrms_app.models import AttendanceLog, AttendanceSyncJob, EmployeeShift, LockStatus
+
+
+class Command(PopulateAttendanceCommand):
+    help = (
+        "Recompute att_status and color_hex of stored AttendanceLog rows from their in and "
+        "out times, after a shift or attendance setting changed. Only changed rows are written; "
+        "regularized, submitted, reviewed and locked days are left alone."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--username", type=str, help="Reclassify attendance for a specific username"
+        )
+        parser.add_argument(
+            "--shift", type=int, help="Only reclassify employees assigned to this ShiftTiming id"
+        )
+        parser.add_argument(
+            "--from-date", type=date.fromisoformat, help="First day to reclassify (YYYY-MM-DD)"
+        )
+        parser.add_argument(
+            "--to-date", type=date.fromisoformat, help="Last day to reclassify (YYYY-MM-DD)"
+        )
+        parser.add_argument(
+            "--job-id", type=str, help="AttendanceSyncJob that receives progress updates"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=ATTENDANCE_LOG_BATCH_SIZE,
+            help="Attendance logs loaded, reclassified and written together",
+        )
+
+    def get_reclassifiable_logs(self, username, shift_id, from_date, to_date):
+        """Stored punch days that may still change; rows a person has acted on are excluded."""
+        logs = AttendanceLog.objects.filter(
+            start_date__isnull=False,
+            end_date__isnull=False,
+            regularized=False,
+            is_submitted=False,
+        ).exclude(status__in=PROTECTED_LOG_STATUSES)
+        if username and username != "None":
+            logs = logs.filter(applied_by__username=username)
+        if shift_id:
+            logs = logs.filter(
+                applied_by__in=EmployeeShift.objects.filter(shift_timing_id=shift_id).values("employee")
+            )
+        if from_date:
+            logs = logs.filter(start_date__date__gte=from_date)
+        if to_date:
+            logs = logs.filter(start_date__date__lte=to_date)
+        # Locked periods are closed for payroll and refuse saves anyway
+        locked = Q()
+        for lock in LockStatus.objects.filter(
+            is_locked="locked", from_date__isnull=False, to_date__isnull=False
+        ):
+            locked |= Q(start_date__date__range=(lock.from_date, lock.to_date))
+        if locked:
+            logs = logs.exclude(locked)
+        return logs
+
+    def iter_batches(self, logs, batch_size):
+        """Walk the queryset by primary key so each batch is a fresh, bounded query."""
+        last_pk = None
+        while True:
+            batch = logs.order_by("pk")
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+            batch = list(batch.select_related("applied_by")[:batch_size])
+            if not batch:
+                return
+            yield batch
+            last_pk = batch[-1].pk
+
+    def reclassify_batch(self, batch):
+        """Rebuild the computed columns of `batch` from each row's own in and out time."""
+        existing_logs = {}
+        user_days = defaultdict(dict)
+        users = {}
+        for log in batch:
+            day = localtime(log.start_date).date()
+            existing_logs[(log.applied_by_id, day)] = log
+            users[log.applied_by_id] = log.applied_by
+            user_days[log.applied_by_id][day] = [make_naive(log.start_date), make_naive(log.end_date)]
+        user_punches = [(users[user_id], logs) for user_id, logs in user_days.items()]
+        attendance_logs = self.build_attendance_logs(user_punches, existing_logs, merge_existing=False)
+        return self.save_attendance_logs(attendance_logs, existing_logs)
+
+    def handle(self, *args, **options):
+        from_date, to_date = options["from_date"], options["to_date"]
+        if from_date and to_date and from_date > to_date:
+            raise CommandError("--from-date must not be after --to-date")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        self.job = AttendanceSyncJob.objects.get(pk=options["job_id"]) if options["job_id"] else None
+        logs = self.get_reclassifiable_logs(options["username"], options["shift"], from_date, to_date)
+        log_count = logs.count()
+        self.stdout.write(f"Reclassifying {log_count} attendance logs...")
+        if self.job:
+            self.job.total = log_count
+            self.job.save(update_fields=["total", "updated_at"])
+
+        totals = [0, 0, 0]
+        for batch in self.iter_batches(logs, options["batch_size"]):
+            counts = self.reclassify_batch(batch)
+            totals = [total + count for total, count in zip(totals, counts)]
+            if self.job:
+                self.job.add_counts(*counts)
+                self.job.add_processed(len(batch))
+
+        _, updated, skipped = self.totals = tuple(totals)
+        self.stdout.write(
+            f"Completed reclassifying AttendanceLog data: {updated} updated, {skipped} unchanged."
+        )
@@ -0,0 +1,66 @@
+from collections import defaultdict
+from datetime import date
+
+from django.core.management.base import CommandError
+from django.utils.timezone import make_naive
+
+from hrms_app.management.commands.pop_att import Command as PopulateAttendanceCommand
+from hrms_app.models import PunchLog
+
+
+class Command(PopulateAttendanceCommand):
+    help = "Rebuild AttendanceLog data for a date range from stored punches, without calling the devices"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--username", type=str, help="Recompute attendance for a specific username"
+        )
+        parser.add_argument(
+            "--from-date", type=date.fromisoformat, required=True, help="First day to recompute (YYYY-MM-DD)"
+        )
+        parser.add_argument(
+            "--to-date", type=date.fromisoformat, required=True, help="Last day to recompute (YYYY-MM-DD)"
+        )
+
+    def get_stored_punches(self, users, from_date, to_date):
+        """Group the stored punches of `users` into `(user, {date: [punch times]})` pairs."""
+        code_users = {
+            user.personal_detail.employee_code: user
+            for user in users
+            if hasattr(user, "personal_detail")
+        }
+        punches = (
+            PunchLog.objects.filter(
+                employee_code__in=code_users, punch_time__date__range=(from_date, to_date)
+            )
+            .order_by("punch_time")
+            .values_list("employee_code", "punch_time")
+        )
+        grouped = defaultdict(lambda: defaultdict(list))
+        for emp_code, punch_time in punches.iterator():
+            punch_time = make_naive(punch_time)
+            grouped[emp_code][punch_time.date()].append(punch_time)
+        return [(code_users[emp_code], logs) for emp_code, logs in grouped.items()]
+
+    def handle(self, *args, **options):
+        from_date, to_date = options["from_date"], options["to_date"]
+        if from_date > to_date:
+            raise CommandError("--from-date must not be after --to-date")
+
+        self.stdout.write(f"Recomputing AttendanceLog data from {from_date} to {to_date}...")
+        users = self.get_users(options["username"])
+        user_punches = self.get_stored_punches(users, from_date, to_date)
+        if not user_punches:
+            self.stdout.write("No stored punches found.")
+            return
+
+        existing_logs = self.get_existing_logs(user_punches)
+        # Stored punches are the complete day, so the old in and out times are not folded back in
+        attendance_logs = self.build_attendance_logs(
+            user_punches, existing_logs, merge_existing=False
+        )
+        inserted, updated, skipped = self.save_attendance_logs(attendance_logs, existing_logs)
+        self.stdout.write(
+            "Completed recomputing AttendanceLog data: "
+            f"{inserted} inserted, {updated} updated, {skipped} skipped."
+        )
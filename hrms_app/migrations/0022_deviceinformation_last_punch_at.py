@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-18 05:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hrms_app', '0021_remove_attendancelog_is_late_coming_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deviceinformation',
+            name='last_punch_at',
+            field=models.DateTimeField(blank=True, help_text='Timestamp of the latest punch ingested from this device. Incremental ingest resumes from here.', null=True, verbose_name='Last Punch At'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.16 on 2026-10-18 06:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hrms_app', '0022_deviceinformation_last_punch_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PunchLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('employee_code', models.CharField(help_text='Employee code as reported by the device.', max_length=20, verbose_name='Employee Code')),
+                ('punch_time', models.DateTimeField(verbose_name='Punch Time')),
+                ('device', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='punches', to='hrms_app.deviceinformation', verbose_name='Device')),
+            ],
+            options={
+                'verbose_name': 'Punch Log',
+                'verbose_name_plural': 'Punch Logs',
+                'db_table': 'tbl_punch_log',
+                'managed': True,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='punchlog',
+            constraint=models.UniqueConstraint(fields=('employee_code', 'punch_time'), name='unique_employee_punch'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.16 on 2026-10-18 06:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hrms_app', '0023_punchlog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='Identifies the ingest run: its users and date range.', max_length=255, unique=True, verbose_name='Key')),
+                ('completed_through', models.DateTimeField(help_text='End of the last chunk that was committed.', verbose_name='Completed Through')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Ingest Checkpoint',
+                'verbose_name_plural': 'Ingest Checkpoints',
+                'db_table': 'tbl_ingest_checkpoint',
+                'managed': True,
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.16 on 2026-10-18 06:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hrms_app', '0024_ingestcheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceSyncJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('dedup_key', models.CharField(help_text='Username and date range the job syncs.', max_length=255, verbose_name='Dedup Key')),
+                ('username', models.CharField(blank=True, max_length=150, null=True, verbose_name='Username')),
+                ('from_date', models.CharField(blank=True, max_length=30, null=True, verbose_name='From Date')),
+                ('to_date', models.CharField(blank=True, max_length=30, null=True, verbose_name='To Date')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20, verbose_name='Status')),
+                ('devices', models.JSONField(blank=True, default=dict, help_text='Per-device status and punch count, keyed by serial number.', verbose_name='Device Progress')),
+                ('inserted', models.PositiveIntegerField(default=0, verbose_name='Inserted')),
+                ('updated', models.PositiveIntegerField(default=0, verbose_name='Updated')),
+                ('skipped', models.PositiveIntegerField(default=0, verbose_name='Skipped')),
+                ('errors', models.JSONField(blank=True, default=list, verbose_name='Errors')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attendance_sync_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Requested By')),
+            ],
+            options={
+                'verbose_name': 'Attendance Sync Job',
+                'verbose_name_plural': 'Attendance Sync Jobs',
+                'db_table': 'tbl_attendance_sync_job',
+                'ordering': ['-created_at'],
+                'managed': True,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='attendancesyncjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'running'])), fields=('dedup_key',), name='unique_active_sync_job'),
+        ),
+    ]
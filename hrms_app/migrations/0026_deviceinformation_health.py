@@ -0,0 +1,48 @@
+# Generated by Django 4.2.16 on 2026-10-18 06:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hrms_app', '0025_attendancesyncjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deviceinformation',
+            name='circuit_open_until',
+            field=models.DateTimeField(blank=True, help_text='The device is not contacted before this time. Clear it to retry immediately.', null=True, verbose_name='Circuit Open Until'),
+        ),
+        migrations.AddField(
+            model_name='deviceinformation',
+            name='consecutive_failures',
+            field=models.PositiveIntegerField(default=0, help_text='Failed fetches in a row. The device is skipped for a while once this reaches the threshold.', verbose_name='Consecutive Failures'),
+        ),
+        migrations.AddField(
+            model_name='deviceinformation',
+            name='failure_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of SOAP requests to this device that failed.', verbose_name='Failure Count'),
+        ),
+        migrations.AddField(
+            model_name='deviceinformation',
+            name='last_error',
+            field=models.CharField(blank=True, default='', max_length=255, verbose_name='Last Error'),
+        ),
+        migrations.AddField(
+            model_name='deviceinformation',
+            name='last_latency_ms',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Last Latency (ms)'),
+        ),
+        migrations.AddField(
+            model_name='deviceinformation',
+            name='last_success_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Last Success At'),
+        ),
+        migrations.AddField(
+            model_name='deviceinformation',
+            name='request_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of SOAP requests sent to this device, retries included.', verbose_name='Request Count'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.16 on 2026-10-18 06:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hrms_app', '0026_deviceinformation_health'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendancesyncjob',
+            name='job_type',
+            field=models.CharField(choices=[('ingest', 'Device Ingest'), ('reclassify', 'Reclassification')], default='ingest', max_length=20, verbose_name='Job Type'),
+        ),
+        migrations.AddField(
+            model_name='attendancesyncjob',
+            name='processed',
+            field=models.PositiveIntegerField(default=0, verbose_name='Processed'),
+        ),
+        migrations.AddField(
+            model_name='attendancesyncjob',
+            name='shift_timing',
+            field=models.ForeignKey(blank=True, help_text='Limits a reclassification to employees on this shift.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sync_jobs', to='hrms_app.shifttiming', verbose_name='Shift Timing'),
+        ),
+        migrations.AddField(
+            model_name='attendancesyncjob',
+            name='total',
+            field=models.PositiveIntegerField(default=0, help_text='Attendance logs a reclassification has to look at.', verbose_name='Total'),
+        ),
+    ]
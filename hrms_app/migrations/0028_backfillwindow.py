@@ -0,0 +1,42 @@
+# Generated by Django 4.2.16 on 2026-10-18 06:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hrms_app', '0027_attendancesyncjob_reclassify'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackfillWindow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window_start', models.DateTimeField(verbose_name='Window Start')),
+                ('window_end', models.DateTimeField(verbose_name='Window End')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('punches', models.PositiveIntegerField(default=0, verbose_name='Punches')),
+                ('inserted', models.PositiveIntegerField(default=0, verbose_name='Inserted')),
+                ('updated', models.PositiveIntegerField(default=0, verbose_name='Updated')),
+                ('skipped', models.PositiveIntegerField(default=0, verbose_name='Skipped')),
+                ('error', models.CharField(blank=True, default='', max_length=255, verbose_name='Error')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('device', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='backfill_windows', to='hrms_app.deviceinformation', verbose_name='Device')),
+            ],
+            options={
+                'verbose_name': 'Backfill Window',
+                'verbose_name_plural': 'Backfill Windows',
+                'db_table': 'tbl_backfill_window',
+                'ordering': ['device', 'window_start'],
+                'managed': True,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='backfillwindow',
+            constraint=models.UniqueConstraint(fields=('device', 'window_start', 'window_end'), name='unique_backfill_window'),
+        ),
+    ]
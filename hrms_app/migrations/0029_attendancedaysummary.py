@@ -0,0 +1,44 @@
+# Generated by Django 4.2.16 on 2026-10-18 06:26
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hrms_app', '0028_backfillwindow'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceDaySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('status', models.CharField(default='A', help_text='Attendance status code shown in the detailed report.', max_length=20, verbose_name='Status')),
+                ('color', models.CharField(blank=True, default='', max_length=10, verbose_name='Color')),
+                ('in_time', models.TimeField(blank=True, null=True, verbose_name='In Time')),
+                ('out_time', models.TimeField(blank=True, null=True, verbose_name='Out Time')),
+                ('duration', models.TimeField(blank=True, null=True, verbose_name='Duration')),
+                ('leave_code', models.CharField(blank=True, default='', help_text='Leave, holiday or OFF code shown in the Leave row.', max_length=20, verbose_name='Leave Code')),
+                ('tour_code', models.CharField(blank=True, default='', max_length=20, verbose_name='Tour Code')),
+                ('regularized', models.BooleanField(default=False, verbose_name='Regularized')),
+                ('entries', models.JSONField(blank=True, default=list, help_text='Status and color badges shown for the day in the attendance report.', verbose_name='Entries')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='day_summaries', to=settings.AUTH_USER_MODEL, verbose_name='Employee')),
+            ],
+            options={
+                'verbose_name': 'Attendance Day Summary',
+                'verbose_name_plural': 'Attendance Day Summaries',
+                'db_table': 'tbl_attendance_day_summary',
+                'managed': True,
+                'indexes': [models.Index(fields=['date', 'employee'], name='tbl_attenda_date_6328b2_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='attendancedaysummary',
+            constraint=models.UniqueConstraint(fields=('employee', 'date'), name='unique_attendance_day_summary'),
+        ),
+    ]
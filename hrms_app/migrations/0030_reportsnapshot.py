@@ -0,0 +1,37 @@
+# Generated by Django 4.2.16 on 2026-10-18 06:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hrms_app', '0029_attendancedaysummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report', models.CharField(choices=[('attendance', 'Attendance Report'), ('detailed', 'Attendance Detailed Report')], max_length=20, verbose_name='Report')),
+                ('from_date', models.DateField(verbose_name='From Date')),
+                ('to_date', models.DateField(verbose_name='To Date')),
+                ('active', models.BooleanField(default=True, verbose_name='Active Employees Only')),
+                ('content', models.BinaryField(verbose_name='Content')),
+                ('computed_at', models.DateTimeField(verbose_name='Computed At')),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='report_snapshots', to='hrms_app.officelocation', verbose_name='Location')),
+            ],
+            options={
+                'verbose_name': 'Report Snapshot',
+                'verbose_name_plural': 'Report Snapshots',
+                'db_table': 'tbl_report_snapshot',
+                'managed': True,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='reportsnapshot',
+            constraint=models.UniqueConstraint(fields=('report', 'location', 'from_date', 'to_date', 'active'), name='unique_report_snapshot'),
+        ),
+    ]
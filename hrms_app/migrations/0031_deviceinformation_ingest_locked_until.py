@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-18 07:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hrms_app', '0030_reportsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deviceinformation',
+            name='ingest_locked_until',
+            field=models.DateTimeField(blank=True, help_text='Set while an ingest run is reading this device, so other runs skip it. Expires on its own if the run dies.', null=True, verbose_name='Ingest Locked Until'),
+        ),
+    ]
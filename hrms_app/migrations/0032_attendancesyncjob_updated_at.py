@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-18 07:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hrms_app', '0031_deviceinformation_ingest_locked_until'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendancesyncjob',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.16 on 2026-10-18 07:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hrms_app', '0032_attendancesyncjob_updated_at'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='attendancesyncjob',
+            name='unique_active_sync_job',
+        ),
+        migrations.AddConstraint(
+            model_name='attendancesyncjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'running'])), fields=('dedup_key', 'status'), name='unique_active_sync_job'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.16 on 2026-10-18 07:24
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hrms_app', '0033_alter_attendancesyncjob_unique_active_sync_job'),
+    ]
+
+    operations = [
+        # Rows built before the flag keep the holidays and Sundays they already show
+        migrations.AddField(
+            model_name='attendancedaysummary',
+            name='has_activity',
+            field=models.BooleanField(default=True, help_text='An attendance log, approved tour or approved leave falls on the day. The attendance report only lists holidays and Sundays for employees with activity in its range.', verbose_name='Has Activity'),
+        ),
+        migrations.AlterField(
+            model_name='attendancedaysummary',
+            name='has_activity',
+            field=models.BooleanField(default=False, help_text='An attendance log, approved tour or approved leave falls on the day. The attendance report only lists holidays and Sundays for employees with activity in its range.', verbose_name='Has Activity'),
+        ),
+        migrations.CreateModel(
+            name='SummaryRefresh',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month to rebuild.', verbose_name='Month')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('employee', models.ForeignKey(blank=True, help_text='Leave empty to rebuild the month for every employee.', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Employee')),
+            ],
+            options={
+                'verbose_name': 'Summary Refresh',
+                'verbose_name_plural': 'Summary Refreshes',
+                'db_table': 'tbl_summary_refresh',
+                'managed': True,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='summaryrefresh',
+            constraint=models.UniqueConstraint(fields=('employee', 'month'), name='unique_summary_refresh'),
+        ),
+        migrations.AddConstraint(
+            model_name='summaryrefresh',
+            constraint=models.UniqueConstraint(condition=models.Q(('employee__isnull', True)), fields=('month',), name='unique_summary_refresh_all_employees'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-18 07:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hrms_app', '0034_summary_refresh_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportsnapshot',
+            name='stale',
+            field=models.BooleanField(default=False, help_text='Attendance of the location and month changed since the snapshot was computed.', verbose_name='Stale'),
+        ),
+    ]
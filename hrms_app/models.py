@@ -11,6 +11,7 @@ from django.db import transaction, IntegrityError
 from django.utils import timezone
 from datetime import timedelta
 import uuid
+import zlib
 from django.core.validators import MinValueValidator
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
@@ -1318,6 +1319,59 @@ class DeviceInformation(models.Model):
         default="http://1.22.197.176:99/iclock/WebAPIService.asmx",  # Default link can be modified if needed
     )
     include_seconds = models.BooleanField(default=False)
+    last_punch_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name=_("Last Punch At"),
+        help_text=_(
+            "Timestamp of the latest punch ingested from this device. Incremental ingest resumes from here."
+        ),
+    )
+    request_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Request Count"),
+        help_text=_("Number of SOAP requests sent to this device, retries included."),
+    )
+    failure_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Failure Count"),
+        help_text=_("Number of SOAP requests to this device that failed."),
+    )
+    consecutive_failures = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Consecutive Failures"),
+        help_text=_("Failed fetches in a row. The device is skipped for a while once this reaches the threshold."),
+    )
+    last_latency_ms = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        verbose_name=_("Last Latency (ms)"),
+    )
+    last_error = models.CharField(
+        max_length=255,
+        blank=True,
+        default="",
+        verbose_name=_("Last Error"),
+    )
+    last_success_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name=_("Last Success At"),
+    )
+    circuit_open_until = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name=_("Circuit Open Until"),
+        help_text=_("The device is not contacted before this time. Clear it to retry immediately."),
+    )
+    ingest_locked_until = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name=_("Ingest Locked Until"),
+        help_text=_(
+            "Set while an ingest run is reading this device, so other runs skip it. Expires on its own if the run dies."
+        ),
+    )
 
     def __str__(self):
         return f"{self.serial_number} from {self.from_date} to {self.to_date}"
@@ -1329,6 +1383,293 @@ class DeviceInformation(models.Model):
         verbose_name_plural = _("Device Information Records")
 
 
+class PunchLog(models.Model):
+    """
+    Append-only store of every raw punch read from a device. AttendanceLog keeps only
+    the first and last punch of a day; this table lets it be rebuilt without a device call.
+    """
+
+    employee_code = models.CharField(
+        max_length=20,
+        verbose_name=_("Employee Code"),
+        help_text=_("Employee code as reported by the device."),
+    )
+    device = models.ForeignKey(
+        DeviceInformation,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="punches",
+        verbose_name=_("Device"),
+    )
+    punch_time = models.DateTimeField(verbose_name=_("Punch Time"))
+
+    def __str__(self):
+        return f"{self.employee_code} at {self.punch_time}"
+
+    class Meta:
+        db_table = "tbl_punch_log"
+        managed = True
+        verbose_name = _("Punch Log")
+        verbose_name_plural = _("Punch Logs")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["employee_code", "punch_time"], name="unique_employee_punch"
+            )
+        ]
+
+
+class IngestCheckpoint(models.Model):
+    """
+    Progress of a chunked attendance ingest. Each committed chunk moves
+    `completed_through` forward so an interrupted run resumes after it.
+    """
+
+    key = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name=_("Key"),
+        help_text=_("Identifies the ingest run: its users and date range."),
+    )
+    completed_through = models.DateTimeField(
+        verbose_name=_("Completed Through"),
+        help_text=_("End of the last chunk that was committed."),
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.key} through {self.completed_through}"
+
+    class Meta:
+        db_table = "tbl_ingest_checkpoint"
+        managed = True
+        verbose_name = _("Ingest Checkpoint")
+        verbose_name_plural = _("Ingest Checkpoints")
+
+
+class BackfillWindow(models.Model):
+    """
+    One device and date window of a historical backfill. Windows are marked
+    completed once their punches and attendance logs are committed, so a rerun
+    of the same range only fetches what is still pending or failed.
+    """
+
+    device = models.ForeignKey(
+        DeviceInformation,
+        on_delete=models.CASCADE,
+        related_name="backfill_windows",
+        verbose_name=_("Device"),
+    )
+    window_start = models.DateTimeField(verbose_name=_("Window Start"))
+    window_end = models.DateTimeField(verbose_name=_("Window End"))
+    status = models.CharField(
+        max_length=20,
+        choices=settings.SYNC_JOB_STATUS_CHOICES,
+        default=settings.PENDING,
+        verbose_name=_("Status"),
+    )
+    attempts = models.PositiveIntegerField(default=0, verbose_name=_("Attempts"))
+    punches = models.PositiveIntegerField(default=0, verbose_name=_("Punches"))
+    inserted = models.PositiveIntegerField(default=0, verbose_name=_("Inserted"))
+    updated = models.PositiveIntegerField(default=0, verbose_name=_("Updated"))
+    skipped = models.PositiveIntegerField(default=0, verbose_name=_("Skipped"))
+    error = models.CharField(max_length=255, blank=True, default="", verbose_name=_("Error"))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.device.serial_number} {self.window_start} - {self.window_end} ({self.status})"
+
+    class Meta:
+        db_table = "tbl_backfill_window"
+        managed = True
+        verbose_name = _("Backfill Window")
+        verbose_name_plural = _("Backfill Windows")
+        ordering = ["device", "window_start"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["device", "window_start", "window_end"],
+                name="unique_backfill_window",
+            )
+        ]
+
+
+class AttendanceSyncJob(models.Model):
+    """
+    A background attendance job: a pop_att run requested from the dashboard, or a
+    reclassification of stored logs after a shift or attendance setting changed.
+    At most one pending and one running job may exist per type, user and range.
+    A repeated ingest submission joins the active job. A reclassification only joins a
+    pending one: a running one may have read the settings before the change, so a
+    follow-up is queued and starts once it has finished. Every progress write refreshes `updated_at`; an
+    active job silent for longer than `ATTENDANCE_SYNC_JOB_STALE_AFTER` seconds is
+    taken to have lost its worker and is failed on the next submission.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    job_type = models.CharField(
+        max_length=20,
+        choices=settings.SYNC_JOB_TYPE_CHOICES,
+        default=settings.SYNC_JOB_INGEST,
+        verbose_name=_("Job Type"),
+    )
+    dedup_key = models.CharField(
+        max_length=255,
+        verbose_name=_("Dedup Key"),
+        help_text=_("Username and date range the job syncs."),
+    )
+    username = models.CharField(max_length=150, blank=True, null=True, verbose_name=_("Username"))
+    from_date = models.CharField(max_length=30, blank=True, null=True, verbose_name=_("From Date"))
+    to_date = models.CharField(max_length=30, blank=True, null=True, verbose_name=_("To Date"))
+    shift_timing = models.ForeignKey(
+        ShiftTiming,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="sync_jobs",
+        verbose_name=_("Shift Timing"),
+        help_text=_("Limits a reclassification to employees on this shift."),
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=settings.SYNC_JOB_STATUS_CHOICES,
+        default=settings.PENDING,
+        verbose_name=_("Status"),
+    )
+    devices = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name=_("Device Progress"),
+        help_text=_("Per-device status and punch count, keyed by serial number."),
+    )
+    inserted = models.PositiveIntegerField(default=0, verbose_name=_("Inserted"))
+    updated = models.PositiveIntegerField(default=0, verbose_name=_("Updated"))
+    skipped = models.PositiveIntegerField(default=0, verbose_name=_("Skipped"))
+    total = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Total"),
+        help_text=_("Attendance logs a reclassification has to look at."),
+    )
+    processed = models.PositiveIntegerField(default=0, verbose_name=_("Processed"))
+    errors = models.JSONField(default=list, blank=True, verbose_name=_("Errors"))
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="attendance_sync_jobs",
+        verbose_name=_("Requested By"),
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.dedup_key} ({self.status})"
+
+    def is_waiting_for_previous_run(self):
+        """True while another job of the same range is still running."""
+        return (
+            AttendanceSyncJob.objects.filter(dedup_key=self.dedup_key, status=settings.RUNNING)
+            .exclude(pk=self.pk)
+            .exists()
+        )
+
+    @classmethod
+    def expire_stale_jobs(cls, dedup_key):
+        """Fail the active jobs of `dedup_key` whose worker stopped reporting progress."""
+        stale_before = timezone.now() - timedelta(seconds=settings.ATTENDANCE_SYNC_JOB_STALE_AFTER)
+        for job in cls.objects.filter(
+            dedup_key=dedup_key,
+            status__in=[settings.PENDING, settings.RUNNING],
+            updated_at__lt=stale_before,
+        ):
+            job.errors.append(f"No progress since {timezone.localtime(job.updated_at)}, worker presumed lost")
+            job.status = settings.FAILED
+            job.finished_at = timezone.now()
+            job.save(update_fields=["status", "errors", "finished_at", "updated_at"])
+
+    @classmethod
+    def get_dedup_key(cls, username, from_date, to_date, job_type=settings.SYNC_JOB_INGEST, shift_timing=None):
+        dedup_key = f"{username or 'all'}:{from_date}:{to_date}"
+        if job_type != settings.SYNC_JOB_INGEST:
+            dedup_key = f"{job_type}:{shift_timing.pk if shift_timing else 'all'}:{dedup_key}"
+        return dedup_key
+
+    @classmethod
+    def submit(
+        cls,
+        username,
+        from_date,
+        to_date,
+        requested_by=None,
+        job_type=settings.SYNC_JOB_INGEST,
+        shift_timing=None,
+    ):
+        """Return `(job, created)`; an active job for the same range is reused."""
+        dedup_key = cls.get_dedup_key(username, from_date, to_date, job_type, shift_timing)
+        cls.expire_stale_jobs(dedup_key)
+        if job_type == settings.SYNC_JOB_RECLASSIFY:
+            active = [settings.PENDING]
+        else:
+            active = [settings.PENDING, settings.RUNNING]
+        job = cls.objects.filter(dedup_key=dedup_key, status__in=active).first()
+        if job:
+            return job, False
+        try:
+            with transaction.atomic():
+                job = cls.objects.create(
+                    dedup_key=dedup_key,
+                    job_type=job_type,
+                    shift_timing=shift_timing,
+                    username=username,
+                    from_date=from_date,
+                    to_date=to_date,
+                    requested_by=requested_by,
+                )
+            return job, True
+        except IntegrityError:
+            # Lost the race with an identical submission
+            return cls.objects.get(dedup_key=dedup_key, status__in=active), False
+
+    def record_device(self, serial_number, status, punches=0, error=None):
+        """Update a device's progress; punch counts accumulate across windows."""
+        previous = self.devices.get(serial_number, {})
+        self.devices[serial_number] = {
+            "status": status,
+            "punches": previous.get("punches", 0) + punches,
+        }
+        fields = ["devices", "updated_at"]
+        if error:
+            self.errors.append(f"{serial_number}: {error}")
+            fields.append("errors")
+        self.save(update_fields=fields)
+
+    def add_counts(self, inserted, updated, skipped):
+        self.inserted += inserted
+        self.updated += updated
+        self.skipped += skipped
+        self.save(update_fields=["inserted", "updated", "skipped", "updated_at"])
+
+    def add_processed(self, processed):
+        self.processed += processed
+        self.save(update_fields=["processed", "updated_at"])
+
+    class Meta:
+        db_table = "tbl_attendance_sync_job"
+        managed = True
+        verbose_name = _("Attendance Sync Job")
+        verbose_name_plural = _("Attendance Sync Jobs")
+        ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dedup_key", "status"],
+                condition=models.Q(status__in=[settings.PENDING, settings.RUNNING]),
+                name="unique_active_sync_job",
+            )
+        ]
+
+
 class LeaveDayChoiceAdjustment(models.Model):
     """
     Store different combinations of start and end day choices along with adjustment values.
@@ -2659,6 +3000,171 @@ class AttendanceLog(models.Model):
             self, action=action, action_by=performed_by, notes=comment
         )
 
+class AttendanceDaySummary(models.Model):
+    """
+    Denormalized report cell for one employee and day: the attendance log merged with
+    approved leave, approved tours, holidays and Sundays. Rows are rebuilt a whole
+    month at a time whenever one of those sources changes, so the attendance reports
+    read a single date range instead of recomputing every cell. Days with nothing
+    recorded have no row and are reported absent.
+    """
+
+    employee = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name="day_summaries",
+        verbose_name=_("Employee"),
+    )
+    date = models.DateField(verbose_name=_("Date"))
+    status = models.CharField(
+        max_length=20,
+        default="A",
+        verbose_name=_("Status"),
+        help_text=_("Attendance status code shown in the detailed report."),
+    )
+    color = models.CharField(
+        max_length=10, blank=True, default="", verbose_name=_("Color")
+    )
+    in_time = models.TimeField(blank=True, null=True, verbose_name=_("In Time"))
+    out_time = models.TimeField(blank=True, null=True, verbose_name=_("Out Time"))
+    duration = models.TimeField(blank=True, null=True, verbose_name=_("Duration"))
+    leave_code = models.CharField(
+        max_length=20,
+        blank=True,
+        default="",
+        verbose_name=_("Leave Code"),
+        help_text=_("Leave, holiday or OFF code shown in the Leave row."),
+    )
+    tour_code = models.CharField(max_length=20, blank=True, default="", verbose_name=_("Tour Code"))
+    regularized = models.BooleanField(default=False, verbose_name=_("Regularized"))
+    has_activity = models.BooleanField(
+        default=False,
+        verbose_name=_("Has Activity"),
+        help_text=_(
+            "An attendance log, approved tour or approved leave falls on the day. The attendance "
+            "report only lists holidays and Sundays for employees with activity in its range."
+        ),
+    )
+    entries = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name=_("Entries"),
+        help_text=_("Status and color badges shown for the day in the attendance report."),
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.employee} on {self.date}: {self.status}"
+
+    class Meta:
+        db_table = "tbl_attendance_day_summary"
+        managed = True
+        verbose_name = _("Attendance Day Summary")
+        verbose_name_plural = _("Attendance Day Summaries")
+        constraints = [
+            models.UniqueConstraint(fields=["employee", "date"], name="unique_attendance_day_summary")
+        ]
+        indexes = [models.Index(fields=["date", "employee"])]
+
+
+class SummaryRefresh(models.Model):
+    """
+    An employee-month whose AttendanceDaySummary rows are out of date. Rows are queued
+    in the transaction of the change and claimed by the `refresh_attendance_summaries`
+    task, so any number of changes to one employee-month before the task runs cost a
+    single rebuild. A row without an employee stands for every employee.
+    """
+
+    employee = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name="+",
+        verbose_name=_("Employee"),
+        help_text=_("Leave empty to rebuild the month for every employee."),
+    )
+    month = models.DateField(verbose_name=_("Month"), help_text=_("First day of the month to rebuild."))
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.employee or 'All employees'} for {self.month:%B %Y}"
+
+    class Meta:
+        db_table = "tbl_summary_refresh"
+        managed = True
+        verbose_name = _("Summary Refresh")
+        verbose_name_plural = _("Summary Refreshes")
+        constraints = [
+            models.UniqueConstraint(fields=["employee", "month"], name="unique_summary_refresh"),
+            models.UniqueConstraint(
+                fields=["month"],
+                condition=models.Q(employee__isnull=True),
+                name="unique_summary_refresh_all_employees",
+            ),
+        ]
+
+
+class ReportSnapshot(models.Model):
+    """
+    Rendered table of a month report for one office location, computed nightly so
+    payroll week serves a stored copy instead of rebuilding the report on every
+    request. Changes to the location and month mark it stale, and the next request
+    computes it again. The HTML repeats heavily, so it is stored zlib compressed.
+    """
+
+    report = models.CharField(
+        max_length=20, choices=settings.REPORT_TYPE_CHOICES, verbose_name=_("Report")
+    )
+    location = models.ForeignKey(
+        OfficeLocation,
+        on_delete=models.CASCADE,
+        related_name="report_snapshots",
+        verbose_name=_("Location"),
+    )
+    from_date = models.DateField(verbose_name=_("From Date"))
+    to_date = models.DateField(verbose_name=_("To Date"))
+    active = models.BooleanField(default=True, verbose_name=_("Active Employees Only"))
+    content = models.BinaryField(verbose_name=_("Content"))
+    computed_at = models.DateTimeField(verbose_name=_("Computed At"))
+    stale = models.BooleanField(
+        default=False,
+        verbose_name=_("Stale"),
+        help_text=_("Attendance of the location and month changed since the snapshot was computed."),
+    )
+
+    @property
+    def html(self):
+        return zlib.decompress(self.content).decode()
+
+    @classmethod
+    def store(cls, report, location_id, from_date, to_date, active, html):
+        snapshot, _ = cls.objects.update_or_create(
+            report=report,
+            location_id=location_id,
+            from_date=from_date,
+            to_date=to_date,
+            active=active,
+            defaults={"content": zlib.compress(html.encode()), "computed_at": timezone.now()},
+        )
+        return snapshot
+
+    def __str__(self):
+        return f"{self.get_report_display()} for {self.location} from {self.from_date} to {self.to_date}"
+
+    class Meta:
+        db_table = "tbl_report_snapshot"
+        managed = True
+        verbose_name = _("Report Snapshot")
+        verbose_name_plural = _("Report Snapshots")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["report", "location", "from_date", "to_date", "active"],
+                name="unique_report_snapshot",
+            )
+        ]
+
+
 class AttendanceLogHistory(models.Model):
     attendance_log = models.ForeignKey(AttendanceLog, on_delete=models.CASCADE, related_name='history')
     previous_data = models.JSONField()  # Store the old data
@@ -1,5 +1,5 @@
 # myapp/signals.py
-from .tasks import send_leave_application_notifications,send_tour_notifications,send_regularization_notification
+from .tasks import send_leave_application_notifications,send_tour_notifications,send_regularization_notification,run_attendance_sync_job
 from django.contrib.sites.models import Site
 from .models import LeaveApplication, UserTour, Notification,LeaveBalanceOpenings,CustomUser
 from django.contrib.contenttypes.models import ContentType
@@ -208,3 +208,91 @@ def get_instance_date(instance, sender):
         raise ImproperlyConfigured(
             f"The model {sender.__name__} does not have a recognized date field for lock validation."
         )
+
+
+from hrms_app.hrms.attendance_context import invalidate_attendance_context
+
+@receiver(post_save, sender=AttendanceStatusColor)
+@receiver(post_delete, sender=AttendanceStatusColor)
+@receiver(post_save, sender=AttendanceSetting)
+@receiver(post_delete, sender=AttendanceSetting)
+@receiver(post_save, sender=ShiftTiming)
+@receiver(post_delete, sender=ShiftTiming)
+@receiver(post_save, sender=EmployeeShift)
+@receiver(post_delete, sender=EmployeeShift)
+def reset_attendance_context(sender, instance, **kwargs):
+    """
+    Drop the cached attendance context when colors, settings or shifts change.
+    """
+    invalidate_attendance_context()
+
+
+from django.db import transaction
+
+# Fields the attendance status of a stored day is derived from
+RECLASSIFY_FIELDS = {
+    ShiftTiming: ("grace_start_time", "grace_end_time", "end_time"),
+    AttendanceSetting: ("full_day_hours",),
+}
+
+@receiver(pre_save, sender=ShiftTiming)
+@receiver(pre_save, sender=AttendanceSetting)
+def detect_classification_change(sender, instance, **kwargs):
+    """
+    Flag the instance when a field the attendance status depends on changed,
+    so post_save can queue a reclassification of the stored logs.
+    """
+    instance._reclassify_attendance = False
+    if instance.pk is None:
+        return
+    previous = sender.objects.filter(pk=instance.pk).values(*RECLASSIFY_FIELDS[sender]).first()
+    if previous is None:
+        return
+    instance._reclassify_attendance = any(
+        previous[field] != getattr(instance, field) for field in RECLASSIFY_FIELDS[sender]
+    )
+
+@receiver(post_save, sender=ShiftTiming)
+@receiver(post_save, sender=AttendanceSetting)
+def queue_attendance_reclassification(sender, instance, created, **kwargs):
+    """
+    Reclassify the stored attendance logs affected by a shift or setting change in
+    the background. A shift change only touches the employees on that shift.
+    """
+    if created or not getattr(instance, "_reclassify_attendance", False):
+        return
+    job, created = AttendanceSyncJob.submit(
+        None,
+        None,
+        None,
+        job_type=settings.SYNC_JOB_RECLASSIFY,
+        shift_timing=instance if sender is ShiftTiming else None,
+    )
+    if created:
+        transaction.on_commit(lambda: run_attendance_sync_job.delay(str(job.pk)))
+
+
+from hrms_app.hrms.attendance_summary import schedule_summary_refresh
+
+@receiver(post_save, sender=AttendanceLog)
+@receiver(post_delete, sender=AttendanceLog)
+def refresh_attendance_log_summary(sender, instance, **kwargs):
+    """Keep AttendanceDaySummary in step with the attendance log of the day."""
+    schedule_summary_refresh([instance.applied_by_id], instance.start_date, instance.start_date)
+
+@receiver(post_save, sender=LeaveApplication)
+@receiver(post_delete, sender=LeaveApplication)
+def refresh_leave_summary(sender, instance, **kwargs):
+    schedule_summary_refresh([instance.appliedBy_id], instance.startDate, instance.endDate)
+
+@receiver(post_save, sender=UserTour)
+@receiver(post_delete, sender=UserTour)
+def refresh_tour_summary(sender, instance, **kwargs):
+    end_date = max(filter(None, [instance.end_date, instance.extended_end_date]), default=None)
+    schedule_summary_refresh([instance.applied_by_id], instance.start_date, end_date)
+
+@receiver(post_save, sender=Holiday)
+@receiver(post_delete, sender=Holiday)
+def refresh_holiday_summary(sender, instance, **kwargs):
+    """A holiday shows up for every employee."""
+    schedule_summary_refresh(None, instance.start_date, instance.end_date or instance.start_date)
@@ -2,10 +2,11 @@ from .models import *
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.urls import reverse
-from celery import shared_task
+from celery import chord, shared_task
 from django.core.mail import EmailMessage
 from django.contrib.auth import get_user_model
-from django.core.management import call_command
+from django.core.management import call_command, load_command_class
+from django.db import IntegrityError, transaction
 from django.core.mail import EmailMultiAlternatives
 import base64
 from decouple import config
@@ -209,12 +210,150 @@ def send_regularization_email(subject, message, recipient_list):
         send_mail(subject, message, settings.HRMS_DEFAULT_FROM_EMAIL, recipient_list)
         logging.info("Regularization Status sent")
 
+class DeviceSyncError(Exception):
+    """Raised when a location's device returned no data, so the subtask is retried."""
+
+
 @shared_task
 def populate_attendance_log():
+    """
+    Fan the nightly ingest out into one subtask per office location with a device,
+    then aggregate their totals and precompute the month reports once all of them
+    have finished.
+    """
     now = datetime.now()
     from_date = now.strftime('%Y-%m-%d 00:01:00')
     to_date = now.strftime('%Y-%m-%d 23:59:00')
-    call_command('pop_att', '--from-date', from_date, '--to-date', to_date)
+    location_ids = (
+        DeviceInformation.objects.exclude(device_location__isnull=True)
+        .values_list('device_location_id', flat=True)
+        .distinct()
+    )
+    subtasks = [
+        populate_location_attendance_log.s(str(location_id), from_date, to_date)
+        for location_id in location_ids
+    ]
+    if not subtasks:
+        # No chord to hang the snapshots off, but the reports still need them
+        return precompute_attendance_reports()
+    return chord(subtasks)(
+        aggregate_attendance_results.s() | precompute_attendance_reports.si()
+    ).id
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def populate_location_attendance_log(self, location_id, from_date, to_date):
+    """Ingest a single location; only this location is retried if its device fails."""
+    command = load_command_class('hrms_app', 'pop_att')
+    try:
+        call_command(
+            command, '--location', location_id, '--from-date', from_date, '--to-date', to_date
+        )
+        if command.failed_devices:
+            raise DeviceSyncError(f"No data received from {', '.join(command.failed_devices)}")
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=self.default_retry_delay * 2 ** self.request.retries)
+        logging.error(f"Attendance ingest for location {location_id} failed: {e}")
+        return {'location': location_id, 'inserted': 0, 'updated': 0, 'skipped': 0, 'error': str(e)}
+    inserted, updated, skipped = command.totals
+    return {'location': location_id, 'inserted': inserted, 'updated': updated, 'skipped': skipped, 'error': None}
+
+
+@shared_task
+def aggregate_attendance_results(results):
+    """Final step of the nightly ingest: total the per-location results."""
+    totals = {
+        'locations': len(results),
+        'inserted': sum(result['inserted'] for result in results),
+        'updated': sum(result['updated'] for result in results),
+        'skipped': sum(result['skipped'] for result in results),
+        'errors': [f"{result['location']}: {result['error']}" for result in results if result['error']],
+    }
+    logging.info(
+        f"Attendance ingest finished for {totals['locations']} locations: "
+        f"{totals['inserted']} inserted, {totals['updated']} updated, {totals['skipped']} skipped, "
+        f"{len(totals['errors'])} failed."
+    )
+    return totals
+
+
+@shared_task
+def precompute_attendance_reports():
+    """Snapshot the previous and current month attendance report of every office location."""
+    from hrms_app.views.report_view import precompute_report_snapshots
+
+    stored = precompute_report_snapshots()
+    logging.info(f"Precomputed {stored} attendance report snapshots.")
+    return stored
+
+
+@shared_task
+def refresh_attendance_summaries():
+    """Rebuild the AttendanceDaySummary months queued by attendance, leave, tour and holiday changes."""
+    from hrms_app.hrms.attendance_summary import refresh_queued_summaries
+
+    written = refresh_queued_summaries()
+    if written:
+        logging.info(f"Refreshed {written} attendance day summaries.")
+    return written
+
+
+@shared_task
+def populate_attendance_log_incremental():
+    """Pull only the punches recorded since each device's last ingested punch."""
+    call_command('pop_att', '--incremental')
+
+
+@shared_task(bind=True, max_retries=None, default_retry_delay=30)
+def run_attendance_sync_job(self, job_id):
+    """
+    Run pop_att (or reclassify_att for reclassification jobs) for an AttendanceSyncJob,
+    recording progress and the outcome on the job. A follow-up job is retried until
+    the run of the same range before it has finished.
+    """
+    job = AttendanceSyncJob.objects.get(pk=job_id)
+    if job.status != settings.PENDING:
+        # Already run, or failed as stale while it waited
+        return
+    # Waiting counts as progress, and a previous run that died no longer blocks this one
+    job.save(update_fields=['updated_at'])
+    AttendanceSyncJob.expire_stale_jobs(job.dedup_key)
+    if job.is_waiting_for_previous_run():
+        raise self.retry()
+    job.status = settings.RUNNING
+    job.started_at = now()
+    try:
+        with transaction.atomic():
+            job.save(update_fields=['status', 'started_at', 'updated_at'])
+    except IntegrityError:
+        # Another job of this range started in the meantime
+        raise self.retry()
+    command = 'reclassify_att' if job.job_type == settings.SYNC_JOB_RECLASSIFY else 'pop_att'
+    args = ['--job-id', str(job.pk)]
+    if job.username:
+        args += ['--username', job.username]
+    if job.from_date:
+        args += ['--from-date', job.from_date]
+    if job.to_date:
+        args += ['--to-date', job.to_date]
+    if job.shift_timing_id:
+        args += ['--shift', str(job.shift_timing_id)]
+    status, error = settings.FAILED, 'Interrupted before finishing'
+    try:
+        call_command(command, *args)
+        status = settings.COMPLETED
+    except Exception as e:
+        logging.exception(f"Attendance sync job {job.pk} failed")
+        error = str(e)
+    finally:
+        # Also runs when the worker is shut down mid-job, so the range isn't left blocked
+        job.refresh_from_db()
+        job.status = status
+        if status == settings.FAILED:
+            job.errors.append(error)
+        job.finished_at = now()
+        job.save(update_fields=['status', 'errors', 'finished_at', 'updated_at'])
 
 
 @shared_task
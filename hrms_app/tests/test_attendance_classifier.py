@@ -0,0 +1,85 @@
+import random
+from datetime import datetime, time, timedelta
+
+from django.test import SimpleTestCase
+
+from hrms_app.hrms.managers import AttendanceStatusHandler, BatchAttendanceStatusClassifier
+from hrms_app.models import AttendanceStatusColor, ShiftTiming
+
+SHIFTS = [
+    ShiftTiming(start_time=time(9, 0), end_time=time(17, 30), grace_start_time=time(9, 15), grace_end_time=time(17, 15)),
+    ShiftTiming(start_time=time(10, 0), end_time=time(18, 0), grace_start_time=time(10, 10), grace_end_time=time(17, 50)),
+    ShiftTiming(start_time=time(7, 0), end_time=time(15, 0), grace_start_time=time(7, 30), grace_end_time=time(14, 45)),
+]
+
+
+def random_user_days(rng, count):
+    day = datetime(2025, 1, 1)
+    rows = []
+    for _ in range(count):
+        shift = rng.choice(SHIFTS)
+        login = day + timedelta(days=rng.randrange(60), seconds=rng.randrange(5 * 3600, 13 * 3600))
+        if rng.random() < 0.1:
+            logout = login
+        else:
+            end_of_day = login.replace(hour=23, minute=59, second=59)
+            logout = login + timedelta(seconds=rng.randrange((end_of_day - login).seconds + 1))
+        rows.append((login, logout, shift))
+    # Punches landing exactly on the shift boundaries
+    for shift in SHIFTS:
+        grace_start = datetime.combine(day, shift.grace_start_time)
+        for login in (datetime.combine(day, shift.start_time), grace_start, grace_start + timedelta(minutes=1)):
+            for logout_time in (shift.grace_end_time, shift.end_time):
+                rows.append((login, datetime.combine(day, logout_time), shift))
+    return rows
+
+
+class BatchAttendanceStatusClassifierTestCase(SimpleTestCase):
+    full_day_hours = 8
+
+    def setUp(self):
+        self.colors = (
+            AttendanceStatusColor(color_hex="#FFFF00"),
+            AttendanceStatusColor(color_hex="#00FF00"),
+            AttendanceStatusColor(color_hex="#FF0000"),
+        )
+        self.rows = random_user_days(random.Random(20250101), 5000)
+
+    def classify_scalar(self):
+        results = []
+        for login, logout, shift in self.rows:
+            handler = AttendanceStatusHandler(shift, self.full_day_hours, *self.colors)
+            expected_logout = login + timedelta(hours=self.full_day_hours)
+            results.append(
+                handler.determine_attendance_status(
+                    login, logout, logout - login, expected_logout.time(), expected_logout
+                )
+            )
+        return results
+
+    def classify_batch(self, classifier):
+        logins, logouts, shifts = zip(*self.rows)
+        return classifier.classify(
+            logins,
+            logouts,
+            [shift.grace_start_time for shift in shifts],
+            [shift.grace_end_time for shift in shifts],
+            [shift.end_time for shift in shifts],
+        )
+
+    def test_batch_matches_scalar_handler(self):
+        classifier = BatchAttendanceStatusClassifier(self.full_day_hours, *self.colors)
+        result = self.classify_batch(classifier)
+
+        expected = self.classify_scalar()
+        actual = list(classifier.iter_status_data(result))
+        self.assertEqual(len(actual), len(expected))
+        for row, expected_data, actual_data in zip(self.rows, expected, actual):
+            self.assertEqual(actual_data, expected_data, msg=row)
+        # The random sample exercises every branch of the handler
+        self.assertEqual(set(result["category"].tolist()), set(range(6)))
+        durations = [(datetime.min + (logout - login)).time() for login, logout, _ in self.rows]
+        self.assertEqual(
+            [(datetime.min + timedelta(microseconds=value)).time() for value in result["duration"].tolist()],
+            durations,
+        )
@@ -0,0 +1,90 @@
+from datetime import time
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from hrms_app.hrms.attendance_context import (
+    ATTENDANCE_CONTEXT_VERSION_KEY,
+    AttendanceContext,
+    get_attendance_context,
+    invalidate_attendance_context,
+)
+from hrms_app.models import (
+    AttendanceSetting,
+    AttendanceStatusColor,
+    CustomUser,
+    EmployeeShift,
+    ShiftTiming,
+)
+
+
+class AttendanceContextTestCase(TestCase):
+    def setUp(self):
+        AttendanceSetting.objects.create(full_day_hours=8, half_day_hours=4)
+        AttendanceStatusColor.objects.create(status=settings.HALF_DAY, color="yellow", color_hex="#FFFF00")
+        AttendanceStatusColor.objects.create(status=settings.PRESENT, color="green", color_hex="#00FF00")
+        AttendanceStatusColor.objects.create(status=settings.ABSENT, color="red", color_hex="#FF0000")
+        self.shift = ShiftTiming.objects.create(
+            start_time=time(9, 0),
+            end_time=time(17, 30),
+            grace_start_time=time(9, 15),
+            grace_end_time=time(17, 15),
+        )
+        self.users = [
+            CustomUser.objects.create(username=f"employee{index}") for index in range(1, 11)
+        ]
+        invalidate_attendance_context()
+
+    def test_shifts_are_loaded_in_one_query(self):
+        with self.assertNumQueries(2):
+            context = AttendanceContext()
+        with self.assertNumQueries(1):
+            shifts = [context.get_user_shift(user) for user in self.users]
+        self.assertEqual(shifts, [self.shift] * len(self.users))
+        self.assertEqual(context.present_color.color_hex, "#00FF00")
+
+    def test_process_context_is_reused_until_invalidated(self):
+        context = get_attendance_context()
+        with self.assertNumQueries(0):
+            self.assertIs(get_attendance_context(), context)
+
+        night_shift = ShiftTiming.objects.create(
+            start_time=time(21, 0),
+            end_time=time(5, 0),
+            grace_start_time=time(21, 15),
+            grace_end_time=time(4, 45),
+        )
+        EmployeeShift.objects.filter(employee=self.users[0]).update(shift_timing=night_shift)
+        context = get_attendance_context()
+        self.assertEqual(context.get_user_shift(self.users[0]), night_shift)
+
+        AttendanceStatusColor.objects.filter(status=settings.PRESENT).update(color_hex="#008000")
+        self.assertIs(get_attendance_context(), context)
+        AttendanceStatusColor.objects.get(status=settings.PRESENT).save()
+        self.assertEqual(get_attendance_context().present_color.color_hex, "#008000")
+
+    def test_context_is_rebuilt_when_another_process_bumps_the_version(self):
+        context = get_attendance_context()
+        AttendanceStatusColor.objects.filter(status=settings.PRESENT).update(color_hex="#008000")
+
+        # A signal in another worker only reaches this one through the shared version key
+        cache.set(ATTENDANCE_CONTEXT_VERSION_KEY, "bumped-elsewhere", None)
+        rebuilt = get_attendance_context()
+        self.assertIsNot(rebuilt, context)
+        self.assertEqual(rebuilt.present_color.color_hex, "#008000")
+        with self.assertNumQueries(0):
+            self.assertIs(get_attendance_context(), rebuilt)
+
+    @override_settings(ATTENDANCE_CONTEXT_TIMEOUT=60)
+    def test_context_expires_when_the_version_never_arrives(self):
+        with mock.patch("hrms_app.hrms.attendance_context.time.monotonic", return_value=1000):
+            context = get_attendance_context()
+        # Changed in another process whose cache this one can't see
+        AttendanceStatusColor.objects.filter(status=settings.PRESENT).update(color_hex="#008000")
+
+        with mock.patch("hrms_app.hrms.attendance_context.time.monotonic", return_value=1059):
+            self.assertIs(get_attendance_context(), context)
+        with mock.patch("hrms_app.hrms.attendance_context.time.monotonic", return_value=1060):
+            self.assertEqual(get_attendance_context().present_color.color_hex, "#008000")
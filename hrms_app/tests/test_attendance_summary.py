@@ -0,0 +1,173 @@
+from datetime import date, datetime, time
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.utils.timezone import make_aware
+
+from hrms_app.hrms.attendance_summary import refresh_day_summaries
+from hrms_app.models import (
+    AttendanceDaySummary,
+    AttendanceLog,
+    CustomUser,
+    Department,
+    Designation,
+    Holiday,
+    OfficeLocation,
+    PersonalDetails,
+    SummaryRefresh,
+)
+from hrms_app.tasks import refresh_attendance_summaries
+from hrms_app.views.report_view import (
+    MonthAttendanceReportView,
+    generate_monthly_presence_data_detailed,
+    get_monthly_presence_summary,
+    get_status_entry_cell,
+)
+
+
+# The summaries are rebuilt by a task started after commit; run it in process
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class AttendanceDaySummaryTestCase(TestCase):
+    def setUp(self):
+        designation = Designation.objects.create(
+            department=Department.objects.create(department="IT"), designation="Engineer"
+        )
+        self.location = OfficeLocation.objects.create(
+            location_name="Head Office", office_type=settings.HEAD_OFFICE, address="HQ"
+        )
+        self.users = []
+        for index in range(1, 4):
+            user = CustomUser.objects.create(
+                username=f"employee{index}",
+                first_name="Employee",
+                last_name=str(index),
+                device_location=self.location,
+            )
+            PersonalDetails.objects.create(
+                user=user,
+                employee_code=str(100 + index),
+                mobile_number=f"90000000{index:02}",
+                official_mobile_number=f"80000000{index:02}",
+                designation=designation,
+                doj=date(2024, 1, 1),
+            )
+            self.users.append(user)
+        Holiday.objects.create(
+            title="Makar Sankranti", short_code="FL", start_date=date(2025, 1, 14), color_hex="#FFA500"
+        )
+        # Start every test with nothing queued for a rebuild
+        SummaryRefresh.objects.all().delete()
+        # Bulk created, so no summary refresh is queued by the signals
+        AttendanceLog.objects.bulk_create(
+            [
+                self.make_log(self.users[0], date(2025, 1, 2), "P", regularized=True),
+                self.make_log(self.users[0], date(2025, 1, 3), "H"),
+                self.make_log(self.users[1], date(2025, 1, 14), "P"),
+            ]
+        )
+
+    def make_log(self, user, day, short_code, regularized=False):
+        return AttendanceLog(
+            applied_by=user,
+            title=f"Attendance for {user.get_full_name()} on {day}",
+            slug=f"{user.username}-{day}",
+            start_date=make_aware(datetime.combine(day, time(9, 5))),
+            end_date=make_aware(datetime.combine(day, time(17, 40))),
+            duration=time(8, 35),
+            att_status=settings.PRESENT,
+            att_status_short_code=short_code,
+            color_hex="#00FF00",
+            regularized=regularized,
+        )
+
+    def test_reports_read_the_same_cells_the_live_merge_builds(self):
+        refresh_day_summaries(None, date(2025, 1, 1), date(2025, 1, 31))
+        view = MonthAttendanceReportView()
+        employees = view._get_filtered_employees(str(self.location.pk), True)
+        from_datetime = make_aware(datetime(2025, 1, 1))
+        to_datetime = make_aware(datetime(2025, 1, 31))
+
+        live = view.build_attendance_data(employees, from_datetime, to_datetime)
+        with self.assertNumQueries(1):
+            stored = view._get_summary_attendance_data(employees, from_datetime, to_datetime)
+        self.assertEqual(
+            {employee_id: {day: entries for day, entries in days.items() if entries} for employee_id, days in live.items()},
+            {employee_id: dict(days) for employee_id, days in stored.items()},
+        )
+
+        live = generate_monthly_presence_data_detailed("2025-01-01", "2025-01-31", True, str(self.location.pk))
+        with self.assertNumQueries(1):
+            stored = get_monthly_presence_summary("2025-01-01", "2025-01-31", True, str(self.location.pk))
+        self.assertEqual(
+            {
+                emp_code: {day: get_status_entry_cell(entry) for day, entry in days.items() if entry}
+                for emp_code, days in live.items()
+            },
+            dict(stored),
+        )
+        self.assertEqual(stored["101"]["2025-01-02"]["in_time"], "09:05 AM")
+        self.assertEqual(stored["101"]["2025-01-02"]["reg"], "R")
+        self.assertEqual(stored["103"]["2025-01-14"]["leave"], "FL")
+
+    def test_partial_range_only_shows_holidays_to_employees_active_in_it(self):
+        refresh_day_summaries(None, date(2025, 1, 1), date(2025, 1, 31))
+        view = MonthAttendanceReportView()
+        employees = view._get_filtered_employees(str(self.location.pk), True)
+        from_datetime = make_aware(datetime(2025, 1, 10))
+        to_datetime = make_aware(datetime(2025, 1, 20))
+
+        live = view.build_attendance_data(employees, from_datetime, to_datetime)
+        stored = view._get_summary_attendance_data(employees, from_datetime, to_datetime)
+        self.assertEqual(
+            {employee_id: {day: entries for day, entries in days.items() if entries} for employee_id, days in live.items()},
+            {employee_id: dict(days) for employee_id, days in stored.items()},
+        )
+        # Only punched on the 2nd and 3rd, so the range shows no holiday or Sunday for them
+        self.assertNotIn(self.users[0].pk, stored)
+        self.assertEqual(stored[self.users[1].pk][date(2025, 1, 12)], [{"status": "OFF", "color": "#CCCCCC"}])
+
+    def test_saving_a_log_refreshes_the_employee_month(self):
+        user = self.users[2]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_log(user, date(2025, 1, 20), "P").save()
+
+        summary = AttendanceDaySummary.objects.get(employee=user, date=date(2025, 1, 20))
+        self.assertEqual(summary.status, "P")
+        self.assertEqual(summary.in_time, time(9, 5))
+        self.assertEqual(summary.duration, time(8, 35))
+        self.assertEqual(summary.entries, [{"status": "P", "color": "#00FF00"}])
+        # Only the saved employee's month was rebuilt
+        self.assertFalse(AttendanceDaySummary.objects.exclude(employee=user).exists())
+        self.assertEqual(
+            AttendanceDaySummary.objects.get(employee=user, date=date(2025, 1, 14)).leave_code, "FL"
+        )
+
+    def test_changes_to_one_month_are_rebuilt_once(self):
+        user = self.users[2]
+        with mock.patch("hrms_app.tasks.refresh_attendance_summaries.delay") as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.make_log(user, date(2025, 1, 20), "P").save()
+                self.make_log(user, date(2025, 1, 21), "P").save()
+                Holiday.objects.create(
+                    title="Founders Day", short_code="FL", start_date=date(2025, 1, 16), color_hex="#FFA500"
+                )
+        self.assertEqual(refresh.call_count, 3)
+        self.assertEqual(
+            set(SummaryRefresh.objects.values_list("employee_id", "month")),
+            {(user.pk, date(2025, 1, 1)), (None, date(2025, 1, 1))},
+        )
+        self.assertFalse(AttendanceDaySummary.objects.exists())
+
+        with mock.patch(
+            "hrms_app.hrms.attendance_summary.refresh_day_summaries", wraps=refresh_day_summaries
+        ) as rebuild:
+            refresh_attendance_summaries()
+            refresh_attendance_summaries()
+        # The holiday covers every employee, so the month is rebuilt once for all of them
+        rebuild.assert_called_once_with(None, date(2025, 1, 1), date(2025, 1, 1))
+        self.assertFalse(SummaryRefresh.objects.exists())
+        self.assertEqual(
+            set(AttendanceDaySummary.objects.filter(date=date(2025, 1, 16)).values_list("employee_id", "leave_code")),
+            {(employee.pk, "FL") for employee in self.users},
+        )
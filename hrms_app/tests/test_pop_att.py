@@ -0,0 +1,700 @@
+import threading
+from datetime import date, datetime, time, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from django.utils import timezone
+from django.utils.timezone import localtime, make_aware
+
+from hrms_app.hrms.device_simulator import StubDeviceServer
+from hrms_app.hrms.device_client import DeviceClient, fetch_device_logs
+from hrms_app.models import (
+    AttendanceLog,
+    AttendanceSetting,
+    AttendanceStatusColor,
+    AttendanceSyncJob,
+    BackfillWindow,
+    CustomUser,
+    Department,
+    Designation,
+    DeviceInformation,
+    IngestCheckpoint,
+    LockStatus,
+    OfficeLocation,
+    PersonalDetails,
+    PunchLog,
+    ShiftTiming,
+    SummaryRefresh,
+)
+
+
+@override_settings(ATTENDANCE_DEVICE_RETRY_BACKOFF=0)
+class PopulateAttendanceTestCase(TestCase):
+    def setUp(self):
+        AttendanceSetting.objects.create(full_day_hours=8, half_day_hours=4)
+        AttendanceStatusColor.objects.create(status=settings.HALF_DAY, color="yellow", color_hex="#FFFF00")
+        AttendanceStatusColor.objects.create(status=settings.PRESENT, color="green", color_hex="#00FF00")
+        AttendanceStatusColor.objects.create(status=settings.ABSENT, color="red", color_hex="#FF0000")
+        # New users pick up the first shift through the post_save signal
+        ShiftTiming.objects.create(
+            start_time=time(9, 0),
+            end_time=time(17, 30),
+            grace_start_time=time(9, 15),
+            grace_end_time=time(17, 15),
+        )
+        designation = Designation.objects.create(
+            department=Department.objects.create(department="IT"), designation="Engineer"
+        )
+        self.location = OfficeLocation.objects.create(
+            location_name="Head Office", office_type=settings.HEAD_OFFICE, address="HQ"
+        )
+        self.device = DeviceInformation.objects.create(
+            device_location=self.location,
+            from_date="2025-01-01T00:00:00+05:30",
+            to_date="2025-01-01T23:59:00+05:30",
+            serial_number="DEV-001",
+            username="api",
+            password="secret",
+        )
+        self.emp_codes = []
+        for index in range(1, 6):
+            user = CustomUser.objects.create(
+                username=f"employee{index}",
+                first_name="Employee",
+                last_name=str(index),
+                device_location=self.location,
+            )
+            PersonalDetails.objects.create(
+                user=user,
+                employee_code=str(100 + index),
+                mobile_number=f"90000000{index:02}",
+                official_mobile_number=f"80000000{index:02}",
+                designation=designation,
+                doj=date(2024, 1, 1),
+            )
+            self.emp_codes.append(str(100 + index))
+
+    def test_device_log_is_fetched_once_per_device(self):
+        with StubDeviceServer(emp_codes=self.emp_codes) as device:
+            self.device.api_link = device.url
+            self.device.save()
+            call_command(
+                "pop_att",
+                from_date="2025-01-01 00:01:00",
+                to_date="2025-01-02 23:59:00",
+                stdout=StringIO(),
+            )
+
+        self.assertEqual(device.request_count, 1)
+        self.assertEqual(AttendanceLog.objects.count(), len(self.emp_codes) * 2)
+
+    def test_users_without_device_are_skipped(self):
+        CustomUser.objects.filter(username="employee1").update(device_location=None)
+        with StubDeviceServer(emp_codes=self.emp_codes) as device:
+            self.device.api_link = device.url
+            self.device.save()
+            call_command(
+                "pop_att",
+                from_date="2025-01-01 00:01:00",
+                to_date="2025-01-01 23:59:00",
+                stdout=StringIO(),
+            )
+
+        self.assertEqual(device.request_count, 1)
+        self.assertFalse(AttendanceLog.objects.filter(applied_by__username="employee1").exists())
+        self.assertEqual(AttendanceLog.objects.count(), len(self.emp_codes) - 1)
+
+    def test_devices_are_fetched_concurrently(self):
+        # Every request waits until all three are in flight, which a sequential fetch never reaches
+        barrier = threading.Barrier(3, timeout=10)
+        with StubDeviceServer(emp_codes=self.emp_codes, barrier=barrier) as server:
+            devices = [
+                DeviceInformation(
+                    pk=index + 100,
+                    serial_number=f"DEV-10{index}",
+                    username="api",
+                    password="secret",
+                    api_link=server.url,
+                )
+                for index in range(3)
+            ]
+            results = fetch_device_logs(
+                devices, "2025-01-01 00:01:00", "2025-01-01 23:59:00", max_workers=3
+            )
+
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(result for result in results.values()))
+        self.assertEqual(server.peak_in_flight, 3)
+        self.assertFalse(barrier.broken)
+
+    def test_incremental_ingest_updates_day_in_place(self):
+        with StubDeviceServer(emp_codes=self.emp_codes) as device:
+            self.device.api_link = device.url
+            self.device.save()
+            # Morning sync only sees the in punches
+            call_command(
+                "pop_att",
+                from_date="2025-01-01 00:01:00",
+                to_date="2025-01-01 12:00:00",
+                stdout=StringIO(),
+            )
+            self.device.refresh_from_db()
+            self.assertEqual(localtime(self.device.last_punch_at).time(), time(9, 4))
+            self.assertEqual(
+                set(AttendanceLog.objects.values_list("att_status", flat=True)), {settings.ABSENT}
+            )
+
+            regularized_log = AttendanceLog.objects.get(applied_by__username="employee1")
+            regularized_log.regularized = True
+            regularized_log.save()
+
+            with mock.patch(
+                "django.utils.timezone.now", return_value=make_aware(datetime(2025, 1, 1, 20, 0))
+            ):
+                call_command("pop_att", incremental=True, stdout=StringIO())
+
+        self.assertEqual(device.request_count, 2)
+        self.assertEqual(AttendanceLog.objects.count(), len(self.emp_codes))
+        self.device.refresh_from_db()
+        self.assertEqual(localtime(self.device.last_punch_at).time(), time(17, 34))
+        for log in AttendanceLog.objects.exclude(pk=regularized_log.pk):
+            self.assertLess(localtime(log.start_date).time(), time(9, 5))
+            self.assertGreaterEqual(localtime(log.end_date).time(), time(17, 30))
+            self.assertEqual(log.att_status, settings.PRESENT)
+        regularized_log.refresh_from_db()
+        self.assertEqual(regularized_log.att_status, settings.ABSENT)
+
+    def test_resync_is_idempotent_and_keeps_reviewed_rows(self):
+        with StubDeviceServer(emp_codes=self.emp_codes) as device:
+            self.device.api_link = device.url
+            self.device.save()
+            call_command(
+                "pop_att",
+                from_date="2025-01-01 00:01:00",
+                to_date="2025-01-01 12:00:00",
+                stdout=StringIO(),
+            )
+            AttendanceLog.objects.filter(applied_by__username="employee1").update(
+                status=settings.APPROVED
+            )
+            out = StringIO()
+            call_command(
+                "pop_att",
+                from_date="2025-01-01 00:01:00",
+                to_date="2025-01-02 23:59:00",
+                stdout=out,
+            )
+            self.assertIn("5 inserted, 4 updated, 1 skipped", out.getvalue())
+
+            out = StringIO()
+            call_command(
+                "pop_att",
+                from_date="2025-01-01 00:01:00",
+                to_date="2025-01-02 23:59:00",
+                stdout=out,
+            )
+            self.assertIn("0 inserted, 0 updated, 10 skipped", out.getvalue())
+
+        self.assertEqual(AttendanceLog.objects.count(), len(self.emp_codes) * 2)
+        approved_log = AttendanceLog.objects.get(
+            applied_by__username="employee1", start_date__date=date(2025, 1, 1)
+        )
+        self.assertEqual(approved_log.att_status, settings.ABSENT)
+
+    def test_resync_leaves_locked_days_alone(self):
+        with StubDeviceServer(emp_codes=self.emp_codes) as device:
+            self.device.api_link = device.url
+            self.device.save()
+            call_command(
+                "pop_att",
+                from_date="2025-01-01 00:01:00",
+                to_date="2025-01-01 12:00:00",
+                stdout=StringIO(),
+            )
+            # January 1st is closed for payroll; January 3rd has no stored day yet
+            LockStatus.objects.create(is_locked="locked", from_date=date(2025, 1, 1), to_date=date(2025, 1, 1))
+            LockStatus.objects.create(is_locked="locked", from_date=date(2025, 1, 3), to_date=date(2025, 1, 3))
+            LockStatus.objects.create(is_locked="unlocked", from_date=date(2025, 1, 2), to_date=date(2025, 1, 2))
+            out = StringIO()
+            call_command(
+                "pop_att",
+                from_date="2025-01-01 00:01:00",
+                to_date="2025-01-03 23:59:00",
+                stdout=out,
+            )
+
+        self.assertIn("5 inserted, 0 updated, 10 skipped", out.getvalue())
+        self.assertEqual(
+            set(AttendanceLog.objects.filter(start_date__date=date(2025, 1, 1)).values_list("att_status", flat=True)),
+            {settings.ABSENT},
+        )
+        self.assertFalse(AttendanceLog.objects.filter(start_date__date=date(2025, 1, 3)).exists())
+        self.assertEqual(AttendanceLog.objects.filter(start_date__date=date(2025, 1, 2)).count(), len(self.emp_codes))
+
+    def test_shift_change_reclassifies_stored_logs_in_background(self):
+        from hrms_app.tasks import run_attendance_sync_job
+
+        with StubDeviceServer(emp_codes=self.emp_codes) as device:
+            self.device.api_link = device.url
+            self.device.save()
+            call_command(
+                "pop_att",
+                from_date="2025-01-01 00:01:00",
+                to_date="2025-01-01 23:59:00",
+                stdout=StringIO(),
+            )
+        self.assertFalse(AttendanceLog.objects.exclude(att_status=settings.PRESENT).exists())
+        AttendanceLog.objects.filter(applied_by__username="employee5").update(regularized=True)
+
+        # employee4 and employee5 punch in at 09:03 and 09:04, now after the grace period
+        shift = ShiftTiming.objects.get()
+        shift.grace_start_time = time(9, 2)
+        with mock.patch.object(
+            run_attendance_sync_job, "delay", side_effect=lambda job_id: run_attendance_sync_job.apply(args=[job_id])
+        ), self.captureOnCommitCallbacks(execute=True):
+            shift.save()
+
+        job = AttendanceSyncJob.objects.get(job_type=settings.SYNC_JOB_RECLASSIFY)
+        self.assertEqual(job.status, settings.COMPLETED)
+        self.assertEqual(job.shift_timing, shift)
+        self.assertEqual((job.processed, job.total), (4, 4))
+        self.assertEqual((job.updated, job.skipped), (1, 3))
+        late_log = AttendanceLog.objects.get(applied_by__username="employee4")
+        self.assertEqual(late_log.att_status, settings.HALF_DAY)
+        self.assertEqual(late_log.reg_status, settings.LATE_COMING)
+        self.assertEqual(late_log.color_hex, "#FFFF00")
+        for username in ["employee1", "employee2", "employee3", "employee5"]:
+            log = AttendanceLog.objects.get(applied_by__username=username)
+            self.assertEqual(log.att_status, settings.PRESENT)
+
+        # Saving without touching the grace window or shift end queues nothing
+        shift.break_duration = 45
+        with self.captureOnCommitCallbacks(execute=True):
+            shift.save()
+        self.assertEqual(AttendanceSyncJob.objects.count(), 1)
+
+    def test_shift_change_during_a_reclassification_queues_a_follow_up(self):
+        from celery.exceptions import Retry
+
+        from hrms_app.tasks import run_attendance_sync_job
+
+        shift = ShiftTiming.objects.get()
+        running_job, _ = AttendanceSyncJob.submit(
+            None, None, None, job_type=settings.SYNC_JOB_RECLASSIFY, shift_timing=shift
+        )
+        AttendanceSyncJob.objects.filter(pk=running_job.pk).update(status=settings.RUNNING)
+
+        with mock.patch.object(run_attendance_sync_job, "delay") as delay:
+            for grace_start_time in (time(9, 2), time(9, 3)):
+                shift.grace_start_time = grace_start_time
+                with self.captureOnCommitCallbacks(execute=True):
+                    shift.save()
+
+        # The running job may have read the old shift; the second change joins the follow-up
+        follow_up = AttendanceSyncJob.objects.get(status=settings.PENDING)
+        delay.assert_called_once_with(str(follow_up.pk))
+        self.assertEqual(follow_up.dedup_key, running_job.dedup_key)
+
+        # It waits for the running job to finish instead of racing it
+        with mock.patch.object(run_attendance_sync_job, "retry", side_effect=Retry()):
+            with self.assertRaises(Retry):
+                run_attendance_sync_job(str(follow_up.pk))
+        follow_up.refresh_from_db()
+        self.assertEqual(follow_up.status, settings.PENDING)
+
+        AttendanceSyncJob.objects.filter(pk=running_job.pk).update(status=settings.COMPLETED)
+        run_attendance_sync_job(str(follow_up.pk))
+        follow_up.refresh_from_db()
+        self.assertEqual(follow_up.status, settings.COMPLETED)
+
+    def test_employees_sharing_a_name_get_distinct_slugs(self):
+        CustomUser.objects.exclude(username__in=["employee1", "employee2"]).delete()
+        CustomUser.objects.filter(username="employee2").update(last_name="1")
+        with StubDeviceServer(emp_codes=self.emp_codes) as device:
+            self.device.api_link = device.url
+            self.device.save()
+            call_command(
+                "pop_att",
+                from_date="2025-01-01 00:01:00",
+                to_date="2025-01-01 23:59:00",
+                stdout=StringIO(),
+            )
+
+        slugs = set(AttendanceLog.objects.values_list("slug", flat=True))
+        self.assertEqual(len(slugs), 2)
+
+    def test_raw_punches_are_stored_once_and_recomputed_locally(self):
+        with StubDeviceServer(emp_codes=self.emp_codes) as device:
+            self.device.api_link = device.url
+            self.device.save()
+            for _ in range(2):
+                call_command(
+                    "pop_att",
+                    from_date="2025-01-01 00:01:00",
+                    to_date="2025-01-02 23:59:00",
+                    stdout=StringIO(),
+                )
+
+        self.assertEqual(PunchLog.objects.count(), len(self.emp_codes) * 2 * 2)
+        AttendanceLog.objects.all().delete()
+
+        out = StringIO()
+        call_command("recompute_att", from_date="2025-01-01", to_date="2025-01-02", stdout=out)
+
+        self.assertEqual(device.request_count, 2)
+        self.assertIn("10 inserted, 0 updated, 0 skipped", out.getvalue())
+        log = AttendanceLog.objects.get(
+            applied_by__username="employee1", start_date__date=date(2025, 1, 2)
+        )
+        self.assertEqual(localtime(log.start_date).time(), time(9, 0))
+        self.assertEqual(localtime(log.end_date).time(), time(17, 30))
+
+    def test_failed_device_is_reported_and_skipped(self):
+        with StubDeviceServer(emp_codes=self.emp_codes, failure_rate=1) as device:
+            self.device.api_link = device.url
+            self.device.save()
+            out = StringIO()
+            call_command(
+                "pop_att",
+                from_date="2025-01-01 00:01:00",
+                to_date="2025-01-01 23:59:00",
+                stdout=out,
+            )
+
+        # The first attempt and both retries failed
+        self.assertEqual(device.failure_count, 3)
+        self.assertIn("No data received from device: DEV-001", out.getvalue())
+        self.assertFalse(AttendanceLog.objects.exists())
+        self.device.refresh_from_db()
+        self.assertIsNone(self.device.last_punch_at)
+        self.assertEqual(self.device.request_count, 3)
+        self.assertEqual(self.device.consecutive_failures, 1)
+        self.assertIn("500", self.device.last_error)
+
+    def test_device_held_by_another_run_is_skipped(self):
+        with StubDeviceServer(emp_codes=self.emp_codes) as device:
+            self.device.api_link = device.url
+            self.device.save()
+            # The nightly run is still reading the device when the incremental run starts
+            DeviceInformation.objects.update(ingest_locked_until=timezone.now() + timedelta(minutes=5))
+            out = StringIO()
+            call_command("pop_att", incremental=True, stdout=out)
+
+            self.assertEqual(device.request_count, 0)
+            self.assertIn("Device DEV-001 is being ingested by another run, skipped.", out.getvalue())
+            self.assertFalse(AttendanceLog.objects.exists())
+
+            # A claim left behind by a dead run expires and is taken over
+            DeviceInformation.objects.update(ingest_locked_until=timezone.now())
+            call_command(
+                "pop_att",
+                from_date="2025-01-01 00:01:00",
+                to_date="2025-01-01 23:59:00",
+                stdout=StringIO(),
+            )
+
+        self.assertEqual(device.request_count, 1)
+        self.assertEqual(AttendanceLog.objects.count(), len(self.emp_codes))
+        self.device.refresh_from_db()
+        self.assertIsNone(self.device.ingest_locked_until)
+
+    def test_transient_device_failure_is_retried(self):
+        # With this seed the stub fails the first request and answers the second
+        with StubDeviceServer(emp_codes=self.emp_codes, failure_rate=0.5, seed=1) as device:
+            self.device.api_link = device.url
+            self.device.save()
+            call_command(
+                "pop_att",
+                from_date="2025-01-01 00:01:00",
+                to_date="2025-01-01 23:59:00",
+                stdout=StringIO(),
+            )
+
+        self.assertEqual(device.request_count, 2)
+        self.assertEqual(AttendanceLog.objects.count(), len(self.emp_codes))
+        self.device.refresh_from_db()
+        self.assertEqual(self.device.consecutive_failures, 0)
+        self.assertIsNotNone(self.device.last_success_at)
+
+    @override_settings(ATTENDANCE_DEVICE_FETCH_BUDGET=0.5)
+    def test_hung_device_is_given_up_once_its_time_budget_is_spent(self):
+        # Answers after the whole budget has passed, so no retry fits in it either
+        with StubDeviceServer(emp_codes=self.emp_codes, latency=1) as device:
+            self.device.api_link = device.url
+            client = DeviceClient(self.device)
+            self.assertIsNone(client.fetch("2025-01-01 00:01:00", "2025-01-01 23:59:00"))
+
+        self.assertEqual(client.attempts, 1)
+        self.assertEqual(device.request_count, 1)
+        self.assertIn("timed out", client.error)
+
+    @override_settings(ATTENDANCE_DEVICE_FAILURE_THRESHOLD=2)
+    def test_circuit_opens_after_repeated_failures(self):
+        options = {"from_date": "2025-01-01 00:01:00", "to_date": "2025-01-01 23:59:00"}
+        with StubDeviceServer(emp_codes=self.emp_codes, failure_rate=1) as device:
+            self.device.api_link = device.url
+            self.device.save()
+            for _ in range(3):
+                call_command("pop_att", stdout=StringIO(), **options)
+
+        # Two failed fetches opened the circuit, so the third run never reached the device
+        self.assertEqual(device.request_count, 6)
+        self.device.refresh_from_db()
+        self.assertGreater(self.device.circuit_open_until, timezone.now())
+
+        # Once the cooldown has passed the device is tried again and a success closes it
+        DeviceInformation.objects.update(circuit_open_until=timezone.now())
+        with StubDeviceServer(emp_codes=self.emp_codes) as device:
+            DeviceInformation.objects.update(api_link=device.url)
+            call_command("pop_att", stdout=StringIO(), **options)
+
+        self.assertEqual(device.request_count, 1)
+        self.device.refresh_from_db()
+        self.assertIsNone(self.device.circuit_open_until)
+        self.assertEqual(self.device.consecutive_failures, 0)
+
+    def test_chunked_ingest_resumes_after_last_committed_chunk(self):
+        from hrms_app.management.commands.pop_att import Command as PopulateAttendanceCommand
+
+        save_attendance_logs = PopulateAttendanceCommand.save_attendance_logs
+        calls = []
+
+        def fail_on_second_chunk(command, *args):
+            calls.append(args)
+            if len(calls) == 2:
+                raise RuntimeError("worker lost")
+            return save_attendance_logs(command, *args)
+
+        with StubDeviceServer(emp_codes=self.emp_codes) as device:
+            self.device.api_link = device.url
+            self.device.save()
+            options = {"from_date": "2025-01-01 00:01:00", "to_date": "2025-01-05 23:59:00", "chunk_days": 2}
+            with mock.patch.object(PopulateAttendanceCommand, "save_attendance_logs", fail_on_second_chunk):
+                with self.assertRaises(RuntimeError):
+                    call_command("pop_att", stdout=StringIO(), **options)
+
+            checkpoint = IngestCheckpoint.objects.get()
+            self.assertEqual(localtime(checkpoint.completed_through), make_aware(datetime(2025, 1, 2, 23, 59, 59)))
+            self.assertEqual(AttendanceLog.objects.count(), len(self.emp_codes) * 2)
+
+            out = StringIO()
+            call_command("pop_att", stdout=out, **options)
+
+        # The first run died in its second window; the rerun only fetches the two unfinished ones
+        self.assertEqual(device.request_count, 4)
+        self.assertIn("Resuming after checkpoint 2025-01-02 23:59:59", out.getvalue())
+        self.assertIn("15 inserted", out.getvalue())
+        self.assertEqual(AttendanceLog.objects.count(), len(self.emp_codes) * 5)
+        self.assertFalse(IngestCheckpoint.objects.exists())
+
+    def test_chunked_ingest_rebuilds_summaries_once_per_run(self):
+        with StubDeviceServer(emp_codes=self.emp_codes) as device:
+            self.device.api_link = device.url
+            self.device.save()
+            with mock.patch("hrms_app.tasks.refresh_attendance_summaries.delay") as refresh:
+                with self.captureOnCommitCallbacks(execute=True):
+                    call_command(
+                        "pop_att",
+                        from_date="2025-01-01 00:01:00",
+                        to_date="2025-01-05 23:59:00",
+                        chunk_days=2,
+                        stdout=StringIO(),
+                    )
+
+        # Three windows queue each employee's month once and a single rebuild is started
+        self.assertEqual(device.request_count, 3)
+        refresh.assert_called_once_with()
+        self.assertEqual(SummaryRefresh.objects.filter(month=date(2025, 1, 1)).count(), len(self.emp_codes))
+
+    @override_settings(ATTENDANCE_DEVICE_RETRIES=0, ATTENDANCE_DEVICE_FAILURE_THRESHOLD=100)
+    def test_backfill_resumes_failed_windows_only(self):
+        options = {"from_date": "2025-01-01", "to_date": "2025-01-06", "window": "day", "max_workers": 1}
+        # With this seed the stub fails three of the six daily requests
+        with StubDeviceServer(emp_codes=self.emp_codes, failure_rate=0.5, seed=0) as device:
+            self.device.api_link = device.url
+            self.device.save()
+            call_command("backfill_att", stdout=StringIO(), **options)
+
+        self.assertEqual(device.request_count, 6)
+        windows = BackfillWindow.objects.filter(device=self.device)
+        self.assertEqual(windows.count(), 6)
+        failed_days = {
+            localtime(window.window_start).date()
+            for window in windows.filter(status=settings.FAILED)
+        }
+        self.assertEqual(len(failed_days), 3)
+        self.assertEqual(
+            AttendanceLog.objects.count(), len(self.emp_codes) * (6 - len(failed_days))
+        )
+
+        with StubDeviceServer(emp_codes=self.emp_codes) as device:
+            DeviceInformation.objects.update(api_link=device.url)
+            out = StringIO()
+            call_command("backfill_att", stdout=out, **dict(options, max_workers=4))
+
+        # Only the failed days are fetched again
+        self.assertEqual(device.request_count, len(failed_days))
+        self.assertIn(f"Backfill finished: {len(failed_days)} windows completed, 0 failed.", out.getvalue())
+        self.assertFalse(windows.exclude(status=settings.COMPLETED).exists())
+        self.assertEqual(AttendanceLog.objects.count(), len(self.emp_codes) * 6)
+        self.assertEqual(windows.filter(attempts=2).count(), len(failed_days))
+
+        with StubDeviceServer(emp_codes=self.emp_codes) as device:
+            DeviceInformation.objects.update(api_link=device.url)
+            call_command("backfill_att", stdout=StringIO(), **options)
+        self.assertEqual(device.request_count, 0)
+
+    def test_backfill_fetches_one_window_per_device_at_a_time(self):
+        options = {"from_date": "2025-01-01", "to_date": "2025-01-03", "window": "day", "max_workers": 3}
+        with StubDeviceServer(emp_codes=self.emp_codes, latency=0.2) as device:
+            self.device.api_link = device.url
+            self.device.save()
+            out = StringIO()
+            call_command("backfill_att", stdout=out, **options)
+
+        self.assertEqual(device.request_count, 3)
+        self.assertEqual(device.peak_in_flight, 1)
+        self.assertIn("Backfill finished: 3 windows completed, 0 failed.", out.getvalue())
+
+    def test_backfill_does_not_write_a_window_of_a_held_device(self):
+        options = {"from_date": "2025-01-01", "to_date": "2025-01-02", "window": "day", "max_workers": 1}
+        with StubDeviceServer(emp_codes=self.emp_codes) as device:
+            self.device.api_link = device.url
+            self.device.save()
+            # The incremental ingest holds the device while the backfill windows come in
+            DeviceInformation.objects.update(ingest_locked_until=timezone.now() + timedelta(minutes=5))
+            out = StringIO()
+            call_command("backfill_att", stdout=out, **options)
+
+        self.assertIn("Device DEV-001 is being ingested by another run", out.getvalue())
+        self.assertFalse(AttendanceLog.objects.exists())
+        self.assertFalse(PunchLog.objects.exists())
+        self.assertEqual(
+            set(BackfillWindow.objects.values_list("status", flat=True)), {settings.FAILED}
+        )
+        self.device.refresh_from_db()
+        self.assertIsNone(self.device.last_punch_at)
+        self.assertIsNotNone(self.device.ingest_locked_until)
+
+    def test_sync_job_runs_in_background_and_reports_progress(self):
+        from hrms_app.tasks import run_attendance_sync_job
+
+        # CurrentRequestMiddleware keeps the last request on settings; don't leak it into other tests
+        self.addCleanup(setattr, settings, "CURRENT_REQUEST", None)
+        client = APIClient()
+        payload = {"from_date": "2025-01-01 00:01:00", "to_date": "2025-01-01 23:59:00"}
+        with StubDeviceServer(emp_codes=self.emp_codes) as device:
+            self.device.api_link = device.url
+            self.device.save()
+            # Run the queued task in this process instead of sending it to a broker
+            with mock.patch.object(
+                run_attendance_sync_job, "delay", side_effect=lambda job_id: run_attendance_sync_job.apply(args=[job_id])
+            ), self.captureOnCommitCallbacks(execute=True):
+                response = client.post(reverse("execute_populate_attendance"), payload, format="json")
+
+        self.assertEqual(response.status_code, 202)
+        status_response = client.get(response.data["status_url"])
+        self.assertEqual(status_response.data["job_id"], response.data["job_id"])
+        self.assertEqual(status_response.data["status"], settings.COMPLETED)
+        self.assertEqual(
+            status_response.data["devices"], {"DEV-001": {"status": settings.COMPLETED, "punches": 10}}
+        )
+        self.assertEqual(status_response.data["rows"], {"inserted": 5, "updated": 0, "skipped": 0})
+        self.assertEqual(status_response.data["errors"], [])
+
+    def test_duplicate_sync_submission_joins_the_active_job(self):
+        # CurrentRequestMiddleware keeps the last request on settings; don't leak it into other tests
+        self.addCleanup(setattr, settings, "CURRENT_REQUEST", None)
+        client = APIClient()
+        payload = {"from_date": "2025-01-01 00:01:00", "to_date": "2025-01-01 23:59:00"}
+        with mock.patch("hrms_app.tasks.run_attendance_sync_job.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                first = client.post(reverse("execute_populate_attendance"), payload, format="json")
+                second = client.post(reverse("execute_populate_attendance"), payload, format="json")
+
+        self.assertEqual(first.data["job_id"], second.data["job_id"])
+        delay.assert_called_once_with(first.data["job_id"])
+        self.assertEqual(AttendanceSyncJob.objects.count(), 1)
+
+    def test_stale_sync_job_no_longer_blocks_its_range(self):
+        stale_job, _ = AttendanceSyncJob.submit(None, "2025-01-01 00:01:00", "2025-01-01 23:59:00")
+        AttendanceSyncJob.objects.filter(pk=stale_job.pk).update(
+            status=settings.RUNNING,
+            updated_at=timezone.now() - timedelta(seconds=settings.ATTENDANCE_SYNC_JOB_STALE_AFTER + 1),
+        )
+        live_job, _ = AttendanceSyncJob.submit("employee1", "2025-01-01 00:01:00", "2025-01-01 23:59:00")
+        AttendanceSyncJob.objects.filter(pk=live_job.pk).update(status=settings.RUNNING)
+
+        job, created = AttendanceSyncJob.submit(None, "2025-01-01 00:01:00", "2025-01-01 23:59:00")
+        self.assertTrue(created)
+        stale_job.refresh_from_db()
+        self.assertEqual(stale_job.status, settings.FAILED)
+        self.assertIn("worker presumed lost", stale_job.errors[0])
+        self.assertEqual(
+            AttendanceSyncJob.submit("employee1", "2025-01-01 00:01:00", "2025-01-01 23:59:00"), (live_job, False)
+        )
+
+    def test_sync_job_is_failed_when_its_worker_shuts_down(self):
+        from celery.exceptions import WorkerShutdown
+
+        from hrms_app.tasks import run_attendance_sync_job
+
+        job, _ = AttendanceSyncJob.submit(None, "2025-01-01 00:01:00", "2025-01-01 23:59:00")
+        with mock.patch("hrms_app.tasks.call_command", side_effect=WorkerShutdown()):
+            with self.assertRaises(WorkerShutdown):
+                run_attendance_sync_job(str(job.pk))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, settings.FAILED)
+        self.assertEqual(job.errors, ["Interrupted before finishing"])
+        self.assertIsNotNone(job.finished_at)
+
+    # The Celery app reads its settings from Django's, so the chord, its callbacks and
+    # the retries all run in this process
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+    def test_nightly_ingest_is_split_by_location(self):
+        from hrms_app.tasks import populate_attendance_log
+        branch = OfficeLocation.objects.create(
+            location_name="Branch", office_type=settings.CLUSTER_OFFICE, address="Branch"
+        )
+        branch_device = DeviceInformation.objects.create(
+            device_location=branch,
+            from_date="2025-01-01T00:00:00+05:30",
+            to_date="2025-01-01T23:59:00+05:30",
+            serial_number="DEV-002",
+            username="api",
+            password="secret",
+        )
+        CustomUser.objects.filter(username__in=["employee4", "employee5"]).update(device_location=branch)
+
+        with StubDeviceServer(emp_codes=self.emp_codes) as device, StubDeviceServer(
+            emp_codes=self.emp_codes, failure_rate=1
+        ) as failing_device:
+            self.device.api_link = device.url
+            self.device.save()
+            branch_device.api_link = failing_device.url
+            branch_device.save()
+            with self.assertLogs(level="INFO") as logs:
+                populate_attendance_log.delay()
+
+        # The failing location is retried on its own until its circuit opens; the healthy one ran once
+        self.assertEqual(device.request_count, 1)
+        self.assertEqual(failing_device.request_count, 9)
+        self.assertEqual(AttendanceLog.objects.count(), 3)
+        self.assertIn(
+            "Attendance ingest finished for 2 locations: 3 inserted, 0 updated, 0 skipped, 1 failed.",
+            "\n".join(logs.output),
+        )
+
+    def test_nightly_ingest_without_devices_still_precomputes_reports(self):
+        from hrms_app.tasks import populate_attendance_log
+
+        DeviceInformation.objects.all().delete()
+        with mock.patch("hrms_app.views.report_view.precompute_report_snapshots", return_value=4) as precompute:
+            self.assertEqual(populate_attendance_log(), 4)
+        precompute.assert_called_once_with()
@@ -0,0 +1,147 @@
+from datetime import date, datetime, time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils.timezone import make_aware
+
+from hrms_app.hrms.report_cache import get_cached_report
+from hrms_app.models import (
+    AttendanceLog,
+    CustomUser,
+    Department,
+    Designation,
+    Holiday,
+    OfficeLocation,
+    PersonalDetails,
+)
+from hrms_app.views.report_view import MonthAttendanceReportView
+
+JANUARY = (date(2025, 1, 1), date(2025, 1, 31))
+FEBRUARY = (date(2025, 2, 1), date(2025, 2, 28))
+
+
+# The summaries are rebuilt by a task started after commit; run it in process
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True, REPORT_CACHE_ENABLED=True)
+class ReportCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        designation = Designation.objects.create(
+            department=Department.objects.create(department="IT"), designation="Engineer"
+        )
+        self.locations = [
+            OfficeLocation.objects.create(
+                location_name=f"Office {index}", office_type=settings.HEAD_OFFICE, address="HQ"
+            )
+            for index in range(2)
+        ]
+        self.users = []
+        for index, location in enumerate(self.locations, start=1):
+            user = CustomUser.objects.create(
+                username=f"employee{index}",
+                first_name="Employee",
+                last_name=str(index),
+                device_location=location,
+            )
+            PersonalDetails.objects.create(
+                user=user,
+                employee_code=str(100 + index),
+                mobile_number=f"90000000{index:02}",
+                official_mobile_number=f"80000000{index:02}",
+                designation=designation,
+                doj=date(2024, 1, 1),
+            )
+            self.users.append(user)
+        self.builds = []
+
+    def get_report(self, location, date_range):
+        return get_cached_report(
+            "attendance",
+            location.pk if location else None,
+            *date_range,
+            True,
+            lambda: self.builds.append((location, date_range)) or len(self.builds),
+        )
+
+    def cached_reports(self):
+        """Which of the reports are still served from the cache."""
+        reports = [
+            (self.locations[0], JANUARY),
+            (self.locations[1], JANUARY),
+            (None, JANUARY),
+            (self.locations[0], FEBRUARY),
+        ]
+        cached = []
+        for location, date_range in reports:
+            before = len(self.builds)
+            self.get_report(location, date_range)
+            cached.append(len(self.builds) == before)
+        return cached
+
+    def test_repeat_reports_come_from_the_cache(self):
+        self.assertEqual(self.cached_reports(), [False, False, False, False])
+        self.assertEqual(self.cached_reports(), [True, True, True, True])
+
+    @override_settings(REPORT_CACHE_ENABLED=False)
+    def test_reports_are_built_every_time_without_a_shared_cache(self):
+        self.cached_reports()
+        self.assertEqual(self.cached_reports(), [False, False, False, False])
+
+    def test_saving_a_log_invalidates_its_location_and_month_only(self):
+        self.cached_reports()
+        login = make_aware(datetime(2025, 1, 15, 9, 5))
+        with self.captureOnCommitCallbacks(execute=True):
+            AttendanceLog.objects.create(
+                applied_by=self.users[0],
+                title="Attendance for Employee 1",
+                slug="employee1-2025-01-15",
+                start_date=login,
+                end_date=login.replace(hour=17),
+                att_status=settings.PRESENT,
+                att_status_short_code="P",
+            )
+        self.assertEqual(self.cached_reports(), [False, True, False, True])
+
+    def test_saving_a_holiday_invalidates_every_location(self):
+        self.cached_reports()
+        with self.captureOnCommitCallbacks(execute=True):
+            Holiday.objects.create(
+                title="Republic Day", short_code="FL", start_date=date(2025, 1, 26), color_hex="#FFA500"
+            )
+        self.assertEqual(self.cached_reports(), [False, False, False, True])
+
+    def test_report_view_renders_the_cached_table_after_an_approval(self):
+        request = RequestFactory().get(
+            "/",
+            {
+                "location": self.locations[0].pk,
+                "from_date": "2025-01-01",
+                "to_date": "2025-01-31",
+                "active": "on",
+            },
+        )
+        request.user = self.users[0]
+
+        def render_table():
+            view = MonthAttendanceReportView()
+            view.setup(request)
+            return view.get_context_data()["report_table"]
+
+        self.assertNotIn(">P<", render_table())
+        login = make_aware(datetime.combine(date(2025, 1, 15), time(9, 5)))
+        with self.captureOnCommitCallbacks(execute=True):
+            AttendanceLog.objects.create(
+                applied_by=self.users[0],
+                title="Attendance for Employee 1",
+                slug="employee1-2025-01-15",
+                start_date=login,
+                end_date=login.replace(hour=17),
+                att_status=settings.PRESENT,
+                att_status_short_code="P",
+                color_hex="#00FF00",
+            )
+        table = render_table()
+        self.assertIn(">P<", table)
+        # Only the filter form's location lookup and the snapshot lookup are left on a repeat view
+        with self.assertNumQueries(2):
+            self.assertEqual(render_table(), table)
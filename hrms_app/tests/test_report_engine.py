@@ -0,0 +1,179 @@
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.test import TestCase
+from django.utils.timezone import make_aware
+
+from hrms_app.hrms.report_engine import ColumnarPresenceEngine, get_presence_day_status
+from hrms_app.models import (
+    AttendanceLog,
+    CustomUser,
+    Department,
+    Designation,
+    Holiday,
+    LeaveApplication,
+    LeaveDay,
+    LeaveType,
+    PersonalDetails,
+    UserTour,
+)
+from hrms_app.views.report_view import (
+    ABSENT_ENTRIES,
+    SANDWICHED_STATUSES,
+    apply_sandwich_rule,
+    build_monthly_presence_data,
+    get_report_dates,
+)
+
+
+class ColumnarPresenceEngineTestCase(TestCase):
+    def setUp(self):
+        designation = Designation.objects.create(
+            department=Department.objects.create(department="IT"), designation="Engineer"
+        )
+        self.users = []
+        for index in range(1, 5):
+            user = CustomUser.objects.create(
+                username=f"employee{index}", first_name="Employee", last_name=str(index)
+            )
+            PersonalDetails.objects.create(
+                user=user,
+                employee_code=str(100 + index),
+                mobile_number=f"90000000{index:02}",
+                official_mobile_number=f"80000000{index:02}",
+                designation=designation,
+                doj=date(2024, 1, 1),
+            )
+            self.users.append(user)
+        self.leave_type = LeaveType.objects.create(
+            leave_type=settings.CL, leave_type_short_code="CL", half_day_short_code="CL/2"
+        )
+        Holiday.objects.bulk_create(
+            [
+                Holiday(title="Makar Sankranti", short_code="FL", start_date=date(2025, 1, 14), color_hex="#FFA500"),
+                Holiday(title="Lohri", short_code="RH", start_date=date(2025, 1, 13), color_hex="#FFA500"),
+                # Falls on a Sunday, which keeps its OFF
+                Holiday(title="Republic Day", short_code="FL", start_date=date(2025, 1, 26), color_hex="#FFA500"),
+            ]
+        )
+
+    def make_log(self, user, day, short_code, hour=9, regularized=False):
+        login = make_aware(datetime.combine(day, time(hour, 5)))
+        return AttendanceLog(
+            applied_by=user,
+            title=f"Attendance for {user.username} on {day}",
+            slug=f"{user.username}-{day}-{hour}",
+            start_date=login,
+            end_date=login + timedelta(hours=8, minutes=35),
+            duration=time(8, 35),
+            att_status=settings.PRESENT,
+            att_status_short_code=short_code,
+            color_hex="#00FF00",
+            regularized=regularized,
+        )
+
+    def create_leave(self, user, days, half_days=()):
+        # Bulk created to keep the leave balance signals out of the way
+        application = LeaveApplication.objects.bulk_create(
+            [
+                LeaveApplication(
+                    leave_type=self.leave_type,
+                    applicationNo=f"{user.username}-{days[0]}",
+                    appliedBy=user,
+                    startDate=make_aware(datetime.combine(days[0], time.min)),
+                    endDate=make_aware(datetime.combine(days[-1], time.min)),
+                    usedLeave=len(days),
+                    balanceLeave=0,
+                    status=settings.APPROVED,
+                    slug=f"{user.username}-{days[0]}",
+                )
+            ]
+        )[0]
+        LeaveDay.objects.bulk_create(
+            [
+                LeaveDay(leave_application=application, date=day, is_full_day=day not in half_days)
+                for day in days
+            ]
+        )
+
+    def create_tour(self, user, start_date, end_date):
+        UserTour.objects.bulk_create(
+            [
+                UserTour(
+                    applied_by=user,
+                    from_destination="HQ",
+                    to_destination="Plant",
+                    start_date=start_date,
+                    start_time=time(10, 0),
+                    end_date=end_date,
+                    end_time=time(16, 0),
+                    status=settings.APPROVED,
+                    slug=f"tour-{user.username}-{start_date}",
+                )
+            ]
+        )
+
+    def get_sandwiched_days(self, presence_data, from_date, to_date):
+        """The days `apply_sandwich_rule` turns into absences, run over each employee's row."""
+        days = [day.strftime("%Y-%m-%d") for day in get_report_dates(from_date, to_date)]
+        sandwiched = set()
+        for emp_code, presence in presence_data.items():
+            statuses = [get_presence_day_status(presence[day]) if presence.get(day) else "A" for day in days]
+            cells = apply_sandwich_rule([[{"status": status}] for status in statuses])
+            sandwiched |= {
+                (emp_code, day)
+                for day, status, cell in zip(days, statuses, cells)
+                if status in SANDWICHED_STATUSES and cell is ABSENT_ENTRIES
+            }
+        return sandwiched
+
+    def assertSameAsRowEngine(self, from_date, to_date):
+        employees = CustomUser.objects.filter(personal_detail__isnull=False)
+        expected = build_monthly_presence_data(employees, from_date, to_date)
+        engine = ColumnarPresenceEngine(employees, from_date, to_date)
+        self.assertEqual(engine.build(), expected)
+        self.assertEqual(engine.build_sandwiched_days(), self.get_sandwiched_days(expected, from_date, to_date))
+        return expected
+
+    def test_matches_the_row_engine(self):
+        AttendanceLog.objects.bulk_create(
+            [
+                self.make_log(self.users[0], date(2025, 1, 2), "P", regularized=True),
+                self.make_log(self.users[0], date(2025, 1, 3), "H"),
+                # Two logs on a day; the older one is processed last and wins
+                self.make_log(self.users[0], date(2025, 1, 6), "P", hour=9),
+                self.make_log(self.users[0], date(2025, 1, 6), "H", hour=14),
+                # Clocked in before 05:30, so keyed by the previous UTC day
+                self.make_log(self.users[1], date(2025, 1, 8), "P", hour=2),
+                self.make_log(self.users[1], date(2025, 1, 14), "P"),
+            ]
+        )
+        # Runs over the FL holiday and a Sunday, and past the end of the range
+        self.create_leave(self.users[1], [date(2025, 1, 12), date(2025, 1, 13), date(2025, 1, 14)])
+        self.create_leave(self.users[2], [date(2025, 1, 30), date(2025, 1, 31), date(2025, 2, 1)], [date(2025, 1, 31)])
+        self.create_tour(self.users[2], date(2025, 1, 20), date(2025, 1, 22))
+        self.create_tour(self.users[3], date(2025, 1, 5), date(2025, 1, 6))
+        self.create_leave(self.users[3], [date(2025, 1, 6)])
+
+        expected = self.assertSameAsRowEngine("2025-01-01", "2025-01-31")
+        self.assertNotIn("sunday", expected["102"]["2025-01-12"])
+        self.assertEqual(expected["102"]["2025-01-13"]["holiday"]["status"], "RH")
+        self.assertNotIn("holiday", expected["102"]["2025-01-14"])
+        self.assertEqual(expected["103"]["2025-01-31"]["leave"]["leave"], "CL/2")
+        self.assertEqual(expected["102"]["2025-01-07"]["present"]["in_time"], "02:05 AM")
+        self.assertEqual(expected["101"]["2025-01-26"], {"sunday": {"status": "OFF", "in_time": None, "out_time": None, "total_duration": None}})
+
+        sandwiched = ColumnarPresenceEngine(
+            CustomUser.objects.filter(personal_detail__isnull=False), "2025-01-01", "2025-01-31"
+        ).build_sandwiched_days()
+        # Absent on the Saturday and Monday either side
+        self.assertIn(("101", "2025-01-19"), sandwiched)
+        # The Monday after is a tour day
+        self.assertNotIn(("103", "2025-01-19"), sandwiched)
+        # The Lohri holiday the day before isn't an absence
+        self.assertNotIn(("101", "2025-01-14"), sandwiched)
+
+    def test_matches_the_row_engine_without_activity(self):
+        self.assertSameAsRowEngine("2025-01-01", "2025-01-31")
+        # No Sunday or holiday in range, so no employee has an entry
+        self.assertEqual(self.assertSameAsRowEngine("2025-01-06", "2025-01-10"), {})
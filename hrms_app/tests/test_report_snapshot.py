@@ -0,0 +1,144 @@
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils.timezone import make_aware
+
+from hrms_app.models import (
+    AttendanceLog,
+    CustomUser,
+    Department,
+    Designation,
+    OfficeLocation,
+    PersonalDetails,
+    ReportSnapshot,
+)
+from hrms_app.views.report_view import (
+    DetailedMonthlyPresenceView,
+    MonthAttendanceReportView,
+    precompute_report_snapshots,
+)
+
+
+# The summaries are rebuilt by a task started after commit; run it in process
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class ReportSnapshotTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        designation = Designation.objects.create(
+            department=Department.objects.create(department="IT"), designation="Engineer"
+        )
+        self.locations = [
+            OfficeLocation.objects.create(
+                location_name=f"Office {index}", office_type=settings.HEAD_OFFICE, address="HQ"
+            )
+            for index in range(2)
+        ]
+        self.user = CustomUser.objects.create(
+            username="employee1", first_name="Employee", last_name="1", device_location=self.locations[0]
+        )
+        PersonalDetails.objects.create(
+            user=self.user,
+            employee_code="101",
+            mobile_number="9000000001",
+            official_mobile_number="8000000001",
+            designation=designation,
+            doj=date(2024, 1, 1),
+        )
+
+    def get_context(self, view_class, **params):
+        request = RequestFactory().get(
+            "/",
+            {
+                "location": self.locations[0].pk,
+                "from_date": "2025-01-01",
+                "to_date": "2025-01-31",
+                "active": "on",
+                **params,
+            },
+        )
+        request.user = self.user
+        view = view_class()
+        view.setup(request)
+        return view.get_context_data()
+
+    def save_log(self):
+        login = make_aware(datetime(2025, 1, 15, 9, 5))
+        with self.captureOnCommitCallbacks(execute=True):
+            AttendanceLog.objects.create(
+                applied_by=self.user,
+                title="Attendance for Employee 1",
+                slug="employee1-2025-01-15",
+                start_date=login,
+                end_date=login.replace(hour=17),
+                att_status=settings.PRESENT,
+                att_status_short_code="P",
+                color_hex="#00FF00",
+            )
+
+    def test_previous_and_current_month_are_precomputed_per_location(self):
+        stale = ReportSnapshot.store(
+            settings.REPORT_ATTENDANCE, self.locations[0].pk, date(2024, 12, 1), date(2024, 12, 31), True, ""
+        )
+        detailed = ReportSnapshot.store(
+            settings.REPORT_DETAILED, self.locations[0].pk, date(2025, 1, 1), date(2025, 1, 31), True, ""
+        )
+        self.save_log()
+
+        self.assertEqual(precompute_report_snapshots(today=date(2025, 2, 10)), 4)
+        self.assertFalse(ReportSnapshot.objects.filter(pk__in=[stale.pk, detailed.pk]).exists())
+        self.assertEqual(
+            set(ReportSnapshot.objects.values_list("report", "location", "from_date", "to_date")),
+            {
+                (settings.REPORT_ATTENDANCE, location.pk, month_start, month_end)
+                for location in self.locations
+                for month_start, month_end in (
+                    (date(2025, 1, 1), date(2025, 1, 31)),
+                    (date(2025, 2, 1), date(2025, 2, 28)),
+                )
+            },
+        )
+        snapshot = ReportSnapshot.objects.get(location=self.locations[0], from_date=date(2025, 1, 1))
+        self.assertIn(">P<", snapshot.html)
+        self.assertLess(len(snapshot.content), len(snapshot.html))
+
+    def test_view_serves_the_snapshot_until_recomputed(self):
+        precompute_report_snapshots(today=date(2025, 1, 31))
+
+        context = self.get_context(MonthAttendanceReportView)
+        snapshot_at = context["snapshot_at"]
+        self.assertIsNotNone(snapshot_at)
+        self.assertEqual(self.get_context(MonthAttendanceReportView)["snapshot_at"], snapshot_at)
+
+        context = self.get_context(MonthAttendanceReportView, recompute="true")
+        self.assertGreater(context["snapshot_at"], snapshot_at)
+        self.assertEqual(self.get_context(MonthAttendanceReportView)["report_table"], context["report_table"])
+
+    def test_snapshots_of_a_changed_month_are_refreshed_on_the_next_request(self):
+        precompute_report_snapshots(today=date(2025, 1, 31))
+        snapshot_at = self.get_context(MonthAttendanceReportView)["snapshot_at"]
+        self.save_log()
+
+        # Only January of the log's location is affected
+        self.assertEqual(
+            set(ReportSnapshot.objects.filter(stale=True).values_list("location", "from_date")),
+            {(self.locations[0].pk, date(2025, 1, 1))},
+        )
+        context = self.get_context(MonthAttendanceReportView)
+        self.assertGreater(context["snapshot_at"], snapshot_at)
+        self.assertIn(">P<", context["report_table"])
+        self.assertFalse(ReportSnapshot.objects.filter(stale=True).exists())
+
+    def test_detailed_report_is_rendered_from_the_summaries(self):
+        precompute_report_snapshots(today=date(2025, 1, 31))
+        self.save_log()
+        context = self.get_context(DetailedMonthlyPresenceView, recompute="true")
+        self.assertIsNone(context["snapshot_at"])
+        self.assertIn(">P<", context["html_table"])
+
+    def test_reports_without_a_snapshot_are_rendered_live(self):
+        self.save_log()
+        context = self.get_context(MonthAttendanceReportView, to_date="2025-01-20")
+        self.assertIsNone(context["snapshot_at"])
+        self.assertIn(">P<", context["report_table"])
@@ -0,0 +1,271 @@
+import csv
+import json
+import os
+from datetime import date, datetime, time, timedelta
+from io import BytesIO
+from unittest.mock import patch
+
+from django.conf import settings
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import make_aware
+from openpyxl import load_workbook
+
+from hrms_app.models import (
+    AttendanceDaySummary,
+    AttendanceLog,
+    CustomUser,
+    Department,
+    Designation,
+    OfficeLocation,
+    PersonalDetails,
+    UserTour,
+)
+from hrms_app.views.report_view import (
+    ABSENT_ENTRIES,
+    DetailedMonthlyPresenceDataView,
+    DetailedMonthlyPresenceView,
+    apply_sandwich_rule,
+    exportDetailedMonthlyPresenceView,
+    get_tour_day_durations,
+)
+
+
+class SandwichRuleTestCase(SimpleTestCase):
+    def days(self, *statuses):
+        return [[{"status": status, "color": "#000000"}] if status else [] for status in statuses]
+
+    def statuses(self, cells):
+        return [" ".join(entry["status"] for entry in cell) for cell in cells]
+
+    def test_off_and_holidays_between_absences_are_absent(self):
+        cells = apply_sandwich_rule(self.days("P", "A", "OFF", None, "FL", None, "OFF", "P"))
+        self.assertEqual(self.statuses(cells), ["P", "A", "A", "A", "A", "A", "OFF", "P"])
+        self.assertIs(cells[3], ABSENT_ENTRIES)
+
+    def test_days_outside_the_report_count_as_absences(self):
+        self.assertEqual(self.statuses(apply_sandwich_rule(self.days("OFF", "A", "FL"))), ["A", "A", "A"])
+
+    def test_neighbours_are_judged_by_their_own_entries(self):
+        # Each OFF has the other as a neighbour, so neither is sandwiched
+        self.assertEqual(
+            self.statuses(apply_sandwich_rule(self.days("A", "OFF", "OFF", "A"))), ["A", "OFF", "OFF", "A"]
+        )
+
+    def test_the_last_entry_of_a_day_decides(self):
+        cells = apply_sandwich_rule(
+            [self.days("A")[0], [{"status": "P"}, {"status": "OFF"}], [{"status": "FL"}, {"status": "A"}]]
+        )
+        self.assertEqual(self.statuses(cells), ["A", "A", "FL A"])
+
+
+class TourDayDurationTestCase(TestCase):
+    def setUp(self):
+        self.users = [CustomUser.objects.create(username=f"employee{index}") for index in range(1, 5)]
+
+    def create_tours(self, count):
+        # Bulk created to keep the tour notification signals out of the way
+        return UserTour.objects.bulk_create(
+            [
+                UserTour(
+                    applied_by=self.users[index % len(self.users)],
+                    from_destination="HQ",
+                    to_destination="Plant",
+                    start_date=date(2025, 1, 1) + timedelta(days=index % 20),
+                    start_time=time(10, 0),
+                    end_date=date(2025, 1, 3) + timedelta(days=index % 20),
+                    end_time=time(16, 0),
+                    status=settings.APPROVED,
+                    slug=f"tour-{count}-{index}",
+                )
+                for index in range(count)
+            ]
+        )
+
+    def create_log(self, user, day, duration):
+        login = make_aware(datetime.combine(day, time(9, 0)))
+        return AttendanceLog.objects.bulk_create(
+            [
+                AttendanceLog(
+                    applied_by=user,
+                    title=f"Attendance for {user.username} on {day}",
+                    slug=f"{user.username}-{day}",
+                    start_date=login,
+                    end_date=login + timedelta(hours=duration.hour),
+                    duration=duration,
+                )
+            ]
+        )
+
+    def test_query_count_does_not_grow_with_tours(self):
+        for count in (5, 50):
+            tours = self.create_tours(count)
+            with self.assertNumQueries(1):
+                tour_days = get_tour_day_durations(tours)
+            self.assertEqual(len(tour_days), count)
+            self.assertTrue(all(len(days) == 3 for days in tour_days.values()))
+
+    def test_only_the_touring_employees_log_is_counted(self):
+        tour = UserTour.objects.bulk_create(
+            [
+                UserTour(
+                    applied_by=self.users[0],
+                    from_destination="HQ",
+                    to_destination="Plant",
+                    start_date=date(2025, 1, 6),
+                    start_time=time(18, 0),
+                    end_date=date(2025, 1, 7),
+                    end_time=time(6, 0),
+                    status=settings.APPROVED,
+                    slug="tour-short-days",
+                )
+            ]
+        )[0]
+        # Someone else's short day on the 6th must not count towards this tour
+        self.create_log(self.users[1], date(2025, 1, 6), time(3, 0))
+        self.create_log(self.users[0], date(2025, 1, 7), time(3, 0))
+
+        # Six hours on tour each day; only the employee's own three hours in the office on the 7th add up
+        days = get_tour_day_durations([tour])[tour.pk]
+        self.assertEqual(
+            [(day, short_code) for day, short_code, _ in days],
+            [(date(2025, 1, 6), "TH"), (date(2025, 1, 7), "T")],
+        )
+
+
+class DetailedReportExportTestCase(TestCase):
+    def setUp(self):
+        designation = Designation.objects.create(
+            department=Department.objects.create(department="IT"), designation="Engineer"
+        )
+        self.location = OfficeLocation.objects.create(
+            location_name="Head Office", office_type=settings.HEAD_OFFICE, address="HQ"
+        )
+        for index in range(1, 3):
+            user = CustomUser.objects.create(
+                username=f"employee{index}",
+                first_name="Employee",
+                last_name=str(index),
+                device_location=self.location,
+            )
+            PersonalDetails.objects.create(
+                user=user,
+                employee_code=str(index),
+                mobile_number=f"90000000{index:02}",
+                official_mobile_number=f"80000000{index:02}",
+                designation=designation,
+                doj=date(2025, 1, 2),
+            )
+            AttendanceDaySummary.objects.create(
+                employee=user,
+                date=date(2025, 1, 2),
+                status="P",
+                in_time=time(9, 5),
+                out_time=time(17, 40),
+                duration=time(8, 35),
+                regularized=index == 2,
+            )
+        self.factory = RequestFactory()
+
+    def export(self, export_format):
+        request = self.factory.get(
+            "/",
+            {
+                "from_date": "2025-01-01",
+                "to_date": "2025-01-03",
+                "location": self.location.pk,
+                "active": "on",
+                "export": export_format,
+            },
+        )
+        return exportDetailedMonthlyPresenceView(request)
+
+    def expected_rows(self, code, name, reg):
+        return [
+            [code, name, "Status", "A", "P", "A"],
+            [code, name, "In Time", "", "09:05 AM", ""],
+            [code, name, "Out Time", "", "05:40 PM", ""],
+            [code, name, "Duration", "", "08:35:00", ""],
+            [code, name, "Leave", "", "", ""],
+            [code, name, "Tour", "", "", ""],
+            [code, name, "Reg", "", reg, ""],
+        ]
+
+    def test_csv_export_streams_the_report_rows(self):
+        response = self.export("csv")
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            response["Content-Disposition"],
+            'attachment; filename="monthly_presence_data_from_2025-01-01_to_2025-01-03.csv"',
+        )
+        rows = list(csv.reader(b"".join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0], ["Employee Code", "Name", "Attendance", "1-Jan", "2-Jan", "3-Jan"])
+        self.assertEqual(
+            sorted(rows[1:]),
+            sorted(
+                self.expected_rows("KMPCL-001", "Employee 1", "")
+                + self.expected_rows("KMPCL-002", "Employee 2", "R")
+            ),
+        )
+
+    def test_xlsx_export_is_streamed_from_a_temporary_file(self):
+        response = self.export("true")
+        self.assertEqual(
+            response["Content-Type"],
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+        path = response.file_to_stream.name
+        content = b"".join(response.streaming_content)
+        response.close()
+        self.assertFalse(os.path.exists(path))
+        worksheet = load_workbook(BytesIO(content)).active
+        rows = [[value or "" for value in row] for row in worksheet.iter_rows(values_only=True)]
+        self.assertEqual(rows[0], ["Employee Code", "Name", "Attendance", "1-Jan", "2-Jan", "3-Jan"])
+        self.assertEqual(len(rows), 15)
+        self.assertIn(["KMPCL-002", "Employee 2", "Reg", "", "R", ""], rows)
+
+    def get(self, view_class, **params):
+        request = self.factory.get(
+            "/",
+            {
+                "from_date": "2025-01-01",
+                "to_date": "2025-01-03",
+                "location": self.location.pk,
+                "active": "on",
+                **params,
+            },
+        )
+        request.user = CustomUser.objects.get(username="employee1")
+        return view_class.as_view()(request)
+
+    def test_page_only_renders_the_table_header(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(DetailedMonthlyPresenceView)
+            response.render()
+        # No report row is computed until the page asks for it
+        self.assertFalse(any("tbl_attendance_day_summary" in query["sql"] for query in queries))
+        content = response.content.decode()
+        self.assertIn('<th class="sticky-header">2-Jan</th>', content)
+        self.assertIn('data-url="/detailed-attendance-report/data/?', content)
+        self.assertNotIn("KMPCL-001", content)
+
+    def test_data_pages_by_employee(self):
+        with patch("hrms_app.views.report_view.PRESENCE_REPORT_PAGE_SIZE", 1):
+            first = json.loads(self.get(DetailedMonthlyPresenceDataView).content)
+            second = json.loads(self.get(DetailedMonthlyPresenceDataView, page=2).content)
+
+        self.assertEqual((first["page"], first["num_pages"], first["count"]), (1, 2, 2))
+        self.assertEqual((first["next_page"], second["next_page"]), (2, None))
+        self.assertEqual([row["employee_code"] for row in first["rows"] + second["rows"]], ["KMPCL-001", "KMPCL-002"])
+        cells = second["rows"][0]["cells"]
+        self.assertEqual([cell["status"] for cell in cells], ["A", "P", "A"])
+        self.assertEqual(cells[1]["in_time"], "09:05 AM")
+        self.assertEqual(cells[1]["total_duration"], "08:35:00")
+        self.assertEqual(cells[1]["reg"], "R")
+        self.assertEqual(cells[1]["style"], "text-success")
+
+    def test_data_rejects_invalid_filters(self):
+        response = self.get(DetailedMonthlyPresenceDataView, location="")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("location", json.loads(response.content)["errors"])
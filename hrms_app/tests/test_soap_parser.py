@@ -0,0 +1,60 @@
+from datetime import date, datetime
+
+from django.test import SimpleTestCase
+
+from hrms_app.hrms.device_simulator import SOAP_RESPONSE_TEMPLATE
+from hrms_app.hrms.utils import (
+    group_transaction_lines,
+    iter_transaction_lines,
+    parse_punch_time,
+)
+
+
+def split_chunks(payload, size):
+    return [payload[offset : offset + size] for offset in range(0, len(payload), size)]
+
+
+class TransactionLogParserTestCase(SimpleTestCase):
+    def setUp(self):
+        data = "\n".join(
+            [
+                "101\t2025-01-01 09:02:41",
+                "102\t2025-01-01 09:10:05",
+                "101\t2025-01-01 18:01:13",
+                "101\t2025-01-02 09:00:00",
+                "bad-line",
+                "102\tnot-a-timestamp",
+            ]
+        )
+        self.payload = SOAP_RESPONSE_TEMPLATE.format(data=data).encode("utf-8")
+
+    def test_lines_survive_any_chunk_boundary(self):
+        expected = list(iter_transaction_lines([self.payload]))
+        for size in (1, 7, 64, 1024):
+            self.assertEqual(list(iter_transaction_lines(split_chunks(self.payload, size))), expected)
+        self.assertEqual(len(expected), 6)
+
+    def test_grouping_by_employee_and_date(self):
+        grouped = group_transaction_lines(iter_transaction_lines([self.payload]), include_seconds=False)
+        self.assertEqual(sorted(grouped), ["101", "102"])
+        self.assertEqual(
+            grouped["101"][date(2025, 1, 1)],
+            [datetime(2025, 1, 1, 9, 2), datetime(2025, 1, 1, 18, 1)],
+        )
+        self.assertEqual(grouped["101"][date(2025, 1, 2)], [datetime(2025, 1, 2, 9, 0)])
+        self.assertEqual(grouped["102"][date(2025, 1, 1)], [datetime(2025, 1, 1, 9, 10)])
+
+    def test_parse_punch_time_matches_strptime(self):
+        value = "2025-03-09 23:59:58"
+        self.assertEqual(parse_punch_time(value), datetime.strptime(value, "%Y-%m-%d %H:%M:%S"))
+        self.assertEqual(
+            parse_punch_time(value, include_seconds=False),
+            datetime.strptime(value[:16], "%Y-%m-%d %H:%M"),
+        )
+        with self.assertRaises(ValueError):
+            parse_punch_time("2025-03-09T23:59:58")
+
+    def test_missing_data_list_raises(self):
+        payload = b'<?xml version="1.0"?><Envelope><Body></Body></Envelope>'
+        with self.assertRaises(ValueError):
+            list(iter_transaction_lines([payload]))
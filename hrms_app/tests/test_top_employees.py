@@ -0,0 +1,83 @@
+import json
+from datetime import date, datetime, time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils.timezone import make_aware
+
+from hrms_app.models import AttendanceLog, CustomUser
+from hrms_app.views.api_views import Top5EmployeesView
+
+
+# The summaries are rebuilt by a task started after commit; run it in process
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class Top5EmployeesViewTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [CustomUser.objects.create(username=f"employee{index}") for index in range(1, 8)]
+        # Bulk created, so no summary refresh is queued by the signals
+        AttendanceLog.objects.bulk_create(
+            [
+                self.make_log(user, date(2025, month, day), time(8, index * 5))
+                for index, user in enumerate(self.users)
+                for month in (1, 3)
+                for day in (2, 3)
+            ]
+            # Only two employees worked in February
+            + [self.make_log(user, date(2025, 2, 4), time(6, 0)) for user in self.users[:2]]
+        )
+
+    def make_log(self, user, day, duration):
+        login = make_aware(datetime.combine(day, time(9, 0)))
+        return AttendanceLog(
+            applied_by=user,
+            title=f"Attendance for {user.username} on {day}",
+            slug=f"{user.username}-{day}",
+            start_date=login,
+            end_date=login.replace(hour=17),
+            duration=duration,
+            att_status=settings.PRESENT,
+            att_status_short_code="P",
+        )
+
+    def get_chart(self, year=2025):
+        response = Top5EmployeesView.as_view()(RequestFactory().get("/"), year=year)
+        return json.loads(response.content)
+
+    def test_top_five_per_month_from_one_query(self):
+        with self.assertNumQueries(1):
+            chart = self.get_chart()
+
+        self.assertEqual(chart["labels"][:3], ["JAN", "FEB", "MAR"])
+        self.assertEqual(
+            [(dataset["label"], dataset["data"]) for dataset in chart["datasets"]],
+            [
+                ("employee7", [17.0, 17.0]),
+                ("employee6", [16.83, 16.83]),
+                ("employee5", [16.67, 16.67]),
+                ("employee4", [16.5, 16.5]),
+                ("employee3", [16.33, 16.33]),
+                ("employee1", [6.0]),
+                ("employee2", [6.0]),
+            ],
+        )
+        self.assertEqual(chart["datasets"][0]["borderColor"], "#1F3BB3")
+        self.assertFalse(chart["datasets"][0]["fill"])
+
+    @override_settings(REPORT_CACHE_ENABLED=True)
+    def test_chart_is_cached_until_attendance_of_the_year_changes(self):
+        chart = self.get_chart()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_chart(), chart)
+
+        # A log of another year leaves the chart cached
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_log(self.users[0], date(2024, 6, 3), time(12, 0)).save()
+        with self.assertNumQueries(0):
+            self.get_chart()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_log(self.users[0], date(2025, 6, 3), time(12, 0)).save()
+        datasets = {dataset["label"]: dataset["data"] for dataset in self.get_chart()["datasets"]}
+        self.assertEqual(datasets["employee1"], [6.0, 12.0])
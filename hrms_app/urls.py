@@ -32,6 +32,7 @@ urlpatterns = [
     path('notifications/', UserMonthlyNotificationsListView.as_view(), name='user_notifications'),
     path('notifications/<int:id>/', UpdateNotificationStatusView.as_view(), name='update-notification-status'),
     path("execute-populate-attendance/", ExecutePopulateAttendanceView.as_view(), name="execute_populate_attendance"),
+    path("attendance-sync-jobs/<uuid:pk>/", AttendanceSyncJobStatusView.as_view(), name="attendance_sync_job_status"),
     path('attendance-aggregation/', Top5EmployeesDurationAPIView.as_view(), name='attendance-aggregation'),
     path('get_top_5_employees/<int:year>/', Top5EmployeesView.as_view(), name='get_top_5_employees'),
 
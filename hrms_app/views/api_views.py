@@ -1244,12 +1244,15 @@ class DeviceInformationViewSet(viewsets.ModelViewSet):
         )
 
 
-from django.core.management import call_command
+from django.db import transaction
+from django.urls import reverse
 from rest_framework.views import APIView
+from hrms_app.models import AttendanceSyncJob
 
 class ExecutePopulateAttendanceView(APIView):
     """
-    API endpoint to manually execute the `populate_attendance` command.
+    API endpoint to queue the `populate_attendance` command as a background job.
+    Submitting the same user and range while a job is still running returns that job.
     """
 
     def post(self, request, *args, **kwargs):
@@ -1261,16 +1264,65 @@ class ExecutePopulateAttendanceView(APIView):
         if userid:
             user = get_object_or_404(get_user_model(),pk=userid)
             username = user.username
-        
+
         try:
-            call_command("pop_att", "--username", username, "--from-date", from_date, "--to-date", to_date)
-            return Response({"message": "Data synced successfully!"}, status=status.HTTP_200_OK)
+            from hrms_app.tasks import run_attendance_sync_job
+
+            job, created = AttendanceSyncJob.submit(
+                username,
+                from_date,
+                to_date,
+                requested_by=request.user if request.user.is_authenticated else None,
+            )
+            if created:
+                transaction.on_commit(lambda: run_attendance_sync_job.delay(str(job.pk)))
+            message = _("Sync started.") if created else _("A sync for this range is already running.")
+            return Response(
+                {
+                    "message": message,
+                    "job_id": str(job.pk),
+                    "status_url": reverse("attendance_sync_job_status", args=[job.pk]),
+                },
+                status=status.HTTP_202_ACCEPTED,
+            )
         except Exception as e:
             return Response(
                 {"error": f"Failed to sync data: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+
+class AttendanceSyncJobStatusView(APIView):
+    """
+    Progress of an attendance sync job: overall status, per-device progress,
+    logs processed (reclassification jobs), rows written and errors.
+    """
+
+    def get(self, request, pk, *args, **kwargs):
+        job = get_object_or_404(AttendanceSyncJob, pk=pk)
+        return Response(
+            {
+                "job_id": str(job.pk),
+                "job_type": job.job_type,
+                "status": job.status,
+                "username": job.username,
+                "from_date": job.from_date,
+                "to_date": job.to_date,
+                "devices": job.devices,
+                "rows": {
+                    "inserted": job.inserted,
+                    "updated": job.updated,
+                    "skipped": job.skipped,
+                },
+                "progress": {"processed": job.processed, "total": job.total},
+                "errors": job.errors,
+                "created_at": job.created_at,
+                "started_at": job.started_at,
+                "finished_at": job.finished_at,
+            },
+            status=status.HTTP_200_OK,
+        )
+
 class Top5EmployeesDurationAPIView(APIView):
     """
     API for aggregating attendance log data, providing top 5 employees based on
@@ -1395,70 +1447,88 @@ class Top5EmployeesDurationAPIView(APIView):
 
 from django.http import JsonResponse
 from django.views import View
-from django.db.models import Sum
-from datetime import timedelta
+from django.db.models import F, Sum, Window
+from django.db.models.functions import (
+    ExtractHour,
+    ExtractMinute,
+    ExtractSecond,
+    RowNumber,
+    TruncMonth,
+)
+from datetime import date, timedelta
+from hrms_app.hrms.report_cache import get_cached_report
 
-class Top5EmployeesView(View):
-    def get(self, request, year):
-        # Get holidays for the specified year
-        holidays = Holiday.objects.filter(start_date__year=year)
-
-        # Initialize a dictionary to store the total working hours per employee per month
-        top_5_data = {month: [] for month in range(1, 13)}  # For each month, store top 5 employees
-
-        for month in range(1, 13):
-            # Filter AttendanceLog for each month, considering holidays and weekends
-            monthly_data = (
-                AttendanceLog.objects
-                .filter(start_date__year=year, start_date__month=month)
-                .exclude(start_date__week_day=7)  # Exclude Sundays
-                .exclude(start_date__in=holidays.values('start_date'))  # Exclude holidays
-                .values('applied_by__username')  # Use username as identifier
-                .annotate(total_duration=Sum('duration'))
-                .order_by('-total_duration')[:5]  # Get top 5 employees for the current month
+TOP_EMPLOYEES_REPORT = "top_5_employees"
+TOP_EMPLOYEES_PER_MONTH = 5
+MONTH_LABELS = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+
+
+def get_top_employees_by_month(year):
+    """
+    The employees with the most attendance hours in each month of `year`, in one
+    query: durations are summed per employee and month, ranked within the month and
+    cut to `TOP_EMPLOYEES_PER_MONTH`. Rows come month by month, best first.
+    """
+    holidays = Holiday.objects.filter(start_date__year=year)
+    return (
+        AttendanceLog.objects.filter(start_date__year=year)
+        .exclude(start_date__week_day=7)  # Exclude Sundays
+        .exclude(start_date__in=holidays.values("start_date"))  # Exclude holidays
+        .annotate(month=TruncMonth("start_date"))
+        .values("month", "applied_by__username")
+        # Durations are times of day, which databases do not sum
+        .annotate(
+            total_seconds=Sum(
+                ExtractHour("duration") * 3600
+                + ExtractMinute("duration") * 60
+                + ExtractSecond("duration")
+            )
+        )
+        .filter(total_seconds__gt=0)
+        .annotate(
+            rank=Window(
+                RowNumber(),
+                partition_by=F("month"),
+                order_by=[F("total_seconds").desc(), F("applied_by__username").asc()],
             )
+        )
+        .filter(rank__lte=TOP_EMPLOYEES_PER_MONTH)
+        .order_by("month", "rank")
+    )
+
+
+def get_top_employees_chart(year):
+    """Chart data of the top employees of `year`, with one dataset per employee."""
+    employees = {}  # Keep track of employees and their data across all months
+    for record in get_top_employees_by_month(year):
+        employee_id = record["applied_by__username"]
+        # Only months the employee made the top five in are listed
+        employees.setdefault(employee_id, []).append(
+            round(record["total_seconds"] / 3600, 2)
+        )
+    return {
+        "labels": MONTH_LABELS,
+        "datasets": [
+            {
+                "label": employee_id,
+                "data": monthly_duration,
+                "borderColor": "#1F3BB3",  # Use a consistent color for all employees
+                "fill": False,
+            }
+            for employee_id, monthly_duration in employees.items()
+        ],
+    }
 
-            # Store the data for the top 5 employees for the current month
-            for record in monthly_data:
-                employee_id = record['applied_by__username']
-                total_duration_hours = record['total_duration'].total_seconds() / 3600  # Convert to hours
-
-                # Only include employees with non-zero total duration
-                if total_duration_hours > 0:
-                    top_5_data[month].append({
-                        'employee_id': employee_id,
-                        'total_duration_hours': round(total_duration_hours, 2)
-                    })
-
-        # Prepare data for the response
-        data = {
-            'labels': ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"],  # Months
-            'datasets': []
-        }
 
-        employees = {}  # Keep track of employees and their data across all months
-
-        # Now structure the data for the response
-        for month, employees_data in top_5_data.items():
-            for employee in employees_data:
-                employee_id = employee['employee_id']
-                total_duration_hours = employee['total_duration_hours']
-
-                if employee_id not in employees:
-                    employees[employee_id] = {
-                        'label': employee_id,  # Use employee's username as label
-                        'monthly_duration': []  # Only store months with non-zero duration
-                    }
-
-                # Add the current month and its working hours
-                employees[employee_id]['monthly_duration'].append(total_duration_hours)
-
-        # Now structure the data for the response
-        for employee in employees.values():
-            data['datasets'].append({
-                'label': employee['label'],
-                'data': employee['monthly_duration'],
-                'borderColor': '#1F3BB3',  # Use a consistent color for all employees
-                'fill': False
-            })
+class Top5EmployeesView(View):
+    def get(self, request, year):
+        # Cached across every month of the year, so any attendance change in it rebuilds the chart
+        data = get_cached_report(
+            TOP_EMPLOYEES_REPORT,
+            None,
+            date(year, 1, 1),
+            date(year, 12, 31),
+            True,
+            lambda: get_top_employees_chart(year),
+        )
         return JsonResponse(data)
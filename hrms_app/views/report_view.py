@@ -4,6 +4,7 @@ from django.utils.timezone import make_aware, now, localtime
 from hrms_app.hrms.form import *
 from django.views.generic import (
     TemplateView,
+    View,
 )
 from collections import defaultdict
 from django.contrib.auth.mixins import (
@@ -11,11 +12,41 @@ from django.contrib.auth.mixins import (
 )
 from django.utils.translation import gettext_lazy as _
 import logging
-from django.db.models import Prefetch
+from django.db.models import Prefetch, Q
+from django.template.loader import render_to_string
+from hrms_app.hrms.attendance_summary import iter_months
+from hrms_app.hrms.report_cache import get_cached_report
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
+ABSENT_ENTRIES = [{"status": "A", "color": "#FF0000"}]
+SANDWICHED_STATUSES = ("OFF", "FL")
+
+
+def get_day_status(entries):
+    """The status shown for a day: its last entry's, or "A" when it has none."""
+    return entries[-1].get("status", "A") if entries else "A"
+
+
+def apply_sandwich_rule(day_entries):
+    """
+    Turn one employee's consecutive day entries into report cells in a single pass.
+    An OFF or FL day with an absence on both sides is counted as absent; days outside
+    the list count as absences. Neighbours are judged by their own entries, so a
+    sandwiched day does not make the next one sandwiched too.
+    """
+    statuses = [get_day_status(entries) for entries in day_entries]
+    cells = []
+    for index, entries in enumerate(day_entries):
+        prev_status = statuses[index - 1] if index else "A"
+        next_status = statuses[index + 1] if index + 1 < len(statuses) else "A"
+        if statuses[index] in SANDWICHED_STATUSES and prev_status == next_status == "A":
+            cells.append(ABSENT_ENTRIES)
+        else:
+            cells.append(entries or ABSENT_ENTRIES)
+    return cells
+
 
 class MonthAttendanceReportView(LoginRequiredMixin, TemplateView):
     template_name = "hrms_app/reports/present_absent_report.html"
@@ -30,8 +61,13 @@ class MonthAttendanceReportView(LoginRequiredMixin, TemplateView):
         tour_logs,
         start_date_object,
         end_date_object,
+        activity_days=None,
     ):
+        # Holidays and Sundays are only added for employees with activity in the range;
+        # `activity_days` collects the (employee id, date) pairs that had some
         attendance_data = defaultdict(lambda: defaultdict(list))
+        if activity_days is None:
+            activity_days = set()
         total_days = (end_date_object - start_date_object).days + 1
         sundays = {
             start_date_object + timedelta(days=i)
@@ -50,8 +86,9 @@ class MonthAttendanceReportView(LoginRequiredMixin, TemplateView):
 
         # Process attendance logs
         for log in attendance_logs:
-            employee_id = log.applied_by.id
+            employee_id = log.applied_by_id
             log_date = localtime(log.start_date).date()
+            activity_days.add((employee_id, log_date))
             attendance_data[employee_id][log_date].append(
                 {
                     "status": log.att_status_short_code,
@@ -60,12 +97,11 @@ class MonthAttendanceReportView(LoginRequiredMixin, TemplateView):
             )
 
         # Process tour logs
+        tour_days = get_tour_day_durations(tour_logs)
         for log in tour_logs:
-            daily_durations = calculate_daily_tour_durations(
-                log.start_date, log.start_time, log.end_date, log.end_time
-            )
-            for date, short_code, _ in daily_durations:
-                employee_id = log.applied_by.id
+            for date, short_code, _ in tour_days[log.pk]:
+                employee_id = log.applied_by_id
+                activity_days.add((employee_id, date))
                 attendance_data[employee_id][date].append(
                     {
                         "status": short_code,
@@ -81,11 +117,12 @@ class MonthAttendanceReportView(LoginRequiredMixin, TemplateView):
 
         # Process leave logs
         for log in leave_logs:
-            employee_id = log.leave_application.appliedBy.id
+            employee_id = log.leave_application.appliedBy_id
             log_date = log.date
             leave_type = log.leave_application.leave_type
             leave_status = leave_type.leave_type_short_code
             half_status = leave_type.half_day_short_code
+            activity_days.add((employee_id, log_date))
 
             # Handle "CL" leave type
             if leave_status == "CL":
@@ -168,35 +205,14 @@ class MonthAttendanceReportView(LoginRequiredMixin, TemplateView):
                 return context
 
             active = True if active == "on" else False
-            employees = self._get_filtered_employees(location, active)
-
-            attendance_logs = self._get_attendance_logs(
-                employees, converted_from_datetime, converted_to_datetime
-            )
-            leave_logs = self._get_leave_logs(
-                employees, converted_from_datetime, converted_to_datetime
+            context["report_table"], context["snapshot_at"] = get_report_table(
+                settings.REPORT_ATTENDANCE,
+                location,
+                converted_from_datetime.date(),
+                converted_to_datetime.date(),
+                active,
+                recompute=self.request.GET.get("recompute") == "true",
             )
-            tour_logs = self._get_tour_logs(
-                employees, converted_from_datetime, converted_to_datetime
-            )
-            holidays = self._get_holiday_logs(
-                converted_from_datetime, converted_to_datetime
-            )
-
-            attendance_data = self._map_attendance_data(
-                attendance_logs=attendance_logs,
-                leave_logs=leave_logs,
-                holidays=holidays,
-                tour_logs=tour_logs,
-                start_date_object=converted_from_datetime,
-                end_date_object=converted_to_datetime,
-            )
-
-            context["days_in_month"] = self._get_days_in_month(
-                converted_from_datetime, converted_to_datetime
-            )
-            context["attendance_data"] = attendance_data
-            context["employees"] = employees
         else:
             context["error"] = "Please select a location and date range."
 
@@ -204,6 +220,62 @@ class MonthAttendanceReportView(LoginRequiredMixin, TemplateView):
         context["title"] = self.title
         return context
 
+    def render_report_table(self, location, active, start_date, end_date):
+        employees = self._get_filtered_employees(location, active).select_related(
+            "personal_detail"
+        )
+        return render_to_string(
+            "hrms_app/reports/present_absent_table.html",
+            {
+                "days_in_month": self._get_days_in_month(start_date, end_date),
+                "rows": self.get_report_rows(employees, start_date, end_date),
+            },
+        )
+
+    def get_report_rows(self, employees, start_date, end_date):
+        """`(employee, cells)` pairs with one ready-to-render cell per day of the report."""
+        days_in_month = self._get_days_in_month(start_date, end_date)
+        attendance_data = self._get_summary_attendance_data(employees, start_date, end_date)
+        return [
+            (
+                employee,
+                apply_sandwich_rule(
+                    [attendance_data[employee.id].get(day.date(), []) for day in days_in_month]
+                ),
+            )
+            for employee in employees
+        ]
+
+    def build_attendance_data(self, employees, start_date, end_date, activity_days=None):
+        """
+        Merge attendance logs, leave, tours, holidays and Sundays into per-day entries.
+        Used to fill AttendanceDaySummary; the view itself reads the stored summary.
+        """
+        return self._map_attendance_data(
+            attendance_logs=self._get_attendance_logs(employees, start_date, end_date),
+            leave_logs=self._get_leave_logs(employees, start_date, end_date),
+            holidays=self._get_holiday_logs(start_date, end_date),
+            tour_logs=self._get_tour_logs(employees, start_date, end_date),
+            start_date_object=start_date,
+            end_date_object=end_date,
+            activity_days=activity_days,
+        )
+
+    def _get_summary_attendance_data(self, employees, start_date, end_date):
+        attendance_data = defaultdict(lambda: defaultdict(list))
+        summaries = list(
+            AttendanceDaySummary.objects.filter(
+                employee__in=employees, date__range=[start_date.date(), end_date.date()]
+            ).values_list("employee_id", "date", "entries", "has_activity")
+        )
+        # Summaries hold whole months; as when merging the range itself, employees
+        # with no activity inside it get no holidays or Sundays either
+        active_employees = {employee_id for employee_id, _, _, has_activity in summaries if has_activity}
+        for employee_id, day, entries, _ in summaries:
+            if entries and employee_id in active_employees:
+                attendance_data[employee_id][day] = entries
+        return attendance_data
+
     def _get_date_range(self, from_date, to_date):
         converted_from_datetime = make_aware(datetime.strptime(from_date, "%Y-%m-%d"))
         converted_to_datetime = make_aware(datetime.strptime(to_date, "%Y-%m-%d"))
@@ -222,7 +294,7 @@ class MonthAttendanceReportView(LoginRequiredMixin, TemplateView):
             leave_application__appliedBy__in=employees,
             date__range=[start_date, end_date],
             leave_application__status=settings.APPROVED,
-        )
+        ).select_related("leave_application__leave_type")
 
     def _get_tour_logs(self, employees, start_date, end_date):
         return UserTour.objects.filter(
@@ -231,8 +303,31 @@ class MonthAttendanceReportView(LoginRequiredMixin, TemplateView):
             status=settings.APPROVED,
         )
 
-from django.http import HttpResponse
-import pandas as pd
+from django.core.paginator import Paginator
+from django.http import JsonResponse
+from django.urls import reverse
+
+from hrms_app.hrms.report_export import csv_response, xlsx_response
+
+# Values of the `export` query parameter; "true" is the original Excel button
+EXPORT_FORMATS = {"true": "xlsx", "xlsx": "xlsx", "csv": "csv"}
+
+# Employees rendered per batch of the detailed report and its exports
+PRESENCE_REPORT_BATCH_SIZE = 100
+
+# Employees per page of the lazily loaded detailed report
+PRESENCE_REPORT_PAGE_SIZE = 50
+
+PRESENCE_ROW_LABELS = (
+    ("status", "Status"),
+    ("in_time", "In Time"),
+    ("out_time", "Out Time"),
+    ("total_duration", "Duration"),
+    ("leave", "Leave"),
+    ("tour", "Tour"),
+    ("reg", "Reg"),
+)
+
 
 class DetailedMonthlyPresenceView(LoginRequiredMixin, TemplateView):
     template_name = "hrms_app/reports/present_absent_detailed_report.html"
@@ -243,24 +338,32 @@ class DetailedMonthlyPresenceView(LoginRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         form = AttendanceReportFilterForm(self.request.GET)
 
-        if form.is_valid():
+        # A lazily loaded page only needs the table header
+        if form.is_valid() and "report_headers" in context:
+            context["report_data_url"] = "{}?{}".format(
+                reverse("detailed_attendance_report_data"), self.request.GET.urlencode()
+            )
+        elif form.is_valid():
             location = self.request.GET.get("location")
             from_date = self.request.GET.get("from_date")
             to_date = self.request.GET.get("to_date")
             active = self.request.GET.get("active")
             active = True if active == "on" else False
 
-            table_data = get_monthly_presence_html_table(
-                converted_from_datetime=from_date,
-                converted_to_datetime=to_date,
-                is_active=active,
-                location=location,
+            table_data, snapshot_at = get_report_table(
+                settings.REPORT_DETAILED,
+                location,
+                datetime.strptime(from_date, "%Y-%m-%d").date(),
+                datetime.strptime(to_date, "%Y-%m-%d").date(),
+                active,
+                recompute=self.request.GET.get("recompute") == "true",
             )
 
             # Update context with table data for rendering
             context.update(
                 {
                     "html_table": table_data,
+                    "snapshot_at": snapshot_at,
                     "form": form,
                 }
             )
@@ -275,103 +378,335 @@ class DetailedMonthlyPresenceView(LoginRequiredMixin, TemplateView):
 
     def get(self, request, *args, **kwargs):
         # Check if export is requested
-        if request.GET.get("export") == "true":
+        export_format = EXPORT_FORMATS.get(request.GET.get("export"))
+        if export_format:
             form = AttendanceReportFilterForm(request.GET)
             if form.is_valid():
-                location = request.GET.get("location")
-                from_date = request.GET.get("from_date")
-                to_date = request.GET.get("to_date")
                 active = request.GET.get("active")
-                active = True if active == "on" else False
-
-                table_data = get_monthly_presence_html_table(
-                    converted_from_datetime=from_date,
-                    converted_to_datetime=to_date,
-                    is_active=active,
-                    location=location,
+                return get_monthly_presence_export(
+                    request.GET.get("from_date"),
+                    request.GET.get("to_date"),
+                    True if active == "on" else False,
+                    request.GET.get("location"),
+                    export_format,
                 )
 
-                # Convert HTML table to DataFrame
-                df = pd.read_html(table_data)[0]  # Assuming only one table in HTML content
-                filename = f"monthly_presence_data_from_{from_date}_to_{to_date}.xlsx"
-
-                # Create an Excel writer object
-                excel_writer = pd.ExcelWriter(filename, engine="xlsxwriter")
-                df.to_excel(excel_writer, index=False, sheet_name="Sheet1")
-                excel_writer.close()
-
-                # Prepare the response with the Excel file
-                with open(filename, "rb") as excel_file:
-                    response = HttpResponse(
-                        excel_file.read(),
-                        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    )
-                    response["Content-Disposition"] = f"attachment; filename={filename}"
-                    return response
+        # The rows are loaded a page at a time unless a recompute was asked for,
+        # which renders the whole table. The pages read the day summaries as they
+        # stand, so there is no precomputed time to show
+        form = AttendanceReportFilterForm(request.GET)
+        if form.is_valid() and request.GET.get("recompute") != "true":
+            context = self.get_context_data(
+                report_headers=get_presence_report_headers(
+                    request.GET.get("from_date"), request.GET.get("to_date")
+                ),
+                **kwargs,
+            )
+            return self.render_to_response(context)
 
         # If no export, render the template as usual
         return super().get(request, *args, **kwargs)
 
 
+class DetailedMonthlyPresenceDataView(LoginRequiredMixin, View):
+    """One page of detailed report rows as JSON, for the lazily loaded report table."""
+
+    def get(self, request, *args, **kwargs):
+        form = AttendanceReportFilterForm(request.GET)
+        if not form.is_valid():
+            return JsonResponse({"errors": form.errors}, status=400)
+        active = request.GET.get("active")
+        return JsonResponse(
+            get_monthly_presence_page(
+                request.GET.get("from_date"),
+                request.GET.get("to_date"),
+                True if active == "on" else False,
+                request.GET.get("location"),
+                request.GET.get("page"),
+            )
+        )
+
+
+def render_report(report, location, from_date, to_date, active, refresh=False):
+    """Rendered table of `report`, from the report cache unless `refresh` is set."""
+
+    def build():
+        if report == settings.REPORT_DETAILED:
+            return get_monthly_presence_html_table(
+                converted_from_datetime=from_date.strftime("%Y-%m-%d"),
+                converted_to_datetime=to_date.strftime("%Y-%m-%d"),
+                is_active=active,
+                location=location,
+            )
+        return MonthAttendanceReportView().render_report_table(
+            location,
+            active,
+            make_aware(datetime.combine(from_date, datetime.min.time())),
+            make_aware(datetime.combine(to_date, datetime.min.time())),
+        )
+
+    return get_cached_report(report, location, from_date, to_date, active, build, refresh)
+
+
+def get_report_table(report, location, from_date, to_date, active, recompute=False):
+    """
+    The rendered report table and the time it was precomputed. A stored snapshot is
+    served as it is until a change marks it stale; a stale snapshot, or `recompute`,
+    renders the report now and refreshes the snapshot. Reports without a snapshot
+    are rendered live and come back with no time.
+    """
+    snapshots = get_report_snapshots(report, location, from_date, to_date, active)
+    snapshot = snapshots.first() if location else None
+    if snapshot is None:
+        return render_report(report, location, from_date, to_date, active, refresh=recompute), None
+    if snapshot.stale or recompute:
+        snapshot, html = refresh_report_snapshot(report, location, from_date, to_date, active, recompute)
+        return html, snapshot.computed_at
+    return snapshot.html, snapshot.computed_at
+
+
+def refresh_report_snapshot(report, location, from_date, to_date, active, refresh=True):
+    """Render the report and store it as the snapshot; returns the snapshot and the HTML."""
+    # Cleared before rendering, so a change committed meanwhile marks it stale again
+    get_report_snapshots(report, location, from_date, to_date, active).update(stale=False)
+    html = render_report(report, location, from_date, to_date, active, refresh=refresh)
+    return ReportSnapshot.store(report, location, from_date, to_date, active, html), html
+
+
+def get_report_snapshots(report, location, from_date, to_date, active):
+    return ReportSnapshot.objects.filter(
+        report=report,
+        location_id=location or None,
+        from_date=from_date,
+        to_date=to_date,
+        active=active,
+    )
+
+
+def precompute_report_snapshots(today=None):
+    """
+    Snapshot the attendance report of the previous and current month for every
+    office location, for active employees as the report filter defaults to. The
+    detailed report is loaded a page at a time from the day summaries, so it has no
+    snapshot. Snapshots of older months are dropped. Returns the number stored.
+    """
+    today = today or localtime(now()).date()
+    previous_month = (today.replace(day=1) - timedelta(days=1)).replace(day=1)
+    ReportSnapshot.objects.filter(
+        Q(to_date__lt=previous_month) | ~Q(report=settings.REPORT_ATTENDANCE)
+    ).delete()
+    stored = 0
+    for location_id in OfficeLocation.objects.values_list("pk", flat=True):
+        for month_start, month_end in iter_months(previous_month, today):
+            refresh_report_snapshot(
+                settings.REPORT_ATTENDANCE, str(location_id), month_start, month_end, True
+            )
+            stored += 1
+    return stored
+
+
 def get_monthly_presence_html_table(
     converted_from_datetime, converted_to_datetime, is_active, location
 ):
-    monthly_presence_data = generate_monthly_presence_data_detailed(
+    return "".join(
+        iter_monthly_presence_html(
+            converted_from_datetime, converted_to_datetime, is_active, location
+        )
+    )
+
+
+def iter_monthly_presence_html(
+    converted_from_datetime, converted_to_datetime, is_active, location
+):
+    """
+    Render the detailed report table piece by piece: the opening tags and header
+    first, then one chunk of seven rows per employee, then the closing tags.
+    """
+    headers = get_presence_report_headers(converted_from_datetime, converted_to_datetime)
+    yield "".join(
+        [
+            '<div class="table-container"><table class="rtable table-bordered"><thead><tr>',
+            "".join(f'<th class="sticky-header">{header}</th>' for header in headers),
+            "</tr></thead><tbody>",
+        ]
+    )
+
+    for user, cells in iter_presence_report_employees(
         converted_from_datetime, converted_to_datetime, is_active, location
+    ):
+        emp_code = user.personal_detail.employee_code
+        rows = []
+        for row_type, label in PRESENCE_ROW_LABELS:
+            if row_type == "status":
+                rows.append(
+                    f'<tr><td class="sticky-col" rowspan="7">KMPCL-{format_emp_code(emp_code)}</td>'
+                    f'<td class="sticky-col" rowspan="7">{user.get_full_name()}</td><td>{label}</td>'
+                )
+            else:
+                rows.append(f"<tr><td>{label}</td>")
+            rows.extend(
+                f'<td class="{get_style(row_type, cell)}">{cell[row_type]}</td>' for cell in cells
+            )
+            rows.append("</tr>")
+        rows.append("<tr></tr>")
+        yield "".join(rows)
+
+    yield "</tbody></table></div>"
+
+
+def get_monthly_presence_page(
+    converted_from_datetime, converted_to_datetime, is_active, location, page_number
+):
+    """
+    One page of the detailed report: the rows of `PRESENCE_REPORT_PAGE_SIZE`
+    employees, in report order, and where the pagination stands. Only the employees
+    of the requested page are computed.
+    """
+    paginator = Paginator(
+        get_presence_report_employee_ids(
+            converted_from_datetime, converted_to_datetime, is_active, location
+        ),
+        PRESENCE_REPORT_PAGE_SIZE,
     )
-    converted_from_datetime = datetime.strptime(converted_from_datetime, "%Y-%m-%d")
-    converted_to_datetime = datetime.strptime(converted_to_datetime, "%Y-%m-%d")
-    date_range = [
-        (converted_from_datetime + timedelta(days=day)).date()
-        for day in range((converted_to_datetime - converted_from_datetime).days + 1)
+    page = paginator.get_page(page_number)
+    rows = [
+        {
+            "employee_code": f"KMPCL-{format_emp_code(user.personal_detail.employee_code)}",
+            "name": user.get_full_name(),
+            "cells": [
+                {**cell, "style": get_style("status", cell)} for cell in cells
+            ],
+        }
+        for user, cells in iter_presence_report_employees(
+            converted_from_datetime,
+            converted_to_datetime,
+            is_active,
+            location,
+            list(page.object_list),
+        )
     ]
+    return {
+        "page": page.number,
+        "num_pages": paginator.num_pages,
+        "count": paginator.count,
+        "next_page": page.next_page_number() if page.has_next() else None,
+        "rows": rows,
+    }
+
 
-    # HTML table construction
-    headers = ["Employee Code", "Name", "Attendance"] + [
+def iter_presence_report_employees(
+    converted_from_datetime, converted_to_datetime, is_active, location, employee_ids=None
+):
+    """
+    Yield `(user, cells)` with one report cell per day for every employee that has
+    summary rows in the range, or for `employee_ids` only. Employees are loaded a
+    batch at a time, so the first ones are ready without reading the whole report,
+    and no query stays open while the caller works.
+    """
+    date_range = get_report_dates(converted_from_datetime, converted_to_datetime)
+    day_strs = [day_date.strftime("%Y-%m-%d") for day_date in date_range]
+    employees = get_presence_report_users(is_active)
+    if location:
+        employees = employees.filter(device_location_id=location)
+    if employee_ids is None:
+        employee_ids = list(
+            get_presence_report_employee_ids(
+                converted_from_datetime, converted_to_datetime, is_active, location
+            )
+        )
+    for start in range(0, len(employee_ids), PRESENCE_REPORT_BATCH_SIZE):
+        batch_ids = employee_ids[start : start + PRESENCE_REPORT_BATCH_SIZE]
+        users = employees.in_bulk(batch_ids)
+        monthly_presence_data = get_monthly_presence_summary(
+            converted_from_datetime, converted_to_datetime, is_active, location, batch_ids
+        )
+        for employee_id in batch_ids:
+            user = users[employee_id]
+            emp_code = user.personal_detail.employee_code
+            yield user, [
+                get_cell_data(user, day_date, day_str, monthly_presence_data, emp_code)
+                for day_date, day_str in zip(date_range, day_strs)
+            ]
+
+
+def get_presence_report_employee_ids(
+    converted_from_datetime, converted_to_datetime, is_active, location
+):
+    """Ids of the employees listed in the detailed report, in report order."""
+    employees = get_presence_report_users(is_active)
+    if location:
+        employees = employees.filter(device_location_id=location)
+    return (
+        employees.filter(
+            day_summaries__date__range=[converted_from_datetime, converted_to_datetime]
+        )
+        .order_by("pk")
+        .values_list("pk", flat=True)
+        .distinct()
+    )
+
+
+def get_presence_report_headers(converted_from_datetime, converted_to_datetime):
+    date_range = get_report_dates(converted_from_datetime, converted_to_datetime)
+    return ["Employee Code", "Name", "Attendance"] + [
         f"{day.day}-{day.strftime('%b')}" for day in date_range
     ]
-    table_html = (
-        '<div class="table-container"><table class="rtable table-bordered">'
-        "<thead><tr>"
-        + "".join(f'<th class="sticky-header">{header}</th>' for header in headers)
-        + "</tr></thead><tbody>"
-    )
 
-    users = User.objects.filter(is_active=is_active).select_related("personal_detail")
-    for user in users:
-        emp_code = user.personal_detail.employee_code
-        if emp_code in monthly_presence_data:
-            row_data = {
-                "status": f'<tr><td class="sticky-col" rowspan="7">KMPCL-{format_emp_code(emp_code)}</td><td class="sticky-col" rowspan="7">{user.get_full_name()}</td><td>Status</td>',
-                "in_time": "<tr><td>In Time</td>",
-                "out_time": "<tr><td>Out Time</td>",
-                "total_duration": "<tr><td>Duration</td>",
-                "leave": "<tr><td>Leave</td>",
-                "tour": "<tr><td>Tour</td>",
-                "reg": "<tr><td>Reg</td>",
-            }
 
-            for day_date in date_range:
-                day_str = day_date.strftime("%Y-%m-%d")
-                cell_data = get_cell_data(
-                    user, day_date, day_str, monthly_presence_data, emp_code
-                )
-                for row_type in row_data.keys():
-                    style = get_style(row_type, cell_data)
-                    row_data[
-                        row_type
-                    ] += f'<td class="{style}">{cell_data[row_type]}</td>'
+def get_report_dates(converted_from_datetime, converted_to_datetime):
+    from_date = datetime.strptime(converted_from_datetime, "%Y-%m-%d").date()
+    to_date = datetime.strptime(converted_to_datetime, "%Y-%m-%d").date()
+    return [from_date + timedelta(days=day) for day in range((to_date - from_date).days + 1)]
 
-            for row in row_data.values():
-                table_html += row + "</tr>"
-            table_html += "<tr></tr>"
 
-    table_html += "</tbody></table></div>"
-    return table_html
+def get_presence_report_users(is_active):
+    return User.objects.filter(
+        is_active=is_active, personal_detail__isnull=False
+    ).select_related("personal_detail")
 
 
-def get_cell_data(user, day_date, day_str, monthly_presence_data, emp_code):
-    cell_data = {
+def get_monthly_presence_summary(
+    converted_from_datetime, converted_to_datetime, is_active, location, employee_ids=None
+):
+    """
+    Detailed report cells read from AttendanceDaySummary, as
+    `{employee_code: {"YYYY-MM-DD": cell}}`, optionally for `employee_ids` only.
+    """
+    employees = User.objects.filter(is_active=is_active)
+    if location:
+        employees = employees.filter(device_location_id=location)
+    if employee_ids is not None:
+        employees = employees.filter(pk__in=employee_ids)
+    summaries = AttendanceDaySummary.objects.filter(
+        employee__in=employees,
+        date__range=[converted_from_datetime, converted_to_datetime],
+    ).values_list(
+        "employee__personal_detail__employee_code",
+        "date",
+        "status",
+        "in_time",
+        "out_time",
+        "duration",
+        "leave_code",
+        "tour_code",
+        "regularized",
+    )
+    monthly_presence_data = defaultdict(dict)
+    for emp_code, day, status, in_time, out_time, duration, leave, tour, regularized in summaries:
+        monthly_presence_data[emp_code][day.strftime("%Y-%m-%d")] = {
+            "status": status,
+            "in_time": in_time.strftime("%I:%M %p") if in_time else "",
+            "out_time": out_time.strftime("%I:%M %p") if out_time else "",
+            "total_duration": duration or "",
+            "leave": leave,
+            "tour": tour,
+            "reg": "R" if regularized else "",
+        }
+    return monthly_presence_data
+
+
+def get_empty_cell():
+    return {
         "status": "A",
         "in_time": "",
         "out_time": "",
@@ -380,6 +715,10 @@ def get_cell_data(user, day_date, day_str, monthly_presence_data, emp_code):
         "tour": "",
         "reg": "",
     }
+
+
+def get_cell_data(user, day_date, day_str, monthly_presence_data, emp_code):
+    cell_data = get_empty_cell()
     if (
         (user.personal_detail.dot and day_date < user.personal_detail.dot)
         or (
@@ -391,7 +730,15 @@ def get_cell_data(user, day_date, day_str, monthly_presence_data, emp_code):
     ):
         return cell_data
 
-    status_entry = monthly_presence_data.get(emp_code, {}).get(day_str, None)
+    cell = monthly_presence_data.get(emp_code, {}).get(day_str, None)
+    if cell:
+        cell_data.update(cell)
+    return cell_data
+
+
+def get_status_entry_cell(status_entry):
+    """Flatten one day of `generate_monthly_presence_data_detailed` into a report cell."""
+    cell_data = get_empty_cell()
     if status_entry:
         cell_data.update(
             {
@@ -429,14 +776,19 @@ def get_style(row_type, cell_data):
 def generate_monthly_presence_data_detailed(
     converted_from_datetime, converted_to_datetime, is_active, location
 ):
-    monthly_presence_data = defaultdict(lambda: defaultdict(dict))
-    employees = (
-        User.objects.filter(is_active=is_active)
-        .prefetch_related(Prefetch("personal_detail", to_attr="personal_detail_cache"))
-        .order_by("first_name")
-    )
+    employees = User.objects.filter(is_active=is_active)
     if location:
-        employees = employees.filter(device_location_id=location).order_by("first_name")
+        employees = employees.filter(device_location_id=location)
+    return build_monthly_presence_data(
+        employees, converted_from_datetime, converted_to_datetime
+    )
+
+
+def build_monthly_presence_data(employees, converted_from_datetime, converted_to_datetime):
+    monthly_presence_data = defaultdict(lambda: defaultdict(dict))
+    employees = employees.prefetch_related(
+        Prefetch("personal_detail", to_attr="personal_detail_cache")
+    ).order_by("first_name")
 
 
     leaves = LeaveDay.objects.filter(
@@ -527,13 +879,10 @@ from datetime import datetime, timedelta
 
 
 def process_tours(all_tours, monthly_presence_data):
+    tour_days = get_tour_day_durations(all_tours)
     for tour in all_tours:
-        daily_durations = calculate_daily_tour_durations(
-            tour.start_date, tour.start_time, tour.end_date, tour.end_time
-        )
-
         emp_code = tour.applied_by.personal_detail.employee_code
-        for date, short_code, duration in daily_durations:
+        for date, short_code, duration in tour_days[tour.pk]:
             monthly_presence_data[emp_code][date.strftime("%Y-%m-%d")]["tour"] = {
                 "tour": short_code,
                 "in_time": None,
@@ -542,7 +891,54 @@ def process_tours(all_tours, monthly_presence_data):
             }
 
 
-def calculate_daily_tour_durations(start_date, start_time, end_date, end_time):
+def get_tour_log_durations(tours):
+    """
+    Attendance log durations of the tour employees over the tours' dates, loaded in
+    one query as `{employee_id: {date: duration}}`. Where an employee has several
+    logs on a day the newest one wins.
+    """
+    tours = list(tours)
+    if not tours:
+        return {}
+    logs = (
+        AttendanceLog.objects.filter(
+            applied_by_id__in={tour.applied_by_id for tour in tours},
+            start_date__date__range=[
+                min(tour.start_date for tour in tours),
+                max(tour.end_date for tour in tours),
+            ],
+        )
+        .order_by("created_at")
+        .values_list("applied_by_id", "start_date", "duration")
+    )
+    log_durations = defaultdict(dict)
+    for employee_id, start_date, duration in logs:
+        log_durations[employee_id][localtime(start_date).date()] = duration
+    return log_durations
+
+
+def get_tour_day_durations(tours):
+    """Expand every tour into its `(date, short_code, duration)` days with a single query."""
+    tours = list(tours)
+    log_durations = get_tour_log_durations(tours)
+    tour_days = {}
+    for tour in tours:
+        tour_days[tour.pk] = calculate_daily_tour_durations(
+            tour.start_date,
+            tour.start_time,
+            tour.end_date,
+            tour.end_time,
+            log_durations.get(tour.applied_by_id),
+        )
+    return tour_days
+
+
+def calculate_daily_tour_durations(start_date, start_time, end_date, end_time, log_durations=None):
+    """
+    Split a tour into days. `log_durations` maps a date to the employee's attendance
+    log duration; a short log (under four hours) is added to the tour hours of that day.
+    """
+    log_durations = log_durations or {}
     # Combine date and time into datetime objects
     start_datetime = datetime.combine(start_date, start_time or datetime.min.time())
     end_datetime = datetime.combine(end_date, end_time or datetime.min.time())
@@ -551,12 +947,10 @@ def calculate_daily_tour_durations(start_date, start_time, end_date, end_time):
     daily_durations = []
     while current_datetime.date() <= end_datetime.date():
         # Calculate the end of the current day
-        attendance_log = AttendanceLog.objects.filter(
-            start_date__date=current_datetime.date()
-        ).first()
+        attendance_duration = log_durations.get(current_datetime.date())
         log_duration = 0
-        if attendance_log and attendance_log.duration.hour < 4:
-            log_duration = attendance_log.duration.hour
+        if attendance_duration and attendance_duration.hour < 4:
+            log_duration = attendance_duration.hour
         end_of_day = datetime.combine(current_datetime.date(), datetime.max.time())
         # Determine the actual end time for the current day
         actual_end_time = min(end_of_day, end_datetime)
@@ -653,40 +1047,42 @@ def format_emp_code(emp_code):
         return emp_code
 
 
-import pandas as pd
-from django.http import HttpResponse
-
-
 def exportDetailedMonthlyPresenceView(request):
-    location = request.GET.get("location")
-    from_date = request.GET.get("from_date")
-    to_date = request.GET.get("to_date")
     active = request.GET.get("active")
-    active = True if active == "on" else False
-    # Generate the table and export to Excel as before
-    table_data = get_monthly_presence_html_table(
-        converted_from_datetime=from_date,
-        converted_to_datetime=to_date,
-        location=location,
-        is_active=active,
+    return get_monthly_presence_export(
+        request.GET.get("from_date"),
+        request.GET.get("to_date"),
+        True if active == "on" else False,
+        request.GET.get("location"),
+        EXPORT_FORMATS.get(request.GET.get("export"), "xlsx"),
     )
-    # Convert HTML table to DataFrame
-    df = pd.read_html(table_data)[0]  # Assuming only one table in HTML content
-    filename = f"monthly_presence_data_from_{from_date}_to_{to_date}.xlsx"
-    # Create an Excel writer object
-    excel_writer = pd.ExcelWriter(filename, engine="xlsxwriter")
-    # Convert DataFrame to Excel
-    df.to_excel(excel_writer, index=False, sheet_name="Sheet1")
-    # Close the Excel writer object
-    excel_writer.close()
-    # Prepare the response with the Excel file
-    with open(filename, "rb") as excel_file:
-        response = HttpResponse(
-            excel_file.read(),
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        )
 
-    # Set the file name in the response headers
-    response["Content-Disposition"] = f"attachment; filename={filename}"
 
-    return response
+def iter_monthly_presence_rows(
+    converted_from_datetime, converted_to_datetime, is_active, location
+):
+    """
+    Rows of the detailed report as plain values: the header, then one row per
+    attendance line of every employee with the code and name repeated.
+    """
+    yield get_presence_report_headers(converted_from_datetime, converted_to_datetime)
+
+    for user, cells in iter_presence_report_employees(
+        converted_from_datetime, converted_to_datetime, is_active, location
+    ):
+        code = f"KMPCL-{format_emp_code(user.personal_detail.employee_code)}"
+        name = user.get_full_name()
+        for row_type, label in PRESENCE_ROW_LABELS:
+            yield [code, name, label] + [cell[row_type] for cell in cells]
+
+
+def get_monthly_presence_export(
+    converted_from_datetime, converted_to_datetime, is_active, location, export_format="xlsx"
+):
+    rows = iter_monthly_presence_rows(
+        converted_from_datetime, converted_to_datetime, is_active, location
+    )
+    filename = f"monthly_presence_data_from_{converted_from_datetime}_to_{converted_to_datetime}.{export_format}"
+    if export_format == "csv":
+        return csv_response(rows, filename)
+    return xlsx_response(rows, filename)
@@ -40,6 +40,7 @@ from django.views.generic.edit import ModelFormMixin
 # Local imports
 from hrms_app.hrms.form import *
 from hrms_app.views.mixins import LeaveListViewMixin
+from hrms_app.hrms.attendance_context import get_attendance_context
 from hrms_app.table_classes import (
     UserTourTable,
     LeaveApplicationTable,
@@ -846,14 +847,7 @@ class EventDetailPageView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
 class AttendanceLogActionView(LoginRequiredMixin, View):
     def fetch_static_data(self):
         """Fetch static data used in attendance calculations."""
-        return {
-            "half_day_color": AttendanceStatusColor.objects.get(
-                status=settings.HALF_DAY
-            ),
-            "present_color": AttendanceStatusColor.objects.get(status=settings.PRESENT),
-            "absent_color": AttendanceStatusColor.objects.get(status=settings.ABSENT),
-            "asettings": AttendanceSetting.objects.first(),
-        }
+        return get_attendance_context()
 
     def get_users(self, username):
         """Retrieve users based on username or all users if not specified."""
@@ -869,12 +863,7 @@ class AttendanceLogActionView(LoginRequiredMixin, View):
 
     def get_user_shift(self, user):
         """Retrieve the shift timing for a given user."""
-        emp_shift = (
-            EmployeeShift.objects.filter(employee=user)
-            .select_related("shift_timing")
-            .first()
-        )
-        return emp_shift.shift_timing if emp_shift else None
+        return self.fetch_static_data().get_user_shift(user)
 
     def handle_attendance_update(self, log, form_data, static_data):
         """Update attendance log with approval adjustments."""
@@ -893,18 +882,16 @@ class AttendanceLogActionView(LoginRequiredMixin, View):
         from hrms_app.hrms.managers import AttendanceStatusHandler
 
         status_handler = AttendanceStatusHandler(
-            self.get_user_shift(log.applied_by),
-            static_data["asettings"].full_day_hours,
-            static_data["half_day_color"],
-            static_data["present_color"],
-            static_data["absent_color"],
+            static_data.get_user_shift(log.applied_by),
+            static_data.asettings.full_day_hours,
+            *static_data.status_colors,
         )
 
         log_start_date = localtime(log.start_date)
         log_end_date = localtime(log.end_date)
         total_duration = log_end_date - log_start_date
         user_expected_logout_time = log_start_date + timedelta(
-            hours=static_data["asettings"].full_day_hours
+            hours=static_data.asettings.full_day_hours
         )
 
         status_data = status_handler.determine_attendance_status(